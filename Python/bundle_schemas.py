@@ -0,0 +1 @@
+refs/bundle_schemas_v1.0.0.py
\ No newline at end of file
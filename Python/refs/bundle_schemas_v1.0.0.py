@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Бандлы схем front-middle-schema
+Собирает схему компонента со всеми file:/// и относительными $ref
+в один JSON документ ("$defs" + "#/$defs/..." ссылки).
+Пересобираются только бандлы, у которых изменился хотя бы один входной файл.
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+from refs_tools import VERSION, SchemaBundler, find_project_root, iter_root_schemas
+
+
+def collect_schemas(base_path: Path, targets):
+    """Схемы из аргументов: файлы как есть, каталоги — схемы компонентов внутри"""
+    if not targets:
+        return list(iter_root_schemas(base_path))
+    schemas = []
+    for target in targets:
+        path = Path(target)
+        if not path.is_absolute() and not path.exists():
+            path = base_path / path
+        path = path.resolve()
+        if path.is_dir():
+            schemas.extend(iter_root_schemas(path, dirs=(".",)))
+        elif path.is_file():
+            schemas.append(path)
+        else:
+            print(f"⚠️  Не найдено: {target}")
+    return schemas
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Бандлы схем: все $ref на файлы в одном документе",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Примеры:
+  %(prog)s ~/Documents/front-middle-schema                      # Все схемы компонентов SDUI
+  %(prog)s . SDUI/components/ButtonView                        # Схемы одного компонента
+  %(prog)s . SDUI/atoms/Color/v1/Color.json --out ./bundles    # Одна схема в свой каталог
+  %(prog)s . --force --indent 2                                # Пересобрать всё, с отступами
+        """
+    )
+    parser.add_argument(
+        "path",
+        nargs='?',
+        default=".",
+        help="Путь к проекту front-middle-schema"
+    )
+    parser.add_argument(
+        "schemas",
+        nargs='*',
+        help="Схемы или каталоги (по умолчанию — все схемы компонентов SDUI, без samples)"
+    )
+    parser.add_argument(
+        "--out",
+        help="Каталог бандлов (по умолчанию ~/.refs_index/bundles/<hash>)"
+    )
+    parser.add_argument(
+        "--indent",
+        type=int,
+        default=None,
+        help="Отступ JSON (по умолчанию — компактно)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Пересобрать бандлы, даже если входы не менялись"
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {VERSION}"
+    )
+
+    args = parser.parse_args()
+
+    base_path = Path(args.path).resolve()
+    if not base_path.exists():
+        print(f"❌ Путь не существует: {base_path}")
+        sys.exit(1)
+    base_path = find_project_root(base_path)
+
+    schemas = collect_schemas(base_path, args.schemas)
+    if not schemas:
+        print("❌ Схемы не найдены")
+        sys.exit(1)
+
+    bundler = SchemaBundler(base_path, args.out, indent=args.indent)
+    print(f"🎯 Проект: {bundler.root}")
+    print(f"📦 Бандлы: {bundler.out_dir}")
+    print(f"📄 Схем: {len(schemas)}")
+
+    failed = 0
+    for schema in schemas:
+        try:
+            bundler.write(schema, force=args.force)
+        except ValueError as e:
+            failed += 1
+            print(f"❌ {e}")
+    bundler.save_manifest()
+
+    print(f"\n✅ {bundler.stats}")
+    if bundler.missing:
+        unique = sorted(set(bundler.missing))
+        print(f"\n⚠️  НЕ ВСТРОЕНО ({len(unique)}):")
+        for source, ref in unique[:10]:
+            print(f"  📄 {os.path.relpath(source, bundler.root)}: {ref}")
+        if len(unique) > 10:
+            print(f"  ... и ещё {len(unique) - 10}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,14 @@ import json
 import os
 from pathlib import Path
 
+from refs_tools import PathCache, PrefilterStats, contains_ref, rewrite_refs
+
+# Файлы без "$ref" не разбираются
+PREFILTER = PrefilterStats()
+
+# resolve() один раз на пару (каталог, ссылка)
+PATHS = PathCache()
+
 BASE_PATH = "/Users/username/Documents/front-middle-schema"
 
 def resolve_ref_path(ref_value, current_file_path):
@@ -23,41 +31,28 @@ def resolve_ref_path(ref_value, current_file_path):
     current_dir = Path(current_file_path).parent
 
     # Резолвим относительный путь
-    resolved_path = (current_dir / ref_value).resolve()
+    resolved_path = PATHS.resolve(current_dir, ref_value)
 
     # Конвертируем в file:/// URI
     return f"file://{resolved_path}"
 
-def fix_refs_in_dict(obj, current_file_path):
-    """Рекурсивно исправляет $ref в словаре"""
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            if key == "$ref" and isinstance(value, str):
-                # Преобразуем в абсолютный путь
-                obj[key] = resolve_ref_path(value, current_file_path)
-            else:
-                fix_refs_in_dict(value, current_file_path)
-    elif isinstance(obj, list):
-        for item in obj:
-            fix_refs_in_dict(item, current_file_path)
-
 def process_schema_file(filepath):
     """Обрабатывает один файл схемы"""
+    if not contains_ref(filepath, PREFILTER):
+        return False
+
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            schema = json.load(f)
-
-        # Создаем копию для сравнения
-        original = json.dumps(schema, sort_keys=True)
+            content = f.read()
+        json.loads(content)  # Невалидный JSON не трогаем
 
-        # Исправляем ссылки
-        fix_refs_in_dict(schema, filepath)
+        # Преобразуем в абсолютные пути: заменяются только значения "$ref"
+        content, changed = rewrite_refs(content, lambda value: resolve_ref_path(value, filepath))
 
         # Проверяем, были ли изменения
-        modified = json.dumps(schema, sort_keys=True)
-        if original != modified:
+        if changed:
             with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(schema, f, indent=2, ensure_ascii=False)
+                f.write(content)
             print(f"✓ Преобразовано: {filepath}")
             return True
     except Exception as e:
@@ -93,6 +88,7 @@ def main():
 
     print(f"\n📊 Обработано файлов: {total_files}")
     print(f"✅ Преобразовано файлов: {fixed_files}")
+    print(f"⏭️  Префильтр: {PREFILTER}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,96 +6,105 @@
 import json
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-from collections import defaultdict
+from typing import List, Optional, Tuple
+
+from refs_tools import (
+    REF_FILE,
+    PathCache,
+    PathSuffixTrie,
+    PrefilterStats,
+    RefIndex,
+    common_suffix,
+    contains_marker,
+    find_project_root,
+    open_index,
+    rewrite_refs,
+    split_ref,
+)
+
+# Значение $ref с file:// — только такие файлы могут содержать битые ссылки
+FILE_REF_MARKER = b'"file://'
 
 
 class BrokenRefFixer:
     """Исправляет битые ссылки, находя правильные файлы"""
 
-    def __init__(self, base_path: Path, dry_run: bool = False):
+    def __init__(self, base_path: Path, dry_run: bool = False,
+                 index: Optional[RefIndex] = None):
         self.base_path = base_path.resolve()
         self.dry_run = dry_run
+        # Общий индекс $ref: файлы и ссылки берутся из него, без обхода дерева
+        self.index = index
+        # Файлы без file:// ссылок не разбираются
+        self.prefilter = PrefilterStats(label="file://")
 
         # Статистика
         self.total_fixed = 0
         self.files_modified = 0
+        self.found_by_hash = 0    # Перемещённые файлы, найденные по содержимому
+        self.found_by_suffix = 0  # Найденные по общему хвосту пути
 
-        # Кеш найденных файлов для быстрого поиска
-        self.file_index: Dict[str, List[Path]] = defaultdict(list)
+        # Файлы по хвостам путей: имя → каталог версии → ...
+        self.file_index = PathSuffixTrie()
+        self._files: List[str] = []
         self._build_file_index()
 
-        # Известные перемещения
-        self.known_moves = {
-            "file:///Users/username/Documents/front-middle-schema/SDUI/components/BannerWrapper/v1/TextContent.json":
-                "file:///Users/username/Documents/front-middle-schema/SDUI/atoms/Text/v1/TextContent.json",
-        }
+        # Существование целей: файлы того же обхода + мемоизация промахов
+        self.paths = PathCache(self._files)
 
     def _build_file_index(self):
         """Строит индекс всех JSON файлов"""
         print("📚 Индексирую все JSON файлы...")
 
-        for json_file in self.base_path.glob("**/*.json"):
+        if self.index is not None:
+            json_files = self.index.file_paths(under=self.base_path)
+        else:
+            json_files = self.base_path.glob("**/*.json")
+
+        for json_file in json_files:
             # Пропускаем служебные
             if any(part.startswith('.') for part in json_file.parts):
                 continue
 
-            filename = json_file.name
-            self.file_index[filename].append(json_file)
+            self.file_index.add(json_file)
+            self._files.append(str(json_file))
 
-        print(f"  ✅ Проиндексировано {sum(len(v) for v in self.file_index.values())} файлов")
+        print(f"  ✅ Проиндексировано {self.file_index.size} файлов")
 
-    def find_correct_path(self, broken_ref: str) -> Optional[str]:
-        """Пытается найти правильный путь для битой ссылки"""
+    def is_broken(self, ref: str) -> bool:
+        """file:// ссылка на несуществующий файл"""
+        if not ref.startswith("file://"):
+            return False
+        # file:///abs/x.json → /abs/x.json (как BrokenRefStage в pipeline)
+        return not self.paths.exists(split_ref(ref)[0][7:])
 
-        # Проверяем известные перемещения
-        if broken_ref in self.known_moves:
-            return self.known_moves[broken_ref]
+    def find_correct_path(self, broken_ref: str) -> Optional[Tuple[str, str]]:
+        """
+        Пытается найти правильный путь для битой ссылки.
 
-        # Извлекаем имя файла из битой ссылки
-        if broken_ref.startswith("file:///"):
-            path_str = broken_ref[8:]  # Убираем file:///
-        elif broken_ref.startswith("file://"):
-            path_str = broken_ref[7:]  # Убираем file://
-        else:
+        Returns:
+            (новая ссылка, "hash" / "suffix") или None
+        """
+        if not broken_ref.startswith("file://"):
             return None
-
-        filename = Path(path_str).name
-
-        # Ищем файл в индексе
-        if filename in self.file_index:
-            candidates = self.file_index[filename]
-
-            if len(candidates) == 1:
-                # Только один кандидат - используем его
-                correct_path = candidates[0]
-                return f"file:///{correct_path.as_posix()}"
-
-            elif len(candidates) > 1:
-                # Несколько кандидатов - пытаемся выбрать наиболее подходящий
+        uri, fragment = split_ref(broken_ref)
+        path_str = uri[7:]  # Убираем file://, ведущий / остаётся
+        suffix = "#" + fragment if "#" in broken_ref else ""
+
+        # Файл перемещён или переименован без изменений — индекс помнит его хеш
+        if self.index is not None:
+            moved = self.index.moved_to("/" + path_str.lstrip("/"))
+            if moved:
                 broken_parts = Path(path_str).parts
+                # Одинаковое содержимое у нескольких файлов — ближайший по хвосту пути
+                best = max(moved, key=lambda candidate: common_suffix(broken_parts, candidate.parts))
+                return f"file://{best.as_posix()}{suffix}", "hash"
 
-                # Ищем максимальное совпадение путей
-                best_match = None
-                max_common = 0
-
-                for candidate in candidates:
-                    candidate_parts = candidate.parts
-
-                    # Считаем общие части пути с конца
-                    common = 0
-                    for i in range(1, min(len(broken_parts), len(candidate_parts)) + 1):
-                        if broken_parts[-i] == candidate_parts[-i]:
-                            common += 1
-                        else:
-                            break
-
-                    if common > max_common:
-                        max_common = common
-                        best_match = candidate
-
-                if best_match and max_common >= 2:  # Минимум 2 общих компонента
-                    return f"file:///{best_match.as_posix()}"
+        # Самый длинный общий хвост пути: единственный файл с таким именем
+        # или минимум 2 общих компонента
+        match = self.file_index.match(path_str)
+        if match.depth >= 2 or (match.depth == 1 and match.count == 1):
+            return f"file://{match.path.as_posix()}{suffix}", "suffix"
 
         return None
 
@@ -106,43 +115,36 @@ class BrokenRefFixer:
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-                data = json.loads(content)
-
-            def fix_refs_recursive(obj):
-                nonlocal fixed_count
+            json.loads(content)  # Невалидный JSON не трогаем
 
-                if isinstance(obj, dict):
-                    for key, value in list(obj.items()):
-                        if key == "$ref" and isinstance(value, str):
-                            if value.startswith("file://"):
-                                # Проверяем существование
-                                test_path = value[8:] if value.startswith("file:///") else value[7:]
+            def fix_ref(value: str) -> str:
+                if not self.is_broken(value):
+                    return value
 
-                                if not Path(test_path).exists():
-                                    # Пытаемся найти правильный путь
-                                    correct_ref = self.find_correct_path(value)
+                # Пытаемся найти правильный путь
+                found = self.find_correct_path(value)
+                if found is None or found[0] == value:
+                    return value
+                correct_ref, how = found
 
-                                    if correct_ref and correct_ref != value:
-                                        obj[key] = correct_ref
-                                        fixed_count += 1
-
-                                        if not self.dry_run:
-                                            print(f"    🔧 {value}")
-                                            print(f"       → {correct_ref}")
-                        else:
-                            fix_refs_recursive(value)
+                # Считаются только реально сделанные замены
+                if how == "hash":
+                    self.found_by_hash += 1
+                else:
+                    self.found_by_suffix += 1
 
-                elif isinstance(obj, list):
-                    for item in obj:
-                        fix_refs_recursive(item)
+                if not self.dry_run:
+                    print(f"    🔧 {value}")
+                    print(f"       → {correct_ref}")
+                return correct_ref
 
-            fix_refs_recursive(data)
+            # Заменяются только значения "$ref", форматирование файла сохраняется
+            content, fixed_count = rewrite_refs(content, fix_ref)
 
             if fixed_count > 0 and not self.dry_run:
                 # Сохраняем исправленный файл
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                    f.write('\n')
+                    f.write(content)
 
                 self.total_fixed += fixed_count
                 self.files_modified += 1
@@ -152,12 +154,18 @@ class BrokenRefFixer:
 
         return fixed_count
 
-    def scan_and_fix(self):
-        """Сканирует все файлы и исправляет битые ссылки"""
-
-        print(f"\n🔍 {'PREVIEW' if self.dry_run else 'ИСПРАВЛЕНИЕ'} битых ссылок...")
+    def _indexed_files_with_issues(self) -> List[Path]:
+        """Файлы с битыми ссылками по рёбрам индекса — без чтения файлов"""
+        files_with_issues = []
+        for json_file, refs in self.index.refs_by_file(under=self.base_path, kind=REF_FILE).items():
+            if any(part.startswith('.') for part in json_file.parts):
+                continue
+            if any(self.is_broken(ref) for _pointer, ref in refs):
+                files_with_issues.append(json_file)
+        return files_with_issues
 
-        # Сначала найдём все файлы с проблемами
+    def _scan_files_with_issues(self) -> List[Path]:
+        """Файлы с битыми ссылками — чтением всего дерева"""
         files_with_issues = []
 
         for json_file in self.base_path.glob("**/*.json"):
@@ -165,40 +173,54 @@ class BrokenRefFixer:
             if any(part.startswith('.') for part in json_file.parts):
                 continue
 
-            # Быстрая проверка на наличие битых ссылок
+            # Быстрая проверка на наличие file:// ссылок — без чтения в str и разбора
+            if not contains_marker(json_file, FILE_REF_MARKER, self.prefilter):
+                continue
+
             try:
                 with open(json_file, 'r', encoding='utf-8') as f:
                     content = f.read()
 
-                # Простой поиск file:// ссылок
-                if '"file://' in content:
-                    data = json.loads(content)
-
-                    def has_broken_refs(obj):
-                        if isinstance(obj, dict):
-                            for key, value in obj.items():
-                                if key == "$ref" and isinstance(value, str):
-                                    if value.startswith("file://"):
-                                        test_path = value[8:] if value.startswith("file:///") else value[7:]
-                                        if not Path(test_path).exists():
-                                            return True
-                                else:
-                                    if has_broken_refs(value):
-                                        return True
-                        elif isinstance(obj, list):
-                            for item in obj:
-                                if has_broken_refs(item):
+                data = json.loads(content)
+
+                def has_broken_refs(obj):
+                    if isinstance(obj, dict):
+                        for key, value in obj.items():
+                            if key == "$ref" and isinstance(value, str):
+                                if self.is_broken(value):
                                     return True
-                        return False
+                            else:
+                                if has_broken_refs(value):
+                                    return True
+                    elif isinstance(obj, list):
+                        for item in obj:
+                            if has_broken_refs(item):
+                                return True
+                    return False
 
-                    if has_broken_refs(data):
-                        files_with_issues.append(json_file)
+                if has_broken_refs(data):
+                    files_with_issues.append(json_file)
 
             except:
                 continue
 
+        return files_with_issues
+
+    def scan_and_fix(self):
+        """Сканирует все файлы и исправляет битые ссылки"""
+
+        print(f"\n🔍 {'PREVIEW' if self.dry_run else 'ИСПРАВЛЕНИЕ'} битых ссылок...")
+
+        # Сначала найдём все файлы с проблемами
+        if self.index is not None:
+            files_with_issues = self._indexed_files_with_issues()
+        else:
+            files_with_issues = self._scan_files_with_issues()
+
         if not files_with_issues:
             print("✅ Битых ссылок не найдено!")
+            if self.prefilter.checked:
+                print(f"  • Префильтр: {self.prefilter}")
             return
 
         print(f"📋 Найдено файлов с битыми ссылками: {len(files_with_issues)}")
@@ -223,6 +245,10 @@ class BrokenRefFixer:
         else:
             print(f"  • Исправлено ссылок: {self.total_fixed}")
             print(f"  • Модифицировано файлов: {self.files_modified}")
+        if self.found_by_hash or self.found_by_suffix:
+            print(f"  • Найдено по содержимому: {self.found_by_hash}, по пути: {self.found_by_suffix}")
+        if self.prefilter.checked:
+            print(f"  • Префильтр: {self.prefilter}")
 
 
 def main():
@@ -242,22 +268,16 @@ def main():
         action="store_true",
         help="Только показать что будет исправлено"
     )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Не использовать общий индекс $ref (читать все файлы заново)"
+    )
 
     args = parser.parse_args()
 
-    # Определяем базовый путь
-    base_path = Path(args.path).resolve()
-
-    # Ищем корень проекта
-    if base_path.name != "front-middle-schema":
-        for parent in base_path.parents:
-            if parent.name == "front-middle-schema":
-                base_path = parent
-                break
-        else:
-            potential = base_path / "front-middle-schema"
-            if potential.exists():
-                base_path = potential
+    # Определяем базовый путь (корень проекта)
+    base_path = find_project_root(Path(args.path))
 
     if not base_path.exists():
         print(f"❌ Путь не существует: {base_path}")
@@ -265,8 +285,13 @@ def main():
 
     print(f"🎯 Проект: {base_path}")
 
+    index = None
+    if not args.no_index:
+        index = open_index(base_path)
+        print(f"🗃️  Индекс: {index.refresh()}")
+
     # Создаём исправитель
-    fixer = BrokenRefFixer(base_path, dry_run=args.dry_run)
+    fixer = BrokenRefFixer(base_path, dry_run=args.dry_run, index=index)
 
     # Запускаем исправление
     fixer.scan_and_fix()
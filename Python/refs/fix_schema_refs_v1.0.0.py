@@ -7,48 +7,39 @@ import json
 import os
 from pathlib import Path
 
-def fix_refs_in_dict(obj, current_file_path=None):
-    """Рекурсивно исправляет $ref в словаре"""
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            if key == "$ref" and isinstance(value, str):
-                # Пропускаем ссылки на внутренние определения (начинаются с #)
-                if value.startswith("#"):
-                    continue
-
-                # Если не содержит .json, добавляем
-                if not value.endswith(".json"):
-                    # Проверяем, является ли это ссылкой на файл в той же директории
-                    # (не содержит / или ..)
-                    if "/" not in value and ".." not in value:
-                        # Это ссылка на файл в той же директории
-                        obj[key] = value + ".json"
-                    else:
-                        # Это путь к файлу в другой директории
-                        obj[key] = value + ".json"
-            else:
-                fix_refs_in_dict(value, current_file_path)
-    elif isinstance(obj, list):
-        for item in obj:
-            fix_refs_in_dict(item, current_file_path)
+from refs_tools import PrefilterStats, contains_ref, rewrite_refs
+
+# Файлы без "$ref" не разбираются
+PREFILTER = PrefilterStats()
+
+def fix_ref(value):
+    """Добавляет .json к ссылке на файл"""
+    # Пропускаем ссылки на внутренние определения (начинаются с #)
+    if value.startswith("#"):
+        return value
+
+    # Если не содержит .json, добавляем (и для файлов той же директории, и для путей)
+    if not value.endswith(".json"):
+        return value + ".json"
+    return value
 
 def process_schema_file(filepath):
     """Обрабатывает один файл схемы"""
+    if not contains_ref(filepath, PREFILTER):
+        return False
+
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            schema = json.load(f)
-
-        # Создаем копию для сравнения
-        original = json.dumps(schema, sort_keys=True)
+            content = f.read()
+        json.loads(content)  # Невалидный JSON не трогаем
 
-        # Исправляем ссылки
-        fix_refs_in_dict(schema, filepath)
+        # Исправляем ссылки: заменяются только значения "$ref"
+        content, changed = rewrite_refs(content, fix_ref)
 
         # Проверяем, были ли изменения
-        modified = json.dumps(schema, sort_keys=True)
-        if original != modified:
+        if changed:
             with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(schema, f, indent=2, ensure_ascii=False)
+                f.write(content)
             print(f"✓ Исправлено: {filepath}")
             return True
     except Exception as e:
@@ -84,6 +75,7 @@ def main():
 
     print(f"\n📊 Обработано файлов: {total_files}")
     print(f"✅ Исправлено файлов: {fixed_files}")
+    print(f"⏭️  Префильтр: {PREFILTER}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
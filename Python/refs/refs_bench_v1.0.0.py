@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Замеры refs скриптов на синтетическом дереве
+Генерирует детерминированное дерево в раскладке front-middle-schema
+(refs_tools.synthetic) и запускает на нём скрипты: scan (refs_index),
+fix (refs_fix), convert (universal_refs_converter), validate
+(validate_all_refs). Для каждого — время, файлов в секунду, пиковая память.
+Каждый запуск — отдельный процесс на свежей копии дерева с пустым индексом.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from refs_tools import VERSION, TreeSpec, generate_tree
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Инструмент → скрипт (запускается как "<скрипт> <дерево>")
+TOOLS = {
+    "scan": "refs_index_v1.0.0.py",
+    "fix": "refs_fix_v1.0.0.py",
+    "convert": "universal_refs_converter_v1.0.0.py",
+    "validate": "validate_all_refs_v1.0.0.py",
+}
+
+
+def run_measured(command, env):
+    """
+    Запускает процесс и ждёт его через os.wait4 — rusage именно этого процесса.
+
+    Returns:
+        tuple: (секунды, пиковая память в MB, код возврата)
+    """
+    # stderr — во временный файл, не в PIPE: пайп, который никто не читает до
+    # wait4, заблокировал бы инструмент, пишущий больше буфера пайпа
+    with tempfile.TemporaryFile() as errors:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=errors)
+        _pid, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - started
+        process.returncode = os.waitstatus_to_exitcode(status)
+        errors.seek(0)
+        stderr = errors.read().decode("utf-8", "replace")
+    # ru_maxrss: Linux — KB, macOS — байты
+    peak_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    if process.returncode not in (0, 1) and stderr:
+        print(stderr.strip().splitlines()[-1])
+    return elapsed, peak_mb, process.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Замеры refs скриптов на синтетическом дереве схем",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Примеры:
+  %(prog)s                                        # 1000 файлов, все инструменты
+  %(prog)s --files 1000 10000 100000 --tools scan validate
+  %(prog)s --files 5000 --broken 0.05 --cycles 0.02 --warm
+  %(prog)s --generate-only --files 20000 --workdir /tmp/fms   # Только дерево
+  %(prog)s --output bench.jsonl                    # Результаты — строками JSON
+        """
+    )
+    parser.add_argument(
+        "--files",
+        type=int,
+        nargs='+',
+        default=[1000],
+        help="Размеры дерева (JSON файлов); по умолчанию 1000"
+    )
+    parser.add_argument(
+        "--refs",
+        type=float,
+        default=8.0,
+        help="Среднее число $ref на схему (по умолчанию 8)"
+    )
+    parser.add_argument(
+        "--broken",
+        type=float,
+        default=0.01,
+        help="Доля битых ссылок (по умолчанию 0.01)"
+    )
+    parser.add_argument(
+        "--cycles",
+        type=float,
+        default=0.01,
+        help="Доля схем с циклической ссылкой (по умолчанию 0.01)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed генератора (одно значение — одно и то же дерево)"
+    )
+    parser.add_argument(
+        "--tools",
+        nargs='+',
+        choices=list(TOOLS),
+        default=list(TOOLS),
+        help="Что замерять (по умолчанию всё)"
+    )
+    parser.add_argument(
+        "--warm",
+        action="store_true",
+        help="Второй запуск на той же копии: с готовым индексом"
+    )
+    parser.add_argument(
+        "--workdir",
+        help="Каталог для деревьев (по умолчанию временный, удаляется)"
+    )
+    parser.add_argument(
+        "--generate-only",
+        action="store_true",
+        help="Только сгенерировать дерево (нужен --workdir)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Дописать результаты в файл (JSON построчно)"
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {VERSION}"
+    )
+
+    args = parser.parse_args()
+
+    if args.generate_only and not args.workdir:
+        print("❌ --generate-only требует --workdir")
+        sys.exit(1)
+
+    workdir = Path(args.workdir).resolve() if args.workdir else Path(tempfile.mkdtemp(prefix="refs_bench_"))
+    results = []
+    try:
+        for files in args.files:
+            spec = TreeSpec(files=files, refs_per_file=args.refs, broken_rate=args.broken,
+                            cycle_rate=args.cycles, seed=args.seed)
+            pristine = workdir / f"tree-{files}" / "front-middle-schema"
+            if pristine.exists():
+                shutil.rmtree(pristine)
+            print(f"\n🌳 Дерево {files}: {generate_tree(pristine, spec)}")
+            print(f"   {pristine}")
+            if args.generate_only:
+                continue
+
+            print(f"   {'инструмент':<10} {'запуск':<6} {'время':>8} {'файлов/с':>10} {'память':>9}  код")
+            for tool in args.tools:
+                # Свежая копия: fix и convert меняют файлы
+                run_dir = workdir / f"run-{files}-{tool}"
+                shutil.rmtree(run_dir, ignore_errors=True)
+                tree = run_dir / "front-middle-schema"
+                shutil.copytree(pristine, tree)
+                env = dict(os.environ, REFS_INDEX_DIR=str(run_dir / "index"))
+                command = [sys.executable, str(SCRIPTS_DIR / TOOLS[tool]), str(tree)]
+
+                for mode in (("cold", "warm") if args.warm else ("cold",)):
+                    elapsed, peak_mb, code = run_measured(command, env)
+                    rate = files / elapsed if elapsed else 0.0
+                    print(f"   {tool:<10} {mode:<6} {elapsed:>7.2f}s {rate:>10.0f} {peak_mb:>7.1f}MB  {code}")
+                    results.append({
+                        "date": datetime.now().isoformat(timespec="seconds"),
+                        "tool": tool, "mode": mode, "files": files,
+                        "refs_per_file": args.refs, "broken_rate": args.broken,
+                        "cycle_rate": args.cycles, "seed": args.seed,
+                        "seconds": round(elapsed, 4), "files_per_second": round(rate, 1),
+                        "peak_mb": round(peak_mb, 1), "exit_code": code,
+                    })
+                shutil.rmtree(run_dir, ignore_errors=True)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output and results:
+        with open(args.output, "a", encoding="utf-8") as f:
+            for row in results:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        print(f"\n💾 Результаты: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Все исправления $ref front-middle-schema за один проход
+Заменяет последовательный запуск fix_extra_slash, fix_refs_missing_slash,
+fix_schema_refs, convert_to_absolute_refs / sdui_refs_to_absolute и
+fix_broken_refs: каждый файл читается один раз, проходит все включённые
+стадии и пишется не больше одного раза (одной транзакцией на весь запуск).
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+from refs_tools import (
+    STAGES,
+    FixPipeline,
+    RewriteTransaction,
+    build_stages,
+    find_project_root,
+    open_index,
+    recover,
+    rollback_last,
+)
+
+
+def parse_stage_list(values):
+    """--stages a,b c → {a, b, c}"""
+    return {name.strip() for value in values for name in value.split(",") if name.strip()}
+
+
+def main():
+    stage_help = "\n".join(f"  {name:<14} {stage.description}" for name, stage in STAGES.items())
+    parser = argparse.ArgumentParser(
+        description="Исправления $ref за один проход: стадии по порядку, одна запись на файл",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Стадии (в порядке применения):
+{stage_help}
+
+Примеры:
+  %(prog)s ~/Documents/front-middle-schema             # Все стадии
+  %(prog)s . --dry-run -v                               # Показать замены
+  %(prog)s . --stages add-json,absolute -d SDUI         # Только две стадии, только SDUI
+  %(prog)s . --skip broken                              # Все, кроме поиска битых
+  %(prog)s . --rollback                                 # Откатить последний запуск
+        """
+    )
+    parser.add_argument(
+        "path",
+        nargs='?',
+        default=".",
+        help="Путь к проекту front-middle-schema"
+    )
+    parser.add_argument(
+        "--stages",
+        nargs='+',
+        metavar="STAGE",
+        help="Включить только эти стадии (через запятую или пробел)"
+    )
+    parser.add_argument(
+        "--skip",
+        nargs='+',
+        metavar="STAGE",
+        default=[],
+        help="Выключить стадии"
+    )
+    parser.add_argument(
+        "-d", "--directory",
+        nargs='+',
+        help="Обработать только эти каталоги (по умолчанию — каталоги схем и JSON в корне)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Только показать, что будет изменено"
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Показать каждую замену"
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Не использовать общий индекс $ref (читать все файлы)"
+    )
+    parser.add_argument(
+        "--no-transaction",
+        action="store_true",
+        help="Писать каждый файл сразу (без общей транзакции)"
+    )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Откатить последнюю транзакцию и выйти"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="С --rollback: откатить и файлы, изменённые после транзакции"
+    )
+
+    args = parser.parse_args()
+
+    base_path = find_project_root(Path(args.path))
+    if not base_path.exists():
+        print(f"❌ Путь не существует: {base_path}")
+        sys.exit(1)
+
+    print(f"🎯 Проект: {base_path}")
+
+    # Прерванный прошлый запуск: довести до конца или отменить
+    for txid, state in recover(base_path):
+        print(f"🩹 Транзакция {txid}: {state}")
+
+    if args.rollback:
+        stats = rollback_last(base_path, force=args.force)
+        if stats is None:
+            print("ℹ️  Нет транзакций для отката")
+            return
+        print(f"↩️  Откат: {stats}")
+        for path in stats.skipped_files[:10]:
+            print(f"  ⚠️  Изменён после транзакции: {path}")
+        return
+
+    names = parse_stage_list(args.stages) if args.stages else set(STAGES)
+    names -= parse_stage_list(args.skip)
+    try:
+        stages = build_stages(names)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if not stages:
+        print("❌ Не выбрано ни одной стадии")
+        sys.exit(1)
+    print(f"🧩 Стадии: {' → '.join(stage.name for stage in stages)}")
+
+    index = None
+    if not args.no_index:
+        index = open_index(base_path)
+        print(f"🗃️  Индекс: {index.refresh()}")
+
+    transaction = None
+    if not args.dry_run and not args.no_transaction:
+        transaction = RewriteTransaction(base_path)
+
+    pipeline = FixPipeline(base_path, stages, index=index, transaction=transaction,
+                           dry_run=args.dry_run)
+    stats = pipeline.run(args.directory)
+
+    for path, changes in pipeline.changes.items():
+        print(f"  {'🔍' if args.dry_run else '✅'} {os.path.relpath(path, base_path)}: {len(changes)} ссылок")
+        if args.verbose:
+            for old, new in changes:
+                print(f"    🔧 {old}")
+                print(f"       → {new}")
+
+    if transaction is not None and len(transaction):
+        print(f"\n💾 Транзакция: {transaction.commit()}")
+        print("   Откат: --rollback")
+
+    # Перезаписанные файлы — в индекс: иначе у них старые SHA-1 и moved_to() их не найдёт
+    if index is not None and not args.dry_run and pipeline.changes:
+        print(f"🗃️  Индекс: {index.update(list(pipeline.changes))}")
+
+    print(f"\n📊 Итоги: {stats}")
+    for stage in stages:
+        print(f"  • {stage}")
+    if pipeline.prefilter.checked:
+        print(f"  ⏭️  Префильтр: {pipeline.prefilter}")
+    if pipeline.errors:
+        print(f"\n⚠️  Ошибки ({len(pipeline.errors)}):")
+        for error in pipeline.errors[:10]:
+            print(f"    - {error}")
+    if args.dry_run:
+        print("\n📌 DRY RUN — файлы не изменены")
+
+    if index is not None:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Индекс $ref ссылок front-middle-schema
+Строит и обновляет общий SQLite индекс, которым пользуются
+validate_all_refs, fix_broken_refs, universal_refs_converter,
+sdui_refs_to_absolute и sdui_refs_manager
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+from refs_tools import VERSION, open_index
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Общий индекс $ref ссылок front-middle-schema",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Примеры:
+  %(prog)s ~/Documents/front-middle-schema              # Построить / обновить индекс
+  %(prog)s . --referrers SDUI/atoms/Color/v1/Color.json  # Кто ссылается на файл
+  %(prog)s . --errors                                   # Файлы, которые не разбираются как JSON
+  %(prog)s . --rebuild                                  # Построить индекс с нуля
+        """
+    )
+    parser.add_argument(
+        "path",
+        nargs='?',
+        default=".",
+        help="Путь к проекту front-middle-schema"
+    )
+    parser.add_argument(
+        "--db",
+        help="Файл индекса (по умолчанию ~/.refs_index/<hash>.sqlite)"
+    )
+    parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=None,
+        help="Процессов для разбора изменённых файлов (по умолчанию — число ядер)"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Удалить индекс и построить заново"
+    )
+    parser.add_argument(
+        "--referrers",
+        metavar="FILE",
+        help="Показать все $ref, указывающие на файл"
+    )
+    parser.add_argument(
+        "--errors",
+        action="store_true",
+        help="Показать файлы с ошибками разбора JSON"
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {VERSION}"
+    )
+
+    args = parser.parse_args()
+
+    base_path = Path(args.path).resolve()
+    if not base_path.exists():
+        print(f"❌ Путь не существует: {base_path}")
+        sys.exit(1)
+
+    index = open_index(base_path, args.db)
+    if args.rebuild:
+        db_path = index.db_path
+        index.close()
+        for suffix in ("", "-wal", "-shm"):
+            Path(str(db_path) + suffix).unlink(missing_ok=True)
+        index = open_index(base_path, args.db)
+
+    with index:
+        print(f"🎯 Проект: {index.root}")
+        print(f"🗃️  Индекс: {index.db_path}")
+
+        stats = index.refresh(workers=args.workers)
+        print(f"🔄 Обновлено: {stats}")
+
+        counts = index.counts()
+        print(f"\n📈 Файлов: {counts.pop('files')}  ❌ Не разобрано: {counts.pop('errors')}")
+        for kind, count in counts.items():
+            print(f"  • {kind}: {count}")
+
+        if args.errors:
+            errors = index.file_errors()
+            print(f"\n⚠️  ОШИБКИ РАЗБОРА ({len(errors)}):")
+            for path, error in errors.items():
+                print(f"  📄 {os.path.relpath(path, index.root)}: {error}")
+
+        if args.referrers:
+            target = Path(args.referrers)
+            if not target.is_absolute():
+                target = (Path.cwd() / target) if target.exists() else (index.root / target)
+            rows = index.referrers(target.resolve())
+            print(f"\n🔗 Ссылки на {target.name} ({len(rows)}):")
+            for source, pointer, ref in rows:
+                print(f"  📄 {os.path.relpath(source, index.root)} #{pointer}")
+                print(f"     {ref}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Refs Tools Package
+==================
+Общие модули скриптов работы с $ref в front-middle-schema.
+
+Modules:
+- config: Каталоги проекта, путь индекса, поиск корня front-middle-schema
+- refs: Разбор значений $ref, итеративный обход схемы
+- prefilter: mmap-проверка "$ref" в файле до json.loads
+- paths: Мемоизированные exists() и resolve() для целей $ref
+- suffix: Префиксное дерево по обращённым компонентам пути
+- rewrite: Замена значений "$ref" на месте, без пересериализации JSON
+- transaction: Пакетная перезапись файлов с журналом и откатом
+- pipeline: Один проход исправлений $ref цепочкой стадий
+- graph: Межфайловый граф (файл, фрагмент) и поиск циклов $ref
+- scc: Сильно связные компоненты и путь цикла (общий с sdui_tools jinja_hot_reload)
+- bundle: Сборка схемы с file:/// ссылками в один документ с $defs
+- vscode: Инкрементальная генерация vscode_schemas_config.json по раскладке SDUI
+- health: Битые ссылки по событиям файловой системы (watchdog или опрос)
+- synthetic: Детерминированное дерево схем для замеров
+- index: SQLite индекс файлов и $ref рёбер с инкрементальным обновлением
+
+Usage:
+    from refs_tools import open_index
+
+    with open_index(base_path) as index:
+        print(index.refresh())
+        broken = index.refs(kind="file")
+"""
+
+from .config import VERSION, SCHEMA_DIRS, CONVERT_DIRS, find_project_root, is_skipped_dir
+from .refs import (
+    REF_INTERNAL,
+    REF_EXTERNAL,
+    REF_FILE,
+    REF_RELATIVE,
+    iter_refs,
+    ref_kind,
+    ref_target,
+    split_ref,
+)
+from .prefilter import REF_MARKER, PrefilterStats, contains_marker, contains_ref
+from .paths import PathCache
+from .suffix import PathSuffixTrie, SuffixMatch, common_suffix
+from .rewrite import RefSpan, ref_spans, rewrite_refs
+from .transaction import (
+    RewriteTransaction,
+    TransactionStats,
+    last_transaction,
+    prune_journals,
+    recover,
+    rollback_last,
+)
+from .pipeline import STAGES, FixPipeline, FixStage, PipelineStats, build_stages
+from .graph import RefGraph, build_ref_graph, find_cycles, format_node, ref_edges
+from .bundle import (
+    BUNDLE_VERSION,
+    BundleStats,
+    SchemaBundler,
+    default_bundle_dir,
+    is_root_schema,
+    iter_root_schemas,
+)
+from .vscode import GenerateStats, SchemaConfigGenerator, file_url, merge_entries
+from .index import RefIndex, RefreshStats, open_index
+from .health import BrokenRef, HealthChanges, RefHealth, open_watcher
+from .synthetic import TreeSpec, TreeStats, generate_tree
+
+__all__ = [
+    "VERSION",
+    "SCHEMA_DIRS",
+    "CONVERT_DIRS",
+    "find_project_root",
+    "is_skipped_dir",
+    "REF_INTERNAL",
+    "REF_EXTERNAL",
+    "REF_FILE",
+    "REF_RELATIVE",
+    "iter_refs",
+    "ref_kind",
+    "ref_target",
+    "split_ref",
+    "REF_MARKER",
+    "PrefilterStats",
+    "contains_marker",
+    "contains_ref",
+    "PathCache",
+    "PathSuffixTrie",
+    "SuffixMatch",
+    "common_suffix",
+    "RefSpan",
+    "ref_spans",
+    "rewrite_refs",
+    "RewriteTransaction",
+    "TransactionStats",
+    "last_transaction",
+    "prune_journals",
+    "recover",
+    "rollback_last",
+    "STAGES",
+    "FixPipeline",
+    "FixStage",
+    "PipelineStats",
+    "build_stages",
+    "RefGraph",
+    "build_ref_graph",
+    "find_cycles",
+    "format_node",
+    "ref_edges",
+    "BUNDLE_VERSION",
+    "BundleStats",
+    "SchemaBundler",
+    "default_bundle_dir",
+    "is_root_schema",
+    "iter_root_schemas",
+    "GenerateStats",
+    "SchemaConfigGenerator",
+    "file_url",
+    "merge_entries",
+    "RefIndex",
+    "RefreshStats",
+    "open_index",
+    "BrokenRef",
+    "HealthChanges",
+    "RefHealth",
+    "open_watcher",
+    "TreeSpec",
+    "TreeStats",
+    "generate_tree",
+]
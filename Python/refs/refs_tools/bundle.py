@@ -0,0 +1,394 @@
+"""
+Schema Bundler
+==============
+Сборка схемы со всеми file:/// и относительными $ref в один документ.
+
+- Каждый файл-цель попадает в "$defs" бандла под ключом из пути
+  относительно корня проекта (SDUI.atoms.Color.v1.Color); ссылки
+  переписываются на "#/$defs/<ключ>" + фрагмент
+- Внутренние ссылки встроенного файла ("#/definitions/x") получают
+  префикс его записи; $id и $schema встроенных файлов убираются, чтобы
+  ссылки разрешались от корня бандла
+- Файл читается и переписывается не больше одного раза за запуск:
+  переписанный документ и его прямые зависимости общие для всех бандлов
+- Манифест хранит входы каждого бандла (stat подпись + SHA-1): бандл
+  пересобирается, только если изменился хотя бы один вход
+- Бандл — один JSON файл, пишется атомарно (временный файл + os.replace)
+- Цель, которой нет на диске или которая не разбирается, остаётся
+  исходной ссылкой и попадает в missing
+
+Usage:
+    bundler = SchemaBundler(base_path)
+    for schema in schemas:
+        bundler.write(schema)
+    bundler.save_manifest()
+    print(bundler.stats)
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .config import INDEX_DIR, is_skipped_dir
+from .refs import REF_EXTERNAL, REF_INTERNAL, ref_target
+
+PathLike = Union[str, Path]
+
+# Версия формата бандла: при изменении все бандлы пересобираются
+BUNDLE_VERSION = "1"
+
+# Куда встраиваются файлы-цели
+DEFS_KEY = "$defs"
+
+# Ключи встроенных документов, которые ломают разрешение ссылок от корня бандла
+_DROPPED_KEYS = ("$id", "$schema")
+
+MANIFEST_NAME = ".manifest.json"
+
+# Каталог примеров компонента — примеры не схемы, их бандлы не нужны
+SAMPLES_DIR = "samples"
+
+
+@dataclass
+class BundleStats:
+    """Итоги запуска"""
+    built: int = 0      # Бандлов собрано заново
+    fresh: int = 0      # Входы не менялись — бандл не трогался
+    loaded: int = 0     # Файлов прочитано и разобрано
+    defs: int = 0       # Записей $defs в собранных бандлах
+    missing: int = 0    # Ссылок на отсутствующие / неразбираемые файлы (уникальных)
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.built} собрано, {self.fresh} без изменений, {self.loaded} файлов прочитано, "
+                f"{self.defs} $defs, {self.missing} битых ссылок, {self.elapsed:.2f}s")
+
+
+def default_bundle_dir(root: PathLike) -> Path:
+    """Каталог бандлов дерева: INDEX_DIR/bundles/<sha1(root)[:12]>"""
+    digest = hashlib.sha1(str(Path(root).resolve()).encode("utf-8")).hexdigest()[:12]
+    return INDEX_DIR / "bundles" / digest
+
+
+def is_root_schema(path: PathLike) -> bool:
+    """
+    Схема компонента по раскладке SDUI: Name/Name.json или Name/vN/Name.json
+    (и варианты Name/vN/Name_web.json); файлы samples/ — не схемы.
+    """
+    path = Path(path)
+    parent = path.parent
+    if path.suffix != ".json" or parent.name == SAMPLES_DIR:
+        return False
+    name = parent.name
+    if name[:1] == "v" and name[1:].isdigit():
+        name = parent.parent.name
+    stem = path.stem
+    return stem == name or stem.startswith(name + "_")
+
+
+def iter_root_schemas(root: PathLike, dirs: Tuple[str, ...] = ("SDUI",)) -> Iterator[Path]:
+    """Схемы компонентов в каталогах dirs проекта, в стабильном порядке"""
+    root = Path(root)
+    for directory in dirs:
+        for current, subdirs, files in os.walk(root / directory):
+            subdirs[:] = sorted(d for d in subdirs if not is_skipped_dir(d) and d != SAMPLES_DIR)
+            for name in sorted(files):
+                path = Path(current) / name
+                if is_root_schema(path):
+                    yield path
+
+
+def _escape(token: str) -> str:
+    """Токен JSON Pointer: '~' → '~0', '/' → '~1'"""
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _rewrite(obj: Any, replace: Callable[[str], str]) -> Any:
+    """Копия JSON с заменёнными строковыми значениями "$ref" """
+    if isinstance(obj, dict):
+        result = {}
+        for key, value in obj.items():
+            if key == "$ref" and isinstance(value, str):
+                result[key] = replace(value)
+            else:
+                result[key] = _rewrite(value, replace)
+        return result
+    if isinstance(obj, list):
+        return [_rewrite(item, replace) for item in obj]
+    return obj
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class SchemaBundler:
+    """
+    Сборщик бандлов одного дерева схем.
+
+    Args:
+        root: Корень проекта — ключи $defs строятся от него
+        out_dir: Каталог бандлов (по умолчанию default_bundle_dir(root));
+                 бандл лежит по тому же относительному пути, что и схема
+        indent: Отступ JSON бандла (None — компактно)
+    """
+
+    def __init__(self, root: PathLike, out_dir: Optional[PathLike] = None,
+                 indent: Optional[int] = None):
+        self.root = Path(root).resolve()
+        self.out_dir = Path(out_dir) if out_dir else default_bundle_dir(self.root)
+        self.indent = indent
+        self.stats = BundleStats()
+        self.missing: List[Tuple[str, str]] = []  # (файл, ссылка)
+
+        # Общий кеш запуска: путь → (документ, SHA-1) / переписанная запись $defs и её зависимости
+        self._docs: Dict[str, Optional[Tuple[Any, str]]] = {}
+        self._signatures: Dict[str, Tuple[int, int]] = {}  # stat подпись на момент чтения
+        self._invalid: Dict[str, str] = {}  # Не JSON: путь → SHA-1 (вход бандла, как и остальные)
+        self._embedded: Dict[str, Tuple[Any, List[str], List[str]]] = {}
+        self._keys: Dict[str, str] = {}
+        self._paths_by_key: Dict[str, str] = {}
+        # Проверка свежести: stat и SHA-1 входа — один раз на все бандлы
+        self._stat: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._digests: Dict[str, Optional[str]] = {}
+
+        self._manifest_path = self.out_dir / MANIFEST_NAME
+        try:
+            self._manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._manifest = {}
+        self._manifest_dirty = False
+
+    # ==================== Documents ====================
+
+    def _load(self, path: str) -> Optional[Tuple[Any, str]]:
+        """(документ, SHA-1) файла; None — файла нет или это не JSON"""
+        if path not in self._docs:
+            self._docs[path] = None
+            try:
+                with open(path, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    raw = f.read()
+            except OSError:
+                return None
+            digest = hashlib.sha1(raw).hexdigest()
+            self._signatures[path] = (st.st_mtime_ns, st.st_size)
+            self.stats.loaded += 1
+            try:
+                self._docs[path] = (json.loads(raw.decode("utf-8")), digest)
+            except ValueError:
+                self._invalid[path] = digest
+        return self._docs[path]
+
+    def key_for(self, path: str) -> str:
+        """Ключ $defs файла: путь от корня без .json, '/' → '.'; коллизии — суффикс"""
+        key = self._keys.get(path)
+        if key is not None:
+            return key
+        try:
+            relative = os.path.relpath(path, self.root)
+        except ValueError:
+            relative = path
+        if relative.startswith(".."):
+            relative = path.lstrip(os.sep)
+        if relative.endswith(".json"):
+            relative = relative[:-5]
+        base = relative.replace(os.sep, ".")
+        key, n = base, 2
+        while key in self._paths_by_key:
+            key, n = f"{base}_{n}", n + 1
+        self._keys[path] = key
+        self._paths_by_key[key] = path
+        return key
+
+    def _rewriter(self, path: str, internal_prefix: str, deps: List[str],
+                  absent: List[str]) -> Callable[[str], str]:
+        """Замена ссылок файла path; файлы-цели — в deps, отсутствующие — в absent"""
+        source_dir = os.path.dirname(path)
+
+        def replace(ref: str) -> str:
+            kind, target, fragment = ref_target(ref, source_dir)
+            if kind == REF_EXTERNAL:
+                return ref
+            fragment = "" if fragment == "/" else fragment
+            if kind == REF_INTERNAL:
+                return internal_prefix + fragment if internal_prefix else ref
+            if target is None or self._load(target) is None:
+                self.missing.append((path, ref))
+                if target is not None and target not in absent:
+                    absent.append(target)
+                return ref
+            if target not in deps:
+                deps.append(target)
+            return f"#/{DEFS_KEY}/{_escape(self.key_for(target))}{fragment}"
+
+        return replace
+
+    def _embed(self, path: str) -> Tuple[Any, List[str], List[str]]:
+        """Запись $defs файла, его прямые зависимости и отсутствующие цели — один раз за запуск"""
+        cached = self._embedded.get(path)
+        if cached is None:
+            doc, _digest = self._load(path)
+            deps: List[str] = []
+            absent: List[str] = []
+            prefix = f"#/{DEFS_KEY}/{_escape(self.key_for(path))}"
+            rewritten = _rewrite(doc, self._rewriter(path, prefix, deps, absent))
+            if isinstance(rewritten, dict):
+                for key in _DROPPED_KEYS:
+                    rewritten.pop(key, None)
+            cached = self._embedded[path] = (rewritten, deps, absent)
+        return cached
+
+    # ==================== Bundles ====================
+
+    def bundle(self, schema: PathLike) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Бандл схемы.
+
+        Returns:
+            tuple: (документ, входы {путь: SHA-1}) — входы включают саму схему;
+            SHA-1 None — цели нет на диске (её появление пересоберёт бандл),
+            для файла, который не разбирается, — SHA-1 его содержимого
+        """
+        path = str(Path(schema).resolve())
+        loaded = self._load(path)
+        if loaded is None:
+            raise ValueError(f"Схема не читается как JSON: {path}")
+        doc, digest = loaded
+        if not isinstance(doc, dict):
+            raise ValueError(f"Корень схемы — не объект: {path}")
+
+        deps: List[str] = []
+        absent: List[str] = []
+        result = _rewrite(doc, self._rewriter(path, "", deps, absent))
+        inputs: Dict[str, Optional[str]] = {path: digest}
+
+        # Транзитивное замыкание по общим записям; циклы встраиваются один раз
+        defs: Dict[str, Any] = {}
+        queue = deque(deps)
+        seen: Set[str] = set(queue)
+        while queue:
+            target = queue.popleft()
+            rewritten, target_deps, target_absent = self._embed(target)
+            defs[self.key_for(target)] = rewritten
+            inputs[target] = self._docs[target][1]
+            absent.extend(target_absent)
+            for dep in target_deps:
+                if dep not in seen:
+                    seen.add(dep)
+                    queue.append(dep)
+        for target in absent:
+            inputs.setdefault(target, self._invalid.get(target))
+
+        if defs:
+            existing = result.get(DEFS_KEY)
+            merged = dict(existing) if isinstance(existing, dict) else {}
+            merged.update(sorted(defs.items()))
+            result[DEFS_KEY] = merged
+
+        self.stats.defs += len(defs)
+        self.stats.missing = len(self.missing)
+        return result, inputs
+
+    def output_path(self, schema: PathLike) -> Path:
+        """Путь бандла: тот же относительный путь внутри out_dir"""
+        path = Path(schema).resolve()
+        try:
+            relative = path.relative_to(self.root)
+        except ValueError:
+            relative = Path(*path.parts[1:])
+        return self.out_dir / relative
+
+    def _current_signature(self, path: str) -> Optional[Tuple[int, int]]:
+        if path not in self._stat:
+            self._stat[path] = _signature(path)
+        return self._stat[path]
+
+    def _current_digest(self, path: str) -> Optional[str]:
+        if path not in self._digests:
+            try:
+                with open(path, "rb") as f:
+                    self._digests[path] = hashlib.sha1(f.read()).hexdigest()
+            except OSError:
+                self._digests[path] = None
+        return self._digests[path]
+
+    def is_fresh(self, schema: PathLike) -> bool:
+        """Бандл есть и ни один его вход не менялся (stat, при расхождении — SHA-1)"""
+        output = self.output_path(schema)
+        entry = self._manifest.get(str(output))
+        if entry is None or entry.get("version") != BUNDLE_VERSION or not output.exists():
+            return False
+        touched = []
+        for path, (mtime_ns, size, digest) in entry["inputs"].items():
+            signature = self._current_signature(path)
+            if digest is None:
+                if signature is None:
+                    continue  # Цели по-прежнему нет
+                return False
+            if signature == (mtime_ns, size):
+                continue
+            # touch / checkout без изменений содержимого
+            if self._current_digest(path) != digest:
+                return False
+            touched.append((path, signature))
+        # Содержимое то же — новая подпись, чтобы не хешировать вход снова
+        for path, signature in touched:
+            entry["inputs"][path][:2] = list(signature)
+            self._manifest_dirty = True
+        return True
+
+    def write(self, schema: PathLike, force: bool = False) -> bool:
+        """
+        Собирает и пишет бандл, если его входы изменились.
+
+        Returns:
+            bool: True — бандл записан, False — был актуален
+        """
+        started = time.perf_counter()
+        if not force and self.is_fresh(schema):
+            self.stats.fresh += 1
+            self.stats.elapsed += time.perf_counter() - started
+            return False
+
+        document, inputs = self.bundle(schema)
+        output = self.output_path(schema)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        temp = output.with_name(f".{output.name}.tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False, indent=self.indent,
+                      separators=None if self.indent is not None else (",", ":"))
+        os.replace(temp, output)
+
+        self._manifest[str(output)] = {
+            "version": BUNDLE_VERSION,
+            "schema": str(Path(schema).resolve()),
+            "inputs": {
+                path: list(self._signatures.get(path, (0, 0))) + [digest]
+                for path, digest in sorted(inputs.items())
+            },
+        }
+        self._manifest_dirty = True
+        self.stats.built += 1
+        self.stats.elapsed += time.perf_counter() - started
+        return True
+
+    def save_manifest(self) -> None:
+        """Сохраняет манифест входов (атомарно)"""
+        if not self._manifest_dirty:
+            return
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        temp = self._manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        temp.write_text(json.dumps(self._manifest, ensure_ascii=False, indent=1, sort_keys=True),
+                        encoding="utf-8")
+        os.replace(temp, self._manifest_path)
+        self._manifest_dirty = False
@@ -0,0 +1,59 @@
+"""
+Refs Tools Configuration
+========================
+Каталоги front-middle-schema, пути индекса, поиск корня проекта.
+"""
+
+import os
+from pathlib import Path
+
+# ==================== VERSION ====================
+VERSION = "1.0.0"
+
+# ==================== PROJECT ====================
+PROJECT_DIR_NAME = "front-middle-schema"
+DEFAULT_BASE_PATH = Path("/Users/username/Documents") / PROJECT_DIR_NAME
+
+# Каталоги, которые проверяет validate_all_refs
+SCHEMA_DIRS = [
+    "SDUI",
+    "widgets",
+    "multistep",
+    "valuefields",
+    "dependentfields",
+    "analytics",
+    "metaschema",
+]
+
+# Каталоги, которые обрабатывает universal_refs_converter
+CONVERT_DIRS = SCHEMA_DIRS + ["api", "documentation"]
+
+# Каталоги, которые никогда не сканируются
+SKIP_DIRS = {"node_modules"}
+
+# ==================== INDEX ====================
+# SQLite индекс $ref — вне дерева схем, чтобы не попадать в git status
+INDEX_DIR = Path(os.environ.get("REFS_INDEX_DIR", Path.home() / ".refs_index"))
+
+
+def find_project_root(path: Path) -> Path:
+    """
+    Корень front-middle-schema для пути: сам путь, родитель с этим
+    именем или дочерний каталог front-middle-schema (как в скриптах refs).
+    """
+    base_path = Path(path).resolve()
+    if base_path.name == PROJECT_DIR_NAME:
+        return base_path
+    for parent in base_path.parents:
+        if parent.name == PROJECT_DIR_NAME:
+            return parent
+    potential = base_path / PROJECT_DIR_NAME
+    if potential.exists():
+        return potential
+    return base_path
+
+
+def is_skipped_dir(name: str) -> bool:
+    """Служебные каталоги: скрытые и SKIP_DIRS"""
+    return name.startswith(".") or name in SKIP_DIRS
+
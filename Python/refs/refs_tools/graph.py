@@ -0,0 +1,147 @@
+"""
+$ref Graph
+==========
+Межфайловый граф $ref и поиск циклов.
+
+- Узел — (файл, фрагмент): корень файла ("") или JSON Pointer,
+  на который кто-то ссылается (#/definitions/x), плюс каждая запись
+  /definitions/<name> и /$defs/<name>; '#' и '#/' — корень
+- Ребро ссылки идёт от ближайшего объемлющего узла к цели
+- Узел содержит вложенные узлы (ребро вложенности), кроме записей
+  definitions в корне: неиспользуемое определение не вычисляется
+- Циклы — сильно связные компоненты (Tarjan, итеративно, линейно по рёбрам)
+
+Usage:
+    graph = build_ref_graph(index.ref_edges())
+    for cycle in find_cycles(graph):
+        print(" → ".join(format_node(n) for n in cycle + [cycle[0]]))
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from pathlib import Path
+
+from .refs import REF_EXTERNAL, REF_INTERNAL, ref_target
+from .scc import cycle_path, strongly_connected
+
+# (абсолютный путь файла, фрагмент без '#'; "" — корень)
+Node = Tuple[str, str]
+
+# Контейнеры, записи которых вычисляются только по ссылке
+DEFINITION_CONTAINERS = ("definitions", "$defs")
+_DEFINITION_PREFIXES = tuple(f"/{name}/" for name in DEFINITION_CONTAINERS)
+
+
+@dataclass
+class RefGraph:
+    """Граф узлов (файл, фрагмент)"""
+    nodes: List[Node] = field(default_factory=list)  # Порядок появления
+    edges: Dict[Node, List[Node]] = field(default_factory=dict)
+
+    def add_node(self, node: Node) -> None:
+        if node not in self.edges:
+            self.edges[node] = []
+            self.nodes.append(node)
+
+    def add_edge(self, source: Node, target: Node) -> None:
+        self.add_node(source)
+        self.add_node(target)
+        targets = self.edges[source]
+        if target not in targets:
+            targets.append(target)
+
+
+def ref_edges(source: str, refs: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, str, str, Optional[str], str]]:
+    """Рёбра файла в формате index.ref_edges(): refs — пары (pointer, ref) из iter_refs"""
+    source_dir = os.path.dirname(source)
+    return [(source, pointer, ref) + ref_target(ref, source_dir) for pointer, ref in refs]
+
+
+def _definition_entry(pointer: str) -> Optional[str]:
+    """'/definitions/x/properties/y' → '/definitions/x' (иначе None)"""
+    parts = pointer.split("/", 3)
+    if len(parts) >= 3 and parts[1] in DEFINITION_CONTAINERS:
+        return "/" + parts[1] + "/" + parts[2]
+    return None
+
+
+def _enclosing(pointer: str, fragments: Set[str]) -> str:
+    """Самый длинный фрагмент-узел, являющийся предком pointer (по сегментам)"""
+    while pointer:
+        if pointer in fragments:
+            return pointer
+        pointer = pointer[:pointer.rfind("/")]
+    return ""
+
+
+def build_ref_graph(edges: Iterable[Tuple[str, str, str, str, Optional[str], str]]) -> RefGraph:
+    """
+    Строит граф из строк таблицы refs индекса.
+
+    Args:
+        edges: (файл, JSON Pointer объекта с $ref, значение $ref, kind, цель, фрагмент) —
+               index.ref_edges() или ref_edges(файл, iter_refs(data))
+
+    Внешние (http) ссылки и ссылки, цель которых не определить, пропускаются.
+    """
+    refs: List[Tuple[str, str, str, str]] = []
+    fragments: Dict[str, Set[str]] = {}
+
+    # Проход 1: цели и записи definitions — это узлы
+    for source, pointer, ref, kind, target, fragment in edges:
+        if kind == REF_EXTERNAL:
+            continue
+        if target is None:
+            if kind != REF_INTERNAL:
+                continue  # file:////..., пустой uri — цель не определить
+            target = source
+        if fragment == "/":
+            fragment = ""
+        refs.append((source, pointer, target, fragment))
+        names = fragments.get(target)
+        if names is None:
+            names = fragments[target] = set()
+        names.add(fragment)
+        if pointer.startswith(_DEFINITION_PREFIXES):
+            entry = _definition_entry(pointer)
+            if entry is not None:
+                fragments.setdefault(source, set()).add(entry)
+
+    graph = RefGraph()
+
+    # Рёбра вложенности: узел → ближайший вложенный узел того же файла
+    for path in sorted(fragments):
+        names = fragments[path]
+        names.discard("")
+        for fragment in sorted(names):
+            parent = _enclosing(fragment[:fragment.rfind("/")], names)
+            if parent == "" and _definition_entry(fragment) == fragment:
+                graph.add_node((path, fragment))  # Определение вычисляется только по ссылке
+                continue
+            graph.add_edge((path, parent), (path, fragment))
+
+    # Проход 2: рёбра ссылок от ближайшего объемлющего узла
+    for source, pointer, target, fragment in refs:
+        owner = _enclosing(pointer, fragments.get(source, ()))
+        graph.add_edge((source, owner), (target, fragment))
+
+    return graph
+
+
+def find_cycles(graph: RefGraph) -> List[List[Node]]:
+    """Цикл на каждую циклическую компоненту, в стабильном порядке"""
+    cycles = []
+    for component in strongly_connected(graph.nodes, graph.edges):
+        if len(component) > 1 or component[0] in graph.edges[component[0]]:
+            cycles.append(cycle_path(component, graph.edges))
+    cycles.sort()
+    return cycles
+
+
+def format_node(node: Node, base: Optional[Union[str, Path]] = None) -> str:
+    """'SDUI/atoms/A.json#/definitions/x' (путь относительно base)"""
+    path, fragment = node
+    if base is not None:
+        path = os.path.relpath(path, base)
+    return f"{path}#{fragment}" if fragment else path
@@ -0,0 +1,313 @@
+"""
+Ref Health
+==========
+Живое состояние ссылок дерева: индекс обновляется по событиям файловой системы.
+
+- Источник событий — watchdog (inotify / FSEvents / ReadDirectoryChangesW),
+  без него — опрос: stat всех JSON раз в interval секунд
+- События копятся debounce секунд и уходят пачкой в index.update()
+- Обратные рёбра — столбец target индекса (refs_target): удаление или
+  переименование цели сразу даёт всех, кто на неё ссылается
+- Пересчитываются только изменённые файлы и файлы, ссылающиеся на них —
+  O(рёбер, касающихся изменённых путей), без обхода дерева
+- Битая ссылка — file:/// или относительная, чей файл-цель не существует
+  (фрагменты проверяет validate_all_refs)
+- Состояние — JSON файл (по умолчанию INDEX_DIR/health/<sha1(root)[:12]>.json),
+  заменяется атомарно после каждой пачки событий
+
+Usage:
+    health = RefHealth(index)
+    health.scan()
+    watcher = open_watcher(index)
+    while True:
+        changes = health.apply(watcher.poll())
+        health.write_status()
+"""
+
+import hashlib
+import json
+import os
+import queue
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog — опциональная зависимость, без неё — опрос
+    Observer = None
+
+from .config import INDEX_DIR
+from .index import RefIndex, _prefix_range
+from .paths import PathCache
+from .refs import REF_EXTERNAL, REF_INTERNAL
+
+PathLike = Union[str, Path]
+
+# Формат файла состояния
+STATUS_VERSION = 1
+
+# Сколько битых ссылок выписывать в файл состояния
+STATUS_MAX_REFS = 500
+
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_INTERVAL = 2.0
+
+
+class BrokenRef(NamedTuple):
+    """Битая ссылка: файл, JSON Pointer объекта с $ref, значение, ожидаемый файл-цель"""
+    source: str
+    pointer: str
+    ref: str
+    target: str
+
+
+class HealthChanges(NamedTuple):
+    """Итог одной пачки событий"""
+    broken: List[BrokenRef]                   # Стали битыми
+    fixed: List[BrokenRef]                    # Починились (или исчез их файл)
+    moved: List[Tuple[str, List[Path]]]       # Удалённая цель → файлы с тем же содержимым
+    files: int                                # Файлов пересчитано
+
+
+def default_status_path(root: PathLike) -> Path:
+    """Файл состояния дерева: INDEX_DIR/health/<sha1(root)[:12]>.json"""
+    digest = hashlib.sha1(str(Path(root).resolve()).encode("utf-8")).hexdigest()[:12]
+    return INDEX_DIR / "health" / f"{digest}.json"
+
+
+def _is_checked(kind: str) -> bool:
+    return kind != REF_INTERNAL and kind != REF_EXTERNAL
+
+
+class RefHealth:
+    """
+    Битые ссылки дерева, поддерживаемые по событиям.
+
+    Args:
+        index: Индекс дерева (обновляется через update())
+        status_path: Файл состояния (по умолчанию default_status_path(root))
+    """
+
+    def __init__(self, index: RefIndex, status_path: Optional[PathLike] = None):
+        self.index = index
+        self.status_path = Path(status_path) if status_path else default_status_path(index.root)
+        self.watcher = ""
+        self.events = 0
+        self.last_event: Optional[str] = None
+        self.started = datetime.now().isoformat(timespec="seconds")
+
+        # Файл → его битые ссылки (в порядке документа); файлы без битых не хранятся
+        self._broken: Dict[str, List[BrokenRef]] = {}
+
+    @property
+    def broken_count(self) -> int:
+        return sum(len(refs) for refs in self._broken.values())
+
+    def broken(self) -> List[BrokenRef]:
+        return [ref for source in sorted(self._broken) for ref in self._broken[source]]
+
+    def broken_files(self) -> List[str]:
+        return sorted(self._broken)
+
+    # ==================== Checks ====================
+
+    def scan(self) -> int:
+        """Полный пересчёт по индексу (при запуске); возвращает число битых ссылок"""
+        paths = PathCache(self.index.existing_files())
+        self._broken = {}
+        for source, pointer, ref, kind, target, _fragment in self.index.ref_edges():
+            if not _is_checked(kind):
+                continue
+            if target is None or not paths.exists(target):
+                self._broken.setdefault(source, []).append(
+                    BrokenRef(source, pointer, ref, target or ""))
+        return self.broken_count
+
+    def _check_source(self, source: str) -> List[BrokenRef]:
+        """Битые ссылки одного файла — только его рёбра"""
+        broken = []
+        for pointer, ref, kind, target in self.index.conn.execute(
+            "SELECT pointer, ref, kind, target FROM refs WHERE source = ? ORDER BY rowid", (source,)
+        ):
+            if not _is_checked(kind):
+                continue
+            if target is None or not os.path.exists(target):
+                broken.append(BrokenRef(source, pointer, ref, target or ""))
+        return broken
+
+    def _affected(self, path: str) -> Set[str]:
+        """Файлы, чьи ссылки мог изменить путь: он сам, файлы внутри, ссылающиеся на него"""
+        conn = self.index.conn
+        low, high = _prefix_range(path)
+        sources = {path}
+        sources.update(p for (p,) in conn.execute(
+            "SELECT path FROM files WHERE path >= ? AND path < ?", (low, high)))
+        sources.update(s for (s,) in conn.execute(
+            "SELECT DISTINCT source FROM refs WHERE target = ?"
+            " OR (target >= ? AND target < ?)", (path, low, high)))
+        # Удалённые файлы бывшего каталога уже выпали из индекса
+        sources.update(s for s in self._broken if s == path or low <= s < high)
+        return sources
+
+    def apply(self, paths: Iterable[PathLike]) -> HealthChanges:
+        """
+        Обновляет индекс и битые ссылки по изменённым путям.
+
+        Args:
+            paths: Пути из событий: файлы и каталоги, существующие или удалённые
+        """
+        paths = sorted({os.path.normpath(os.path.abspath(str(p))) for p in paths})
+        if not paths:
+            return HealthChanges([], [], [], 0)
+        self.events += len(paths)
+        self.last_event = datetime.now().isoformat(timespec="seconds")
+
+        self.index.update(paths)
+
+        sources: Set[str] = set()
+        for path in paths:
+            sources |= self._affected(path)
+
+        broken: List[BrokenRef] = []
+        fixed: List[BrokenRef] = []
+        for source in sorted(sources):
+            before = self._broken.pop(source, [])
+            after = self._check_source(source)
+            if after:
+                self._broken[source] = after
+            old, new = set(before), set(after)
+            broken.extend(ref for ref in after if ref not in old)
+            fixed.extend(ref for ref in before if ref not in new)
+
+        moved = []
+        for target in sorted({ref.target for ref in broken if ref.target}):
+            candidates = self.index.moved_to(target)
+            if candidates:
+                moved.append((target, candidates))
+        return HealthChanges(broken, fixed, moved, len(sources))
+
+    # ==================== Status ====================
+
+    def status(self) -> dict:
+        broken = self.broken()
+        return {
+            "version": STATUS_VERSION,
+            "root": str(self.index.root),
+            "pid": os.getpid(),
+            "watcher": self.watcher,
+            "started": self.started,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "events": self.events,
+            "last_event": self.last_event,
+            "healthy": not broken,
+            "broken": len(broken),
+            "broken_files": len(self._broken),
+            "refs": [ref._asdict() for ref in broken[:STATUS_MAX_REFS]],
+        }
+
+    def write_status(self, **extra) -> Path:
+        """Пишет состояние атомарно (временный файл + os.replace)"""
+        status = self.status()
+        status.update(extra)
+        self.status_path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.status_path.with_name(f".{self.status_path.name}.tmp")
+        temp.write_text(json.dumps(status, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(temp, self.status_path)
+        return self.status_path
+
+
+# ==================== Watchers ====================
+
+class PollingWatcher:
+    """
+    Опрос без watchdog: stat всех JSON дерева раз в interval секунд.
+
+    Args:
+        index: Индекс — его обход и снимок stat подписей после refresh()
+        interval: Пауза между обходами
+    """
+
+    name = "polling"
+
+    def __init__(self, index: RefIndex, interval: float = DEFAULT_INTERVAL):
+        self.index = index
+        self.interval = interval
+        self._snapshot: Dict[str, Tuple[int, int]] = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in index.conn.execute("SELECT path, mtime_ns, size FROM files")
+        }
+
+    def poll(self) -> List[str]:
+        """Пути, изменившиеся с прошлого опроса (ждёт interval)"""
+        time.sleep(self.interval)
+        current = {path: (mtime_ns, size) for path, mtime_ns, size in self.index.walk()}
+        changed = [path for path, signature in current.items()
+                   if self._snapshot.get(path) != signature]
+        changed.extend(path for path in self._snapshot if path not in current)
+        self._snapshot = current
+        return changed
+
+    def stop(self) -> None:
+        pass
+
+
+class EventWatcher:
+    """
+    События watchdog: пути копятся, пока дерево не затихнет на debounce секунд.
+
+    Args:
+        root: Корень дерева (рекурсивно)
+        debounce: Пауза тишины, после которой пачка уходит в обработку
+    """
+
+    name = "watchdog"
+
+    def __init__(self, root: PathLike, debounce: float = DEFAULT_DEBOUNCE):
+        if Observer is None:
+            raise RuntimeError("watchdog не установлен: pip install watchdog")
+        self.debounce = debounce
+        self._queue: "queue.Queue[str]" = queue.Queue()
+
+        handler = FileSystemEventHandler()
+        handler.on_any_event = self._on_event
+        self._observer = Observer()
+        self._observer.schedule(handler, str(root), recursive=True)
+        self._observer.start()
+
+    def _on_event(self, event) -> None:
+        # Поток watchdog: только очередь — индекс (SQLite) трогает главный поток
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        if event.is_directory and event.event_type == "modified":
+            return  # Изменения внутри каталога придут событиями самих файлов
+        self._queue.put(os.fsdecode(event.src_path))
+        dest = getattr(event, "dest_path", None)
+        if dest:
+            self._queue.put(os.fsdecode(dest))
+
+    def poll(self, timeout: float = 1.0) -> List[str]:
+        """Пачка путей; пусто, если за timeout событий не было"""
+        try:
+            paths = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                paths.append(self._queue.get(timeout=self.debounce))
+            except queue.Empty:
+                return paths
+
+    def stop(self) -> None:
+        self._observer.stop()
+        self._observer.join()
+
+
+def open_watcher(index: RefIndex, polling: bool = False, interval: float = DEFAULT_INTERVAL,
+                 debounce: float = DEFAULT_DEBOUNCE):
+    """EventWatcher, если есть watchdog и не просили опрос, иначе PollingWatcher"""
+    if Observer is not None and not polling:
+        return EventWatcher(index.root, debounce)
+    return PollingWatcher(index, interval)
@@ -0,0 +1,584 @@
+"""
+$ref Index
+==========
+Общий SQLite индекс JSON файлов front-middle-schema и их $ref рёбер.
+
+- files: путь, stat подпись (mtime_ns, size), SHA-1 содержимого, ошибка разбора
+- refs:  источник, JSON Pointer объекта с $ref, значение, вид, файл цели, фрагмент
+- refresh() обходит дерево через os.scandir и перечитывает только файлы
+  с изменившейся stat подписью; если изменился только mtime, а хеш прежний —
+  файл не разбирается заново
+- update(paths) — то же для списка путей из событий файловой системы,
+  без обхода дерева
+- Изменённые файлы разбираются в пуле процессов, если их много
+- Все изменения одного refresh() — одна транзакция
+- Вердикты проверки ссылок хранятся рядом с рёбрами: refresh() сбрасывает
+  вердикт у рёбер изменённых файлов и у рёбер, чья цель появилась или исчезла
+- removed: путь и хеш удалённых файлов — перемещённый или переименованный
+  файл находится по содержимому (moved_to)
+
+Usage:
+    with open_index(base_path) as index:
+        stats = index.refresh()
+        for source, pointer, ref in index.refs(kind="relative"):
+            ...
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .config import INDEX_DIR, find_project_root, is_skipped_dir
+from .prefilter import REF_MARKER
+from .refs import iter_refs, ref_target
+
+
+# Формат базы — при изменении индекс строится заново
+INDEX_FORMAT = 3
+
+# Меньше файлов — пул не окупает запуск процессов
+PARALLEL_MIN_FILES = 256
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class RefreshStats:
+    """Итоги одного refresh()"""
+    scanned: int = 0     # JSON файлов в дереве
+    added: int = 0       # Новые файлы
+    changed: int = 0     # Изменилась stat подпись
+    removed: int = 0     # Удалены с диска
+    parsed: int = 0      # Реально прочитаны и разобраны
+    skipped: int = 0     # Изменённые файлы без "$ref" — не разбирались
+    skipped_bytes: int = 0
+    refs: int = 0        # $ref в индексе после refresh
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.scanned} files, +{self.added} ~{self.changed} -{self.removed}, "
+                f"{self.parsed} parsed, {self.skipped} without $ref skipped "
+                f"({self.skipped_bytes / 1024:.0f} KB), {self.refs} refs, {self.elapsed:.2f}s")
+
+
+def default_db_path(root: PathLike) -> Path:
+    """Файл индекса для корня: INDEX_DIR/<sha1(root)[:12]>.sqlite"""
+    digest = hashlib.sha1(str(Path(root).resolve()).encode("utf-8")).hexdigest()[:12]
+    return INDEX_DIR / f"{digest}.sqlite"
+
+
+def _prefix_range(path: str) -> Tuple[str, str]:
+    """Диапазон путей внутри каталога: '/a/b/' <= p < '/a/b0' ('0' = '/' + 1)"""
+    path = path.rstrip("/")
+    return path + "/", path + "0"
+
+
+def parse_refs(path: str, raw: bytes) -> List[Tuple[str, str, str, Optional[str], str]]:
+    """
+    Все $ref файла в виде строк таблицы refs (без source).
+
+    Raises:
+        ValueError: Файл не UTF-8 или не JSON
+    """
+    data = json.loads(raw.decode("utf-8"))
+    source_dir = os.path.dirname(path)
+    rows = []
+    for pointer, ref in iter_refs(data):
+        kind, target, fragment = ref_target(ref, source_dir)
+        rows.append((pointer, ref, kind, target, fragment))
+    return rows
+
+
+def _load_chunk(paths: List[str]) -> List[Tuple[str, str, Optional[list], Optional[str]]]:
+    """
+    Чтение, хеш и разбор пачки файлов (в процессе пула).
+
+    Файл без "$ref" не разбирается: rows = None.
+    """
+    loaded = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            continue  # Файл исчез между обходом и чтением — подхватит следующий refresh
+        error = None
+        rows = None
+        if REF_MARKER in raw:
+            try:
+                rows = parse_refs(path, raw)
+            except ValueError as e:
+                rows = []
+                error = str(e)
+        loaded.append((path, hashlib.sha1(raw).hexdigest(), rows, error))
+    return loaded
+
+
+def load_files(paths: List[str], workers: Optional[int] = None) -> Iterator[Tuple[str, str, Optional[list], Optional[str]]]:
+    """
+    (путь, sha1, строки refs или None без "$ref", ошибка) для каждого
+    читаемого файла, в порядке paths.
+
+    Пачки разбираются в пуле процессов, если файлов много: json.loads
+    держит GIL, потоки бы не помогли.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < PARALLEL_MIN_FILES:
+        yield from _load_chunk(paths)
+        return
+
+    size = max(16, len(paths) // (workers * 4))
+    chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        for loaded in pool.map(_load_chunk, chunks):
+            yield from loaded
+
+
+class RefIndex:
+    """
+    Индекс $ref рёбер одного дерева схем.
+
+    Args:
+        root: Корень дерева (обычно front-middle-schema)
+        db_path: Файл базы (по умолчанию — в INDEX_DIR, вне дерева схем)
+    """
+
+    def __init__(self, root: PathLike, db_path: Optional[PathLike] = None):
+        self.root = Path(root).resolve()
+        self.db_path = Path(db_path) if db_path else default_db_path(self.root)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._ensure_schema()
+
+    # ==================== Schema ====================
+
+    def _ensure_schema(self) -> None:
+        conn = self.conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'format'").fetchone()
+        if row is not None and row[0] == str(INDEX_FORMAT):
+            return
+
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS files")
+            conn.execute("DROP TABLE IF EXISTS refs")
+            conn.execute("DROP TABLE IF EXISTS removed")
+            conn.execute(
+                "CREATE TABLE files ("
+                " path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER,"
+                " hash TEXT, ref_count INTEGER, error TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE refs ("
+                " source TEXT, pointer TEXT, ref TEXT,"
+                " kind TEXT, target TEXT, fragment TEXT,"
+                " verdict TEXT, message TEXT)"
+            )
+            conn.execute("CREATE TABLE removed (path TEXT PRIMARY KEY, hash TEXT)")
+            conn.execute("CREATE INDEX files_hash ON files (hash)")
+            conn.execute("CREATE INDEX refs_source ON refs (source)")
+            conn.execute("CREATE INDEX refs_target ON refs (target)")
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('format', ?)", (str(INDEX_FORMAT),))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('root', ?)", (str(self.root),))
+
+    # ==================== Refresh ====================
+
+    def walk(self, start: Optional[PathLike] = None) -> Iterator[Tuple[str, int, int]]:
+        """(путь, mtime_ns, size) всех *.json дерева (или каталога start), без служебных каталогов"""
+        stack = [str(start or self.root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                name = entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not is_skipped_dir(name):
+                            stack.append(entry.path)
+                    elif name.endswith(".json") and not name.startswith("."):
+                        st = entry.stat()
+                        yield entry.path, st.st_mtime_ns, st.st_size
+                except OSError:
+                    continue
+
+    def refresh(self, workers: Optional[int] = None) -> RefreshStats:
+        """
+        Синхронизирует индекс с диском, перечитывая только изменённые файлы.
+
+        Args:
+            workers: Процессов для разбора изменённых файлов
+                     (None — по числу ядер, 1 — без пула)
+        """
+        started = time.perf_counter()
+        stats = RefreshStats()
+        conn = self.conn
+
+        known: Dict[str, Tuple[int, int, str]] = {
+            path: (mtime_ns, size, digest)
+            for path, mtime_ns, size, digest in conn.execute(
+                "SELECT path, mtime_ns, size, hash FROM files"
+            )
+        }
+        seen: Set[str] = set()
+        pending: Dict[str, Tuple[int, int]] = {}
+
+        for path, mtime_ns, size in self.walk():
+            stats.scanned += 1
+            seen.add(path)
+            previous = known.get(path)
+            if previous is not None and previous[0] == mtime_ns and previous[1] == size:
+                continue
+            if previous is None:
+                stats.added += 1
+            else:
+                stats.changed += 1
+            pending[path] = (mtime_ns, size)
+
+        gone = [path for path in known if path not in seen]
+        self._apply(pending, known, gone, stats, workers)
+
+        stats.refs = conn.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    def _apply(self, pending: Dict[str, Tuple[int, int]], known: Dict[str, Tuple[int, int, str]],
+               gone: List[str], stats: RefreshStats, workers: Optional[int] = None) -> None:
+        """
+        Одна транзакция: перечитывает pending, удаляет gone.
+
+        Args:
+            pending: Новые и изменённые файлы → stat подпись
+            known: Прежние записи files этих путей → (mtime_ns, size, hash)
+            gone: Исчезнувшие с диска файлы (все есть в known)
+        """
+        conn = self.conn
+        with conn:
+            for path, digest, rows, error in load_files(list(pending), workers):
+                mtime_ns, size = pending[path]
+                previous = known.get(path)
+
+                if previous is not None and previous[2] == digest:
+                    # touch / checkout без изменений — рёбра прежние
+                    conn.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                        (mtime_ns, size, path),
+                    )
+                    continue
+
+                if rows is None:
+                    stats.skipped += 1
+                    stats.skipped_bytes += size
+                    rows = []
+                else:
+                    stats.parsed += 1
+                conn.execute("DELETE FROM refs WHERE source = ?", (path,))
+                conn.executemany(
+                    "INSERT INTO refs (source, pointer, ref, kind, target, fragment)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [(path,) + row for row in rows],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, mtime_ns, size, digest, len(rows), error),
+                )
+
+            if gone:
+                # Хеш удалённого файла — чтобы найти его на новом месте
+                conn.executemany(
+                    "INSERT OR REPLACE INTO removed VALUES (?, ?)",
+                    [(path, known[path][2]) for path in gone],
+                )
+                conn.executemany("DELETE FROM refs WHERE source = ?", [(path,) for path in gone])
+                conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in gone])
+                stats.removed = len(gone)
+
+            # Цель появилась или исчезла — вердикт ссылок на неё устарел
+            appeared = [(path,) for path in pending if path not in known]
+            conn.executemany("DELETE FROM removed WHERE path = ?", appeared)
+            conn.executemany("UPDATE refs SET verdict = NULL WHERE target = ?",
+                             appeared + [(path,) for path in gone])
+
+    def update(self, paths: List[PathLike]) -> RefreshStats:
+        """
+        Точечное обновление по списку путей (события наблюдателя за деревом).
+
+        Стоимость — только указанные файлы и их рёбра, без обхода дерева.
+        Каталог обходится целиком; исчезнувший путь удаляет из индекса
+        файл или все файлы бывшего каталога.
+        """
+        started = time.perf_counter()
+        stats = RefreshStats()
+        conn = self.conn
+
+        candidates: Dict[str, Optional[Tuple[int, int]]] = {}
+        for path in paths:
+            path = os.path.normpath(os.path.abspath(str(path)))
+            if path != str(self.root) and not path.startswith(str(self.root) + os.sep):
+                continue
+            relative = os.path.relpath(path, self.root)
+            if any(is_skipped_dir(part) for part in relative.split(os.sep)[:-1]):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                candidates[path] = None
+                low, high = _prefix_range(path)
+                for (inner,) in conn.execute(
+                    "SELECT path FROM files WHERE path >= ? AND path < ?", (low, high)
+                ):
+                    candidates[inner] = None
+                continue
+            if os.path.isdir(path):
+                # Новый node_modules / .cache / скрытый каталог после переноса —
+                # обход refresh() его не видит, здесь тоже пропускаем
+                if path != str(self.root) and is_skipped_dir(os.path.basename(path)):
+                    continue
+                for inner, mtime_ns, size in self.walk(path):
+                    candidates[inner] = (mtime_ns, size)
+                low, high = _prefix_range(path)
+                for (inner,) in conn.execute(
+                    "SELECT path FROM files WHERE path >= ? AND path < ?", (low, high)
+                ):
+                    candidates.setdefault(inner, None)
+            elif path.endswith(".json") and not os.path.basename(path).startswith("."):
+                candidates[path] = (st.st_mtime_ns, st.st_size)
+
+        known: Dict[str, Tuple[int, int, str]] = {}
+        for path in candidates:
+            row = conn.execute(
+                "SELECT mtime_ns, size, hash FROM files WHERE path = ?", (path,)
+            ).fetchone()
+            if row is not None:
+                known[path] = row
+
+        pending: Dict[str, Tuple[int, int]] = {}
+        gone: List[str] = []
+        for path, signature in candidates.items():
+            previous = known.get(path)
+            if signature is None:
+                if previous is not None:
+                    gone.append(path)
+                continue
+            stats.scanned += 1
+            if previous is not None and (previous[0], previous[1]) == signature:
+                continue
+            if previous is None:
+                stats.added += 1
+            else:
+                stats.changed += 1
+            pending[path] = signature
+
+        self._apply(pending, known, gone, stats, workers=1)
+
+        # stats.refs не считается: COUNT(*) — проход по всей таблице
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+    # ==================== Queries ====================
+
+    def _where(self, column: str, under: Optional[PathLike], clauses: List[str], params: List) -> None:
+        if under is not None:
+            low, high = _prefix_range(str(Path(under).resolve()))
+            clauses.append(f"{column} >= ? AND {column} < ?")
+            params.extend((low, high))
+
+    def file_paths(self, under: Optional[PathLike] = None, errors: bool = False) -> List[Path]:
+        """
+        Файлы индекса (отсортированы).
+
+        Args:
+            under: Только файлы внутри каталога
+            errors: Только файлы, которые не удалось разобрать
+        """
+        clauses: List[str] = []
+        params: List = []
+        self._where("path", under, clauses, params)
+        if errors:
+            clauses.append("error IS NOT NULL")
+        sql = "SELECT path FROM files"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return [Path(p) for (p,) in self.conn.execute(sql + " ORDER BY path", params)]
+
+    def file_errors(self, under: Optional[PathLike] = None) -> Dict[Path, str]:
+        """Ошибки разбора: путь → сообщение"""
+        clauses = ["error IS NOT NULL"]
+        params: List = []
+        self._where("path", under, clauses, params)
+        sql = "SELECT path, error FROM files WHERE " + " AND ".join(clauses) + " ORDER BY path"
+        return {Path(p): error for p, error in self.conn.execute(sql, params)}
+
+    def _select_refs(self, source: Optional[PathLike], kind: Optional[str],
+                     under: Optional[PathLike]) -> sqlite3.Cursor:
+        clauses: List[str] = []
+        params: List = []
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(str(Path(source).resolve()))
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        self._where("source", under, clauses, params)
+        sql = "SELECT source, pointer, ref FROM refs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self.conn.execute(sql + " ORDER BY source, rowid", params)
+
+    def refs(self, source: Optional[PathLike] = None, kind: Optional[str] = None,
+             under: Optional[PathLike] = None) -> List[Tuple[Path, str, str]]:
+        """
+        $ref рёбра в порядке (файл, документ).
+
+        Returns:
+            list: (файл, JSON Pointer объекта с $ref, значение $ref)
+        """
+        return [
+            (source_path, pointer, ref)
+            for source_path, refs in self.refs_by_file(source, kind, under).items()
+            for pointer, ref in refs
+        ]
+
+    def refs_by_file(self, source: Optional[PathLike] = None, kind: Optional[str] = None,
+                     under: Optional[PathLike] = None) -> Dict[Path, List[Tuple[str, str]]]:
+        """refs(), сгруппированные по файлу: файл → [(pointer, ref)]"""
+        grouped: Dict[Path, List[Tuple[str, str]]] = {}
+        current = None
+        bucket: List[Tuple[str, str]] = []
+        # Строки упорядочены по source — Path создаётся один раз на файл
+        for s, pointer, ref in self._select_refs(source, kind, under):
+            if s != current:
+                current = s
+                bucket = grouped[Path(s)] = []
+            bucket.append((pointer, ref))
+        return grouped
+
+    def ref_edges(self, under: Optional[PathLike] = None) -> List[Tuple[str, str, str, str, Optional[str], str]]:
+        """Строки refs без создания Path: (файл, pointer, ref, kind, цель, фрагмент) — для графа $ref"""
+        clauses: List[str] = []
+        params: List = []
+        self._where("source", under, clauses, params)
+        sql = "SELECT source, pointer, ref, kind, target, fragment FROM refs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self.conn.execute(sql + " ORDER BY source, rowid", params).fetchall()
+
+    # ==================== Verdicts ====================
+
+    def verdicts(self, under: Optional[PathLike] = None, version: str = "") -> Dict[str, List[tuple]]:
+        """
+        Рёбра с сохранёнными вердиктами проверки, сгруппированные по файлу.
+
+        Args:
+            under: Только файлы внутри каталога
+            version: Версия проверяющего кода; при смене все вердикты сбрасываются
+
+        Returns:
+            dict: путь файла (str) → [(source, rowid, pointer, ref, target, verdict, message)];
+            verdict = None — ссылку нужно проверить заново
+        """
+        conn = self.conn
+        row = conn.execute("SELECT value FROM meta WHERE key = 'verdict_version'").fetchone()
+        if row is None or row[0] != version:
+            with conn:
+                conn.execute("UPDATE refs SET verdict = NULL, message = NULL")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('verdict_version', ?)", (version,))
+
+        clauses: List[str] = []
+        params: List = []
+        self._where("source", under, clauses, params)
+        sql = "SELECT source, rowid, pointer, ref, target, verdict, message FROM refs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+
+        # Ключи — строки: на полном дереве Path на каждый файл заметно дороже запроса
+        grouped: Dict[str, List[tuple]] = {}
+        current = None
+        bucket: List[tuple] = []
+        for row in conn.execute(sql + " ORDER BY source, rowid", params).fetchall():
+            if row[0] != current:
+                current = row[0]
+                bucket = grouped[current] = []
+            bucket.append(row)
+        return grouped
+
+    def store_verdicts(self, rows: List[Tuple[str, Optional[str], int]]) -> None:
+        """Сохраняет вердикты: [(verdict, message, rowid)]"""
+        if rows:
+            with self.conn:
+                self.conn.executemany("UPDATE refs SET verdict = ?, message = ? WHERE rowid = ?", rows)
+
+    def referrers(self, target: PathLike) -> List[Tuple[Path, str, str]]:
+        """Кто ссылается на файл: (файл, JSON Pointer, значение $ref)"""
+        return [
+            (Path(s), pointer, ref)
+            for s, pointer, ref in self.conn.execute(
+                "SELECT source, pointer, ref FROM refs WHERE target = ? ORDER BY source, rowid",
+                (os.path.normpath(str(target)),),
+            )
+        ]
+
+    def moved_to(self, path: PathLike) -> List[Path]:
+        """
+        Где теперь файл, удалённый с path: текущие файлы с тем же содержимым.
+
+        Пусто, если файл не удалялся после построения индекса или
+        его содержимое изменилось при перемещении.
+        """
+        rows = self.conn.execute(
+            "SELECT f.path FROM removed r JOIN files f ON f.hash = r.hash"
+            " WHERE r.path = ? ORDER BY f.path",
+            (os.path.normpath(str(path)),),
+        )
+        return [Path(p) for (p,) in rows]
+
+    def existing_files(self) -> Set[str]:
+        """Пути всех JSON файлов дерева на момент последнего refresh()"""
+        return {p for (p,) in self.conn.execute("SELECT path FROM files")}
+
+    def counts(self) -> Dict[str, int]:
+        """Сводка: файлы, ошибки разбора, рёбра по видам"""
+        conn = self.conn
+        summary = {
+            "files": conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            "errors": conn.execute("SELECT COUNT(*) FROM files WHERE error IS NOT NULL").fetchone()[0],
+        }
+        for kind, count in conn.execute("SELECT kind, COUNT(*) FROM refs GROUP BY kind ORDER BY kind"):
+            summary[kind] = count
+        return summary
+
+    # ==================== Lifecycle ====================
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "RefIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_index(path: PathLike, db_path: Optional[PathLike] = None) -> RefIndex:
+    """
+    Индекс для пути внутри front-middle-schema.
+
+    Индекс всегда строится от корня проекта, чтобы все скрипты делили
+    одну базу; если путь вне проекта — от самого пути.
+    """
+    path = Path(path).resolve()
+    root = find_project_root(path)
+    if root != path and root not in path.parents:
+        root = path
+    return RefIndex(root, db_path)
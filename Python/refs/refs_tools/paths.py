@@ -0,0 +1,74 @@
+"""
+Path Cache
+==========
+Мемоизированные проверки существования и resolve() для целей $ref.
+
+- Множество файлов из обхода дерева (индекс) — попадание без stat()
+- Промах — один os.path.exists на путь за весь запуск
+- resolve() запоминается по паре (каталог источника, ссылка): популярные
+  атомы (Spacing.json, Typography.json) резолвятся один раз на каталог
+
+Usage:
+    paths = PathCache(index.existing_files())
+    if not paths.exists(target):
+        ...
+    absolute = paths.resolve(source_file.parent, "../atoms/Color/v1/Color.json")
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Tuple, Union
+
+PathLike = Union[str, Path]
+
+
+class PathCache:
+    """
+    Кеш файловой системы на время одного запуска.
+
+    Args:
+        files: Известные существующие файлы (абсолютные пути) — обычно
+               index.existing_files(); пустое множество — только мемоизация
+    """
+
+    def __init__(self, files: Iterable[str] = ()):
+        self.files = set(files)
+        self._exists: Dict[str, bool] = {}
+        self._resolved: Dict[Tuple[str, str], Path] = {}
+
+        self.hits = 0
+        self.stats = 0  # Реальных обращений к файловой системе
+
+    def exists(self, path: PathLike) -> bool:
+        """Path(path).exists() без повторных stat() одного пути"""
+        path = str(path)
+        if path in self.files:
+            self.hits += 1
+            return True
+        known = self._exists.get(path)
+        if known is not None:
+            self.hits += 1
+            return known
+        normalized = os.path.normpath(path)
+        if normalized in self.files:
+            self.hits += 1
+            found = True
+        else:
+            self.stats += 1
+            found = os.path.exists(path)
+        self._exists[path] = found
+        return found
+
+    def resolve(self, source_dir: PathLike, ref: str) -> Path:
+        """(Path(source_dir) / ref).resolve(), один раз на пару (каталог, ссылка)"""
+        key = (str(source_dir), ref)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            self.stats += 1
+            resolved = self._resolved[key] = (Path(source_dir) / ref).resolve()
+        else:
+            self.hits += 1
+        return resolved
+
+    def __str__(self) -> str:
+        return f"{self.hits} из кеша, {self.stats} обращений к диску"
@@ -0,0 +1,389 @@
+"""
+Fix Pipeline
+============
+Все исправления $ref за один проход: файл читается один раз, его ссылки
+проходят через цепочку стадий, файл пишется не больше одного раза.
+
+Стадии (в порядке применения; каждая получает результат предыдущей):
+- extra-slash:   file:////path → file:///path         (fix_extra_slash)
+- missing-slash: file://Users/... → file:///Users/...  (fix_refs_missing_slash)
+- add-json:      ../Color → ../Color.json, фрагмент сохраняется   (fix_schema_refs)
+- absolute:      относительная ссылка на существующий файл → file:///   (convert_to_absolute_refs,
+                 sdui_refs_to_absolute, universal_refs_converter)
+- broken:        file:/// на несуществующий файл → файл с тем же содержимым
+                 (индекс, moved_to) или с самым длинным общим хвостом пути (fix_broken_refs)
+
+- С индексом цепочка сначала считается по значениям $ref из индекса:
+  читаются только файлы, в которых что-то изменится
+- Заменяются только значения "$ref" (rewrite_refs) — форматирование сохраняется
+- Невалидный JSON не трогается, как и в отдельных скриптах
+- Запись — через RewriteTransaction (или сразу, без транзакции)
+- Счётчики на каждую стадию: ссылок и файлов, которые она изменила
+
+Usage:
+    pipeline = FixPipeline(base_path, build_stages(["add-json", "absolute"]), index=index)
+    stats = pipeline.run()
+    for stage in pipeline.stages:
+        print(stage)
+"""
+
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Union
+
+from .config import CONVERT_DIRS, is_skipped_dir
+from .index import RefIndex
+from .paths import PathCache
+from .prefilter import PrefilterStats, contains_ref
+from .refs import REF_EXTERNAL, REF_FILE, REF_INTERNAL, REF_RELATIVE, ref_kind, ref_target, split_ref
+from .rewrite import rewrite_refs
+from .suffix import PathSuffixTrie, common_suffix
+from .transaction import RewriteTransaction
+
+PathLike = Union[str, Path]
+
+_EXTRA_SLASH = re.compile(r"^file:////+")
+
+
+@dataclass
+class FixContext:
+    """Общие ресурсы стадий на один запуск"""
+    root: Path
+    index: Optional[RefIndex] = None
+    paths: PathCache = field(default_factory=PathCache)
+    _trie: Optional[PathSuffixTrie] = None
+
+    @property
+    def trie(self) -> PathSuffixTrie:
+        """Все JSON файлы дерева по хвостам путей — строится при первом обращении"""
+        if self._trie is None:
+            if self.index is not None:
+                files = self.index.file_paths(under=self.root)
+            else:
+                files = _walk(self.root)
+            self._trie = PathSuffixTrie(files)
+        return self._trie
+
+
+class FixStage:
+    """
+    Стадия конвейера: fix(ref, source) → новое значение $ref.
+
+    Стадия не пишет файлы и не печатает — только меняет значение
+    и считает свои замены (refs — ссылок, files — файлов).
+    """
+
+    name = ""
+    description = ""
+
+    def __init__(self):
+        self.refs = 0
+        self.files = 0
+        self.context: Optional[FixContext] = None
+
+    def prepare(self, context: FixContext) -> None:
+        self.context = context
+
+    def fix(self, ref: str, source: Path) -> str:
+        return ref
+
+    def count(self, ref: str, new_ref: str) -> None:
+        """Замена ref → new_ref попала в файл"""
+        self.refs += 1
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.refs} ссылок в {self.files} файлах"
+
+
+class ExtraSlashStage(FixStage):
+    name = "extra-slash"
+    description = "file://// → file:///"
+
+    def fix(self, ref: str, source: Path) -> str:
+        if ref.startswith("file:////"):
+            return _EXTRA_SLASH.sub("file:///", ref)
+        return ref
+
+
+class MissingSlashStage(FixStage):
+    name = "missing-slash"
+    description = "file://Users → file:///Users"
+
+    def fix(self, ref: str, source: Path) -> str:
+        if ref.startswith("file://") and not ref.startswith("file:///"):
+            return "file:///" + ref[7:]
+        return ref
+
+
+class AddJsonStage(FixStage):
+    name = "add-json"
+    description = "../Color → ../Color.json"
+
+    def fix(self, ref: str, source: Path) -> str:
+        kind = ref_kind(ref)
+        if kind == REF_INTERNAL or kind == REF_EXTERNAL:
+            return ref
+        uri, fragment = split_ref(ref)
+        if not uri or uri.endswith(".json") or uri.endswith("/"):
+            return ref
+        return uri + ".json" + ("#" + fragment if "#" in ref else "")
+
+
+class AbsoluteStage(FixStage):
+    name = "absolute"
+    description = "относительные → file:/// (если файл существует)"
+
+    def fix(self, ref: str, source: Path) -> str:
+        if ref_kind(ref) != REF_RELATIVE:
+            return ref
+        # normpath, как у целей в индексе: realpath на каждую ссылку — основная цена прохода
+        _kind, target, _fragment = ref_target(ref, str(source.parent))
+        if target is None or not self.context.paths.exists(target):
+            return ref
+        return f"file://{Path(target).as_posix()}" + ref[len(split_ref(ref)[0]):]
+
+
+class BrokenRefStage(FixStage):
+    name = "broken"
+    description = "file:/// на несуществующий файл → найденный файл"
+
+    def __init__(self):
+        super().__init__()
+        self.found_by_hash = 0
+        self.found_by_suffix = 0
+        # Путь битой цели → (найденный файл, "hash" / "suffix") или None
+        self._found: Dict[str, Optional[tuple]] = {}
+
+    def find(self, path: str) -> Optional[Path]:
+        """Новое место файла: по содержимому (индекс), иначе по хвосту пути"""
+        if path not in self._found:
+            self._found[path] = self._search(path)
+        found = self._found[path]
+        return found[0] if found else None
+
+    def _search(self, path: str) -> Optional[tuple]:
+        index = self.context.index
+        if index is not None:
+            moved = index.moved_to(path)
+            if moved:
+                parts = Path(path).parts
+                return max(moved, key=lambda candidate: common_suffix(parts, candidate.parts)), "hash"
+        match = self.context.trie.match(path)
+        if match.depth >= 2 or (match.depth == 1 and match.count == 1):
+            return match.path, "suffix"
+        return None
+
+    def count(self, ref: str, new_ref: str) -> None:
+        super().count(ref, new_ref)
+        found = self._found.get(split_ref(ref)[0][7:])
+        if found and found[1] == "hash":
+            self.found_by_hash += 1
+        elif found:
+            self.found_by_suffix += 1
+
+    def fix(self, ref: str, source: Path) -> str:
+        if ref_kind(ref) != REF_FILE or not ref.startswith("file:///") or ref.startswith("file:////"):
+            return ref
+        uri, fragment = split_ref(ref)
+        path = uri[7:]
+        if self.context.paths.exists(path):
+            return ref
+        found = self.find(path)
+        if found is None:
+            return ref
+        return f"file://{found.as_posix()}" + ("#" + fragment if "#" in ref else "")
+
+    def __str__(self) -> str:
+        text = super().__str__()
+        if self.found_by_hash or self.found_by_suffix:
+            text += f" (по содержимому: {self.found_by_hash}, по пути: {self.found_by_suffix})"
+        return text
+
+
+# Порядок — порядок применения
+STAGES = {
+    stage.name: stage
+    for stage in (ExtraSlashStage, MissingSlashStage, AddJsonStage, AbsoluteStage, BrokenRefStage)
+}
+
+
+def build_stages(names: Optional[Iterable[str]] = None) -> List[FixStage]:
+    """
+    Стадии по именам в порядке STAGES (порядок аргумента не важен).
+
+    Raises:
+        ValueError: Неизвестная стадия
+    """
+    if names is None:
+        return [stage() for stage in STAGES.values()]
+    names = set(names)
+    unknown = names - set(STAGES)
+    if unknown:
+        raise ValueError(f"Неизвестные стадии: {', '.join(sorted(unknown))}; "
+                         f"есть: {', '.join(STAGES)}")
+    return [stage() for name, stage in STAGES.items() if name in names]
+
+
+def _walk(root: Path) -> List[Path]:
+    """Все *.json каталога без служебных (когда индекса нет)"""
+    found = []
+    for current, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if not is_skipped_dir(d))
+        found.extend(Path(current) / name for name in sorted(files)
+                     if name.endswith(".json") and not name.startswith("."))
+    return found
+
+
+@dataclass
+class PipelineStats:
+    """Итоги запуска"""
+    files: int = 0       # Файлов в обработанных каталогах
+    read: int = 0        # Прочитано (с индексом — только те, что изменятся)
+    changed: int = 0     # Изменено (или изменилось бы в dry run)
+    refs: int = 0        # Изменённых ссылок (после всех стадий)
+    invalid: int = 0     # Невалидный JSON — пропущен
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.files} файлов, {self.read} прочитано, {self.changed} изменено, "
+                f"{self.refs} ссылок, {self.invalid} невалидных, {self.elapsed:.2f}s")
+
+
+class FixPipeline:
+    """
+    Один проход по дереву со всеми включёнными стадиями.
+
+    Args:
+        root: Корень front-middle-schema
+        stages: Стадии (build_stages)
+        index: Общий индекс $ref — отбор файлов без чтения
+        transaction: Пакетная запись (None — каждый файл пишется сразу)
+        dry_run: Ничего не писать
+    """
+
+    def __init__(self, root: PathLike, stages: Sequence[FixStage],
+                 index: Optional[RefIndex] = None,
+                 transaction: Optional[RewriteTransaction] = None,
+                 dry_run: bool = False):
+        self.root = Path(root).resolve()
+        self.stages = list(stages)
+        self.index = index
+        self.transaction = transaction
+        self.dry_run = dry_run
+        self.stats = PipelineStats()
+        self.prefilter = PrefilterStats()
+        self.errors: List[str] = []
+        self.changes: Dict[Path, List[tuple]] = {}  # Файл → [(было, стало)]
+
+        existing = index.existing_files() if index is not None else ()
+        self.context = FixContext(self.root, index, PathCache(existing))
+        for stage in self.stages:
+            stage.prepare(self.context)
+
+    # ==================== Refs ====================
+
+    def fix_ref(self, ref: str, source: Path, touched: Optional[Set[FixStage]] = None) -> str:
+        """Значение после всех стадий; touched — стадии, изменившие ссылку (и счётчики)"""
+        for stage in self.stages:
+            new_ref = stage.fix(ref, source)
+            if new_ref != ref:
+                if touched is not None:
+                    stage.count(ref, new_ref)
+                    touched.add(stage)
+                ref = new_ref
+        return ref
+
+    def _will_change(self, source: Path, refs: List[tuple]) -> bool:
+        """По рёбрам индекса: изменит ли цепочка хоть одну ссылку файла (без счётчиков)"""
+        return any(self.fix_ref(ref, source) != ref for _pointer, ref in refs)
+
+    # ==================== Files ====================
+
+    def candidates(self, dirs: Optional[Sequence[str]] = None) -> List[Path]:
+        """
+        Файлы для чтения: с индексом — только те, где цепочка что-то изменит.
+
+        Args:
+            dirs: Каталоги от корня (по умолчанию CONVERT_DIRS и JSON в корне)
+        """
+        roots = [self.root / d for d in (dirs or CONVERT_DIRS)]
+        roots = [r for r in roots if r.is_dir()]
+        files: List[Path] = []
+        if self.index is None:
+            for directory in roots:
+                files.extend(_walk(directory))
+            if not dirs:
+                files.extend(sorted(self.root.glob("*.json")))
+            self.stats.files = len(files)
+            return files
+
+        selected: List[Path] = []
+        for directory in roots:
+            files.extend(self.index.file_paths(under=directory))
+            for source, refs in self.index.refs_by_file(under=directory).items():
+                if self._will_change(source, refs):
+                    selected.append(source)
+        if not dirs:
+            top = [p for p in self.index.file_paths(under=self.root) if p.parent == self.root]
+            files.extend(top)
+            for source in top:
+                if self._will_change(source, self.index.refs_by_file(source=source).get(source, [])):
+                    selected.append(source)
+        self.stats.files = len(files)
+        return selected
+
+    def process_file(self, path: Path) -> int:
+        """Все стадии над файлом; возвращает число изменённых ссылок"""
+        if not contains_ref(path, self.prefilter):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            self.errors.append(f"{path}: {e}")
+            return 0
+        self.stats.read += 1
+        try:
+            json.loads(content)  # Невалидный JSON не трогаем
+        except ValueError:
+            self.stats.invalid += 1
+            return 0
+
+        touched: Set[FixStage] = set()
+        changes: List[tuple] = []
+
+        def replace(ref: str) -> str:
+            new_ref = self.fix_ref(ref, path, touched)
+            if new_ref != ref:
+                changes.append((ref, new_ref))
+            return new_ref
+
+        new_content, changed = rewrite_refs(content, replace)
+        if not changed:
+            return 0
+
+        for stage in touched:
+            stage.files += 1
+        self.changes[path] = changes
+        self.stats.changed += 1
+        self.stats.refs += changed
+
+        if not self.dry_run:
+            if self.transaction is not None:
+                self.transaction.stage(path, new_content)
+            else:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(new_content)
+        return changed
+
+    def run(self, dirs: Optional[Sequence[str]] = None) -> PipelineStats:
+        """Один проход: отбор файлов, стадии, запись (транзакция — commit() вызывающего)"""
+        started = time.perf_counter()
+        for path in self.candidates(dirs):
+            self.process_file(path)
+        self.stats.elapsed = time.perf_counter() - started
+        return self.stats
@@ -0,0 +1,77 @@
+"""
+Byte Prefilter
+==============
+Быстрая проверка файла на наличие "$ref" до json.loads.
+
+- Файл отображается в память (mmap) и ищется байтовая подстрока —
+  без декодирования UTF-8 и без разбора JSON
+- Файлы без маркера пропускаются целиком: ни разбора, ни обхода
+- Ключ, записанный escape-последовательностями ("\\u0024ref"),
+  не распознаётся — в схемах front-middle-schema такого нет
+
+Usage:
+    stats = PrefilterStats()
+    if contains_ref(path, stats):
+        data = json.load(open(path))
+    print(stats)
+"""
+
+import mmap
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+# Ключ $ref в JSON — всегда в кавычках
+REF_MARKER = b'"$ref"'
+
+
+@dataclass
+class PrefilterStats:
+    """Сколько файлов проверено и сколько пропущено без разбора"""
+    checked: int = 0
+    skipped: int = 0
+    skipped_bytes: int = 0
+    label: str = "$ref"  # Что искали — для отчёта
+
+    def merge(self, other: "PrefilterStats") -> None:
+        """Добавляет статистику воркера"""
+        self.checked += other.checked
+        self.skipped += other.skipped
+        self.skipped_bytes += other.skipped_bytes
+
+    def __str__(self) -> str:
+        return (f"{self.skipped}/{self.checked} файлов без {self.label} пропущено "
+                f"({self.skipped_bytes / 1024:.1f} KB не разобрано)")
+
+
+def contains_marker(path: Union[str, Path], marker: bytes = REF_MARKER,
+                    stats: Optional[PrefilterStats] = None) -> bool:
+    """
+    Есть ли в файле байтовая подстрока marker.
+
+    Ошибка чтения — True: решение о файле остаётся за вызывающим кодом,
+    который и сообщит об ошибке как раньше.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                found = False  # mmap не отображает пустые файлы
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    found = view.find(marker) != -1
+    except (OSError, ValueError):
+        return True
+
+    if stats is not None:
+        stats.checked += 1
+        if not found:
+            stats.skipped += 1
+            stats.skipped_bytes += size
+    return found
+
+
+def contains_ref(path: Union[str, Path], stats: Optional[PrefilterStats] = None) -> bool:
+    """Есть ли в файле хотя бы один "$ref" """
+    return contains_marker(path, REF_MARKER, stats)
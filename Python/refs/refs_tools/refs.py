@@ -0,0 +1,101 @@
+"""
+$ref Parsing
+============
+Разбор значений $ref и итеративный обход JSON схемы.
+
+Виды ссылок:
+- internal: #/definitions/...
+- external: http:// и https://
+- file:     file:///abs/path.json[#/pointer]
+- relative: ../atoms/Color/Color.json[#/pointer]
+"""
+
+import os
+from typing import Any, Iterator, Optional, Tuple
+
+REF_INTERNAL = "internal"
+REF_EXTERNAL = "external"
+REF_FILE = "file"
+REF_RELATIVE = "relative"
+
+
+def escape_pointer_token(token: Any) -> str:
+    """Экранирует сегмент JSON Pointer (RFC 6901): ~ → ~0, / → ~1"""
+    token = str(token)
+    if "~" in token or "/" in token:
+        token = token.replace("~", "~0").replace("/", "~1")
+    return token
+
+
+def iter_refs(data: Any) -> Iterator[Tuple[str, str]]:
+    """
+    Все $ref документа в порядке документа.
+
+    Обход итеративный — глубина схемы не ограничена рекурсией.
+
+    Yields:
+        tuple: (JSON Pointer объекта с $ref, значение $ref)
+    """
+    stack = [(data, "")]
+    while stack:
+        obj, pointer = stack.pop()
+        if type(obj) is dict:
+            ref = obj.get("$ref")
+            if type(ref) is str:
+                yield pointer, ref
+            children = [
+                (value, pointer + "/" + escape_pointer_token(key))
+                for key, value in obj.items()
+                if key != "$ref" and (type(value) is dict or type(value) is list)
+            ]
+            stack.extend(reversed(children))
+        elif type(obj) is list:
+            for i in range(len(obj) - 1, -1, -1):
+                item = obj[i]
+                if type(item) is dict or type(item) is list:
+                    stack.append((item, f"{pointer}/{i}"))
+
+
+def ref_kind(ref: str) -> str:
+    if ref.startswith("#"):
+        return REF_INTERNAL
+    if ref.startswith("http://") or ref.startswith("https://"):
+        return REF_EXTERNAL
+    if ref.startswith("file:"):
+        return REF_FILE
+    return REF_RELATIVE
+
+
+def split_ref(ref: str) -> Tuple[str, str]:
+    """'path.json#/definitions/x' → ('path.json', '/definitions/x')"""
+    uri, _, fragment = ref.partition("#")
+    return uri, fragment
+
+
+def ref_target(ref: str, source_dir: str) -> Tuple[str, Optional[str], str]:
+    """
+    Куда указывает ссылка.
+
+    Args:
+        ref: Значение $ref
+        source_dir: Каталог файла, в котором стоит ссылка
+
+    Returns:
+        tuple: (kind, абсолютный путь файла или None, фрагмент без '#').
+        Для internal путь — None (цель в том же файле);
+        для file:////... (4 слэша) и file://host/... путь — None.
+    """
+    kind = ref_kind(ref)
+    uri, fragment = split_ref(ref)
+
+    if kind == REF_FILE:
+        if uri.startswith("file:///") and not uri.startswith("file:////"):
+            return kind, uri[7:], fragment
+        return kind, None, fragment
+    if kind == REF_RELATIVE:
+        if not uri:
+            return kind, None, fragment
+        if uri.startswith("/"):
+            return kind, os.path.normpath(uri), fragment
+        return kind, os.path.normpath(os.path.join(source_dir, uri)), fragment
+    return kind, None, fragment
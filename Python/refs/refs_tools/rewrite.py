@@ -0,0 +1,82 @@
+"""
+Span Rewriter
+=============
+Замена значений "$ref" на месте — без json.dump всего документа.
+
+- Строки JSON проходятся по порядку одним регулярным выражением: вне строк
+  кавычек нет, поэтому границы строк не сбиваются и "$ref" внутри
+  описаний не принимается за ключ
+- Заменяются только символы строк-значений ключа "$ref": отступы, порядок
+  ключей, \\uXXXX и перевод строки в конце файла остаются как были
+- Работа и diff пропорциональны числу изменённых ссылок, а не размеру файла
+- Ключ, записанный escape-последовательностями ("\\u0024ref"), и $ref
+  со значением не-строкой не распознаются и не меняются
+
+Usage:
+    new_text, changed = rewrite_refs(text, lambda ref: ref + ".json")
+    if changed:
+        path.write_text(new_text, encoding="utf-8")
+"""
+
+import json
+import re
+from typing import Callable, List, NamedTuple, Tuple
+
+# Строка JSON (развёрнутый цикл — без катастрофического возврата);
+# первая альтернатива — ключ "$ref" и его строковое значение
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_TOKEN = re.compile(r'"\$ref"\s*:\s*(' + _STRING + r')|' + _STRING, re.S)
+
+
+class RefSpan(NamedTuple):
+    """Строка-значение "$ref" в тексте: [start, end) с кавычками"""
+    start: int
+    end: int
+    value: str
+
+
+def _decode(token: str) -> str:
+    """Значение строки JSON (с кавычками)"""
+    if "\\" not in token:
+        return token[1:-1]
+    return json.loads(token)
+
+
+def ref_spans(text: str) -> List[RefSpan]:
+    """Все строковые значения "$ref" в порядке документа"""
+    if '"$ref"' not in text:
+        return []
+    return [
+        RefSpan(m.start(1), m.end(1), _decode(m.group(1)))
+        for m in _TOKEN.finditer(text)
+        if m.lastindex
+    ]
+
+
+def rewrite_refs(text: str, replace: Callable[[str], str]) -> Tuple[str, int]:
+    """
+    Заменяет значения "$ref", не трогая остальной текст.
+
+    Args:
+        text: Исходный JSON
+        replace: Новое значение по старому; то же значение — ссылка не меняется
+
+    Returns:
+        tuple: (новый текст, число изменённых ссылок)
+    """
+    parts: List[str] = []
+    position = 0
+    changed = 0
+    for span in ref_spans(text):
+        new_value = replace(span.value)
+        if new_value == span.value:
+            continue
+        parts.append(text[position:span.start])
+        parts.append(json.dumps(new_value, ensure_ascii=False))
+        position = span.end
+        changed += 1
+
+    if not changed:
+        return text, 0
+    parts.append(text[position:])
+    return "".join(parts), changed
@@ -0,0 +1,105 @@
+"""
+Strongly Connected Components
+=============================
+Сильно связные компоненты (Tarjan, итеративно) и путь цикла внутри
+компоненты для графа {узел: [соседи]}.
+
+Один модуль на два пакета: refs_tools/graph.py (граф $ref) и
+sdui_tools/graph.py в jinja_hot_reload (граф computed, подключён
+симлинком sdui_tools/scc.py). Поэтому здесь только стандартная
+библиотека и никаких относительных импортов.
+
+Usage:
+    for component in strongly_connected(nodes, edges):
+        if len(component) > 1 or component[0] in edges[component[0]]:
+            print(cycle_path(component, edges))
+"""
+
+from collections import deque
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, TypeVar
+
+Node = TypeVar("Node", bound=Hashable)
+
+
+def strongly_connected(nodes: Iterable[Node], edges: Dict[Node, List[Node]]) -> List[List[Node]]:
+    """
+    Сильно связные компоненты (Tarjan, без рекурсии).
+
+    Компоненты отдаются в обратном топологическом порядке: каждая
+    компонента — после всех, до которых из неё можно дойти.
+    """
+    index_of: Dict[Node, int] = {}
+    low: Dict[Node, int] = {}
+    on_stack = set()
+    stack: List[Node] = []
+    components: List[List[Node]] = []
+    counter = 0
+
+    for start in nodes:
+        if start in index_of:
+            continue
+
+        index_of[start] = low[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        work = [(start, iter(edges.get(start, ())))]
+
+        while work:
+            node, successors = work[-1]
+            descended = False
+            for succ in successors:
+                if succ not in index_of:
+                    index_of[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(edges.get(succ, ()))))
+                    descended = True
+                    break
+                if succ in on_stack and index_of[succ] < low[node]:
+                    low[node] = index_of[succ]
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+
+            if low[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+def cycle_path(component: List[Node], edges: Dict[Node, List[Node]],
+               key: Optional[Callable[[Node], object]] = None) -> List[Node]:
+    """Один цикл внутри компоненты, начиная с наименьшего (по key) узла"""
+    members = set(component)
+    start = min(component, key=key)
+
+    # BFS по компоненте до ребра обратно в start
+    parent: Dict[Node, Optional[Node]] = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for succ in edges.get(node, ()):
+            if succ == start:
+                path = [node]
+                while parent[path[-1]] is not None:
+                    path.append(parent[path[-1]])
+                path.reverse()
+                return path
+            if succ in members and succ not in parent:
+                parent[succ] = node
+                queue.append(succ)
+    return [start]
@@ -0,0 +1,89 @@
+"""
+Path Suffix Trie
+================
+Поиск файла по самому длинному общему хвосту пути.
+
+- Префиксное дерево по компонентам пути в обратном порядке:
+  имя файла → каталог версии → компонент → ...
+- Узел хранит первый путь поддерева (порядок добавления) и число путей —
+  поиск проходит путь один раз, O(глубины пути), без перебора кандидатов
+- Совпадает с прежним подсчётом «общих частей с конца»: из кандидатов
+  с максимальным хвостом выбирается первый добавленный
+
+Usage:
+    trie = PathSuffixTrie(index.file_paths())
+    match = trie.match("/old/place/SDUI/atoms/Text/v1/TextContent.json")
+    if match.depth >= 2 or match.count == 1:
+        print(match.path)
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Union
+
+PathLike = Union[str, Path]
+
+
+class SuffixMatch(NamedTuple):
+    """Результат поиска: общий хвост в компонентах, первый путь, сколько путей с таким хвостом"""
+    depth: int
+    path: Optional[Path]
+    count: int
+
+
+class _Node:
+    __slots__ = ("children", "first", "count")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.first: Optional[Path] = None
+        self.count = 0
+
+
+class PathSuffixTrie:
+    """
+    Пути, сгруппированные по общим хвостам.
+
+    Args:
+        paths: Известные файлы (обычно все JSON файлы проекта)
+    """
+
+    def __init__(self, paths: Iterable[PathLike] = ()):
+        self._root = _Node()
+        self.size = 0
+        for path in paths:
+            self.add(path)
+
+    def add(self, path: PathLike) -> None:
+        path = Path(path)
+        node = self._root
+        for part in reversed(path.parts):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _Node()
+            if child.first is None:
+                child.first = path
+            child.count += 1
+            node = child
+        self.size += 1
+
+    def match(self, path: PathLike) -> SuffixMatch:
+        """Самый длинный общий хвост path с известными путями"""
+        node = self._root
+        depth = 0
+        for part in reversed(Path(path).parts):
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+            depth += 1
+        return SuffixMatch(depth, node.first, node.count)
+
+
+def common_suffix(a: Sequence[str], b: Sequence[str]) -> int:
+    """Число совпадающих компонентов с конца"""
+    common = 0
+    for x, y in zip(reversed(a), reversed(b)):
+        if x != y:
+            break
+        common += 1
+    return common
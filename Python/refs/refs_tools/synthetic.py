@@ -0,0 +1,217 @@
+"""
+Synthetic Schema Tree
+=====================
+Детерминированное дерево схем в раскладке front-middle-schema — для
+замеров refs скриптов без настоящего checkout.
+
+- Раскладка как в SDUI: atoms/<Name>/v1, actions/<Name>,
+  functions/<group>/<Name>/v1, layouts/<Name>/v1 (+ samples),
+  components/<Name>/v1..v3 (+ samples)
+- Ссылки — только на ранее созданные схемы (граф без циклов), кроме
+  добавленных обратных рёбер (cycle_rate); доля битых — broken_rate
+  (цель не существует); доля относительных против file:/// — relative_rate;
+  часть ссылок с фрагментом #/definitions/value и внутренние "#/..."
+- Примеры (samples) — JSON без $ref, как настоящие
+- Один seed — одно и то же дерево (file:/// ссылки содержат корень)
+
+Usage:
+    stats = generate_tree("/tmp/fms/front-middle-schema", TreeSpec(files=10000, seed=1))
+    print(stats)
+"""
+
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Set, Tuple, Union
+
+PathLike = Union[str, Path]
+
+# Доли схем по категориям (остальное — компоненты)
+CATEGORY_SHARES = (
+    ("atoms", 0.10),
+    ("actions", 0.05),
+    ("functions", 0.10),
+    ("layouts", 0.05),
+)
+FUNCTION_GROUPS = ("collection", "data", "mathematical", "string")
+
+
+@dataclass
+class TreeSpec:
+    """Параметры дерева"""
+    files: int = 1000           # Всего JSON файлов (схемы + примеры)
+    refs_per_file: float = 8.0  # Среднее число $ref на схему
+    broken_rate: float = 0.01   # Доля ссылок на несуществующие файлы
+    cycle_rate: float = 0.01    # Доля схем с обратным ребром (цикл длины 2)
+    relative_rate: float = 0.5  # Доля относительных ссылок (остальные — file:///)
+    internal_rate: float = 0.1  # Доля внутренних "#/definitions/..."
+    samples: int = 2            # Примеров на версию компонента / layout
+    seed: int = 0
+
+
+@dataclass
+class TreeStats:
+    """Что получилось"""
+    schemas: int = 0
+    samples: int = 0
+    refs: int = 0
+    broken: int = 0
+    cycles: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def files(self) -> int:
+        return self.schemas + self.samples
+
+    def __str__(self) -> str:
+        return (f"{self.files} файлов ({self.schemas} схем, {self.samples} примеров), "
+                f"{self.refs} $ref, {self.broken} битых, {self.cycles} циклов, "
+                f"{self.bytes / 1024 / 1024:.1f} MB, {self.elapsed:.2f}s")
+
+
+class _Schema:
+    __slots__ = ("path", "name", "samples", "refs")
+
+    def __init__(self, path: str, name: str, samples: int):
+        self.path = path          # От корня, через '/'
+        self.name = name
+        self.samples = samples
+        self.refs: List[Tuple[str, str]] = []  # (вид, путь цели от корня или "#...")
+
+
+def _plan(spec: TreeSpec, rng: random.Random) -> List[_Schema]:
+    """Схемы в порядке создания: сначала атомы, потом всё, что может на них ссылаться"""
+    schemas: List[_Schema] = []
+    total = 0
+    counters: Dict[str, int] = {}
+
+    def add(path: str, name: str, samples: int) -> None:
+        nonlocal total
+        schemas.append(_Schema(path, name, samples))
+        total += 1 + samples
+
+    # Доли — от общего числа файлов; остаток бюджета уходит компонентам
+    for category, share in CATEGORY_SHARES:
+        count = max(1, int(spec.files * share))
+        for _ in range(count):
+            if total >= spec.files:
+                break
+            n = counters[category] = counters.get(category, 0) + 1
+            if category == "atoms":
+                name = f"Atom{n}"
+                add(f"SDUI/atoms/{name}/v1/{name}.json", name, 0)
+            elif category == "actions":
+                name = f"Synthetic{n}Action"
+                add(f"SDUI/actions/{name}/{name}.json", name, 0)
+            elif category == "functions":
+                name = f"Func{n}"
+                group = FUNCTION_GROUPS[n % len(FUNCTION_GROUPS)]
+                add(f"SDUI/functions/{group}/{name}/v1/{name}.json", name, 0)
+            else:
+                name = f"Synthetic{n}Wrapper"
+                add(f"SDUI/layouts/{name}/v1/{name}.json", name, spec.samples)
+
+    n = 0
+    while total < spec.files:
+        n += 1
+        name = f"Synthetic{n}View"
+        for version in range(1, rng.randint(1, 3) + 1):
+            if total >= spec.files:
+                break
+            samples = min(spec.samples, spec.files - total - 1)
+            add(f"SDUI/components/{name}/v{version}/{name}.json", name, samples)
+    return schemas
+
+
+def _relative(source: str, target: str) -> str:
+    return os.path.relpath(target, os.path.dirname(source)).replace(os.sep, "/")
+
+
+def generate_tree(root: PathLike, spec: TreeSpec = TreeSpec()) -> TreeStats:
+    """
+    Пишет дерево в root (существующие файлы с теми же путями перезаписываются).
+
+    Returns:
+        TreeStats
+    """
+    started = time.perf_counter()
+    rng = random.Random(spec.seed)
+    root = Path(root).resolve()
+    stats = TreeStats()
+
+    schemas = _plan(spec, rng)
+    position = {schema.path: i for i, schema in enumerate(schemas)}
+    back_edges: Set[Tuple[int, int]] = set()
+
+    for i, schema in enumerate(schemas):
+        count = rng.randint(0, int(2 * spec.refs_per_file)) if spec.refs_per_file > 0 else 0
+        for _ in range(count):
+            roll = rng.random()
+            if roll < spec.internal_rate or i == 0:
+                schema.refs.append(("internal", "#/definitions/value"))
+            elif roll < spec.internal_rate + spec.broken_rate:
+                gone = f"SDUI/atoms/Removed{rng.randint(1, 10 ** 6)}/v1/Removed.json"
+                schema.refs.append(("broken", gone))
+                stats.broken += 1
+            else:
+                schema.refs.append(("file", schemas[rng.randrange(i)].path))
+        # Обратное ребро: цель, на которую схема ссылается, ссылается на неё
+        if rng.random() < spec.cycle_rate:
+            targets = [position[t] for k, t in schema.refs if k == "file"]
+            if targets:
+                back_edges.add((rng.choice(targets), i))
+
+    for j, i in sorted(back_edges):
+        schemas[j].refs.append(("file", schemas[i].path))
+        stats.cycles += 1
+
+    created: Set[str] = set()
+    for schema in schemas:
+        properties = {}
+        for n, (kind, target) in enumerate(schema.refs):
+            if kind == "internal":
+                ref = target
+            else:
+                if rng.random() < spec.relative_rate:
+                    ref = _relative(schema.path, target)
+                else:
+                    ref = f"file://{root.as_posix()}/{target}"
+                if rng.random() < 0.2:
+                    ref += "#/definitions/value"
+            properties[f"field{n}"] = {"$ref": ref}
+        document = {
+            "$schema": "http://json-schema.org/draft-07/schema#",
+            "title": schema.name,
+            "type": "object",
+            "definitions": {"value": {"type": "string", "description": f"{schema.name} value"}},
+            "properties": properties,
+            "required": sorted(properties)[:2],
+        }
+        stats.bytes += _write(root / schema.path, document, created)
+        stats.schemas += 1
+        stats.refs += len(schema.refs)
+
+        directory = (root / schema.path).parent
+        for k in range(1, schema.samples + 1):
+            sample = {"type": schema.name, "content": {"text": f"Sample {k}", "size": k * 8},
+                      "paddings": {"top": 8, "bottom": 8, "left": 16, "right": 16}}
+            stats.bytes += _write(directory / "samples" / f"{schema.name}_{k}.json", sample, created)
+            stats.samples += 1
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def _write(path: Path, document: dict, created: Set[str]) -> int:
+    directory = str(path.parent)
+    if directory not in created:
+        os.makedirs(directory, exist_ok=True)
+        created.add(directory)
+    data = json.dumps(document, ensure_ascii=False, indent=2).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
@@ -0,0 +1,326 @@
+"""
+Rewrite Transaction
+===================
+Пакетная перезапись файлов дерева схем: всё или ничего, с откатом.
+
+- stage() только запоминает новое содержимое — дерево не меняется
+- commit():
+  1. новые версии пишутся во временные файлы рядом с целями
+  2. исходное содержимое всех файлов — в один originals.bin, список — в journal.json
+  3. один барьер os.sync() вместо резервной копии и fsync на каждый файл
+  4. os.replace() временных файлов поверх целей, журнал — "committed"
+- Прерванный после барьера запуск доводится до конца recover(): временные
+  файлы уже на диске; прерванный до барьера — отменяется (дерево ещё
+  не менялось, недописанные временные файлы удаляются)
+- rollback_last() возвращает исходное содержимое последней транзакции тем же
+  путём (временный файл + барьер + os.replace); файл, изменённый после
+  транзакции, не трогается
+- Журналы лежат в INDEX_DIR/transactions/<sha1(root)[:12]>/<txid>/, вне дерева;
+  после успешного commit() остаются последние KEEP_TRANSACTIONS
+
+Usage:
+    tx = RewriteTransaction(base_path)
+    tx.stage(path, new_content)
+    print(tx.commit())
+    ...
+    print(rollback_last(base_path))
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from .config import INDEX_DIR
+
+PathLike = Union[str, Path]
+
+# Суффикс временных файлов рядом с целями (скрытые — не попадают в обход индекса)
+TEMP_SUFFIX = ".refs-tx"
+
+# Сколько журналов дерева хранить (rollback_last() нужен только последний)
+KEEP_TRANSACTIONS = 20
+
+STATE_PREPARED = "prepared"
+STATE_COMMITTED = "committed"
+STATE_ROLLED_BACK = "rolled_back"
+STATE_ABORTED = "aborted"
+
+
+@dataclass
+class TransactionStats:
+    """Итоги commit() / rollback()"""
+    txid: str = ""
+    files: int = 0
+    skipped: int = 0      # rollback: файл изменён после транзакции
+    bytes_written: int = 0
+    elapsed: float = 0.0
+    skipped_files: List[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        text = (f"{self.txid}: {self.files} файлов, {self.bytes_written / 1024:.1f} KB, "
+                f"{self.elapsed:.2f}s")
+        if self.skipped:
+            text += f", {self.skipped} пропущено (изменены после транзакции)"
+        return text
+
+
+def journal_root(root: PathLike) -> Path:
+    """Каталог журналов дерева: INDEX_DIR/transactions/<sha1(root)[:12]>"""
+    digest = hashlib.sha1(str(Path(root).resolve()).encode("utf-8")).hexdigest()[:12]
+    return INDEX_DIR / "transactions" / digest
+
+
+def _temp_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}{TEMP_SUFFIX}")
+
+
+def _write(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _write_journal(directory: Path, journal: dict) -> None:
+    """journal.json заменяется атомарно — состояние всегда читается целиком"""
+    temp = directory / "journal.json.tmp"
+    temp.write_text(json.dumps(journal, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(temp, directory / "journal.json")
+
+
+def _barrier() -> None:
+    """Один барьер на всю пачку: данные и журнал на диске до первого os.replace"""
+    if hasattr(os, "sync"):
+        os.sync()
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def _swap_in(entries: List[Tuple[str, bytes]]) -> int:
+    """Временные файлы → барьер → os.replace; возвращает записанные байты"""
+    written = 0
+    for path, data in entries:
+        temp = _temp_path(path)
+        _write(temp, data)
+        try:
+            # os.replace переносит права временного файла — сохраняем прежние
+            os.chmod(temp, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass
+        written += len(data)
+    _barrier()
+    for path, _data in entries:
+        os.replace(_temp_path(path), path)
+    return written
+
+
+class RewriteTransaction:
+    """
+    Пачка перезаписей файлов одного дерева.
+
+    Args:
+        root: Корень дерева (журнал привязан к нему)
+    """
+
+    def __init__(self, root: PathLike):
+        self.root = Path(root).resolve()
+        self.txid = datetime.now().strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        self._staged: List[Tuple[str, bytes, bytes]] = []
+        self._paths = set()
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    def stage(self, path: PathLike, new_content: str) -> None:
+        """
+        Запоминает перезапись; повторная для того же файла — ошибка вызывающего кода.
+
+        Исходное содержимое читается с диска байтами (не из текста вызывающего
+        кода, прочитанного в text mode): откат возвращает файл байт в байт,
+        с прежними CRLF и BOM.
+        """
+        path = str(Path(path).resolve())
+        if path in self._paths:
+            raise ValueError(f"Файл уже в транзакции: {path}")
+        with open(path, "rb") as f:
+            old = f.read()
+        self._paths.add(path)
+        self._staged.append((path, old, new_content.encode("utf-8")))
+
+    def commit(self) -> TransactionStats:
+        """Применяет все перезаписи разом (см. протокол в docstring модуля)"""
+        started = time.perf_counter()
+        stats = TransactionStats(txid=self.txid, files=len(self._staged))
+        if not self._staged:
+            return stats
+
+        directory = journal_root(self.root) / self.txid
+        directory.mkdir(parents=True, exist_ok=True)
+
+        # Исходное содержимое — один файл, смещения — в журнале
+        entries = []
+        offset = 0
+        with open(directory / "originals.bin", "wb") as originals:
+            for path, old, new in self._staged:
+                originals.write(old)
+                entries.append({"path": path, "offset": offset, "length": len(old),
+                                "old": _sha1(old), "new": _sha1(new)})
+                offset += len(old)
+        journal = {"txid": self.txid, "root": str(self.root), "state": STATE_PREPARED,
+                   "created": datetime.now().isoformat(timespec="seconds"), "entries": entries}
+        _write_journal(directory, journal)
+
+        stats.bytes_written = _swap_in([(path, new) for path, _old, new in self._staged])
+
+        journal["state"] = STATE_COMMITTED
+        _write_journal(directory, journal)
+        self._staged = []
+        self._paths = set()
+        prune_journals(self.root)
+
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+
+def _journals(root: PathLike) -> List[Path]:
+    """Каталоги транзакций дерева, от новых к старым"""
+    base = journal_root(root)
+    if not base.is_dir():
+        return []
+    return sorted((p for p in base.iterdir() if (p / "journal.json").is_file()), reverse=True)
+
+
+def prune_journals(root: PathLike, keep: int = KEEP_TRANSACTIONS) -> int:
+    """
+    Удаляет журналы дерева старше последних keep.
+
+    Недоведённые (prepared) не трогаются — их ещё может завершить recover().
+
+    Returns:
+        int: Сколько журналов удалено
+    """
+    removed = 0
+    for directory in _journals(root)[keep:]:
+        journal = _load(directory)
+        if journal is not None and journal["state"] == STATE_PREPARED:
+            continue
+        shutil.rmtree(directory, ignore_errors=True)
+        removed += 1
+    return removed
+
+
+def _load(directory: Path) -> Optional[dict]:
+    """Журнал транзакции; None — журнал не дописан (запуск прерван до барьера)"""
+    try:
+        return json.loads((directory / "journal.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _file_sha1(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return _sha1(f.read())
+    except OSError:
+        return None
+
+
+def recover(root: PathLike) -> List[Tuple[str, str]]:
+    """
+    Завершает прерванные транзакции дерева.
+
+    Если каждый файл уже новый или его временный файл дописан целиком —
+    транзакция прервана после барьера и доводится до конца. Иначе замены
+    ещё не начинались: временные файлы удаляются, транзакция отменяется.
+
+    Returns:
+        list: (txid, новое состояние)
+    """
+    recovered = []
+    for directory in _journals(root):
+        journal = _load(directory)
+        if journal is None or journal["state"] != STATE_PREPARED:
+            continue
+
+        pending = []
+        complete = True
+        for entry in journal["entries"]:
+            path = entry["path"]
+            if _file_sha1(path) == entry["new"]:
+                continue
+            temp = _temp_path(path)
+            if _file_sha1(temp) == entry["new"]:
+                pending.append((temp, path))
+            else:
+                complete = False
+                break
+
+        if complete:
+            for temp, path in pending:
+                os.replace(temp, path)
+            journal["state"] = STATE_COMMITTED
+        else:
+            for entry in journal["entries"]:
+                try:
+                    os.unlink(_temp_path(entry["path"]))
+                except OSError:
+                    pass
+            journal["state"] = STATE_ABORTED
+        _write_journal(directory, journal)
+        recovered.append((journal["txid"], journal["state"]))
+    return recovered
+
+
+def last_transaction(root: PathLike) -> Optional[dict]:
+    """Журнал последней применённой (не откаченной) транзакции"""
+    for directory in _journals(root):
+        journal = _load(directory)
+        if journal is not None and journal["state"] == STATE_COMMITTED:
+            return journal
+    return None
+
+
+def rollback_last(root: PathLike, force: bool = False) -> Optional[TransactionStats]:
+    """
+    Откатывает последнюю применённую транзакцию дерева.
+
+    Args:
+        root: Корень дерева
+        force: Откатить и файлы, изменённые после транзакции
+
+    Returns:
+        TransactionStats или None, если откатывать нечего
+    """
+    started = time.perf_counter()
+    recover(root)
+    journal = last_transaction(root)
+    if journal is None:
+        return None
+
+    stats = TransactionStats(txid=journal["txid"])
+    directory = journal_root(root) / journal["txid"]
+    restore: List[Tuple[str, bytes]] = []
+    with open(directory / "originals.bin", "rb") as originals:
+        blob = originals.read()
+    for entry in journal["entries"]:
+        path = entry["path"]
+        if _file_sha1(path) != entry["new"] and not force:
+            stats.skipped += 1
+            stats.skipped_files.append(path)
+            continue
+        restore.append((path, blob[entry["offset"]:entry["offset"] + entry["length"]]))
+
+    stats.files = len(restore)
+    stats.bytes_written = _swap_in(restore)
+
+    journal["state"] = STATE_ROLLED_BACK
+    _write_journal(directory, journal)
+    stats.elapsed = time.perf_counter() - started
+    return stats
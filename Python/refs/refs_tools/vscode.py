@@ -0,0 +1,219 @@
+"""
+VS Code Schema Associations
+===========================
+Генерация vscode_schemas_config.json (fileMatch → url) по раскладке SDUI.
+
+- Схема компонента — is_root_schema(): Name/Name.json, Name/vN/Name.json,
+  варианты Name_web.json → fileMatch "*_web.json"
+- components: схема описывает примеры — только "<каталог>/samples/*.json";
+  layouts: и сам каталог, и samples; остальные категории — сам каталог
+- Обход только по каталогам: для каждого — один stat; каталог, mtime
+  которого не изменился, не перечитывается (его подкаталоги и схемы берутся
+  из состояния). Записи пересобираются только для изменённых каталогов
+- Содержимое samples не читается — важно лишь, есть ли каталог
+- Состояние — INDEX_DIR/vscode/<sha1(root)[:12]>.json, рядом с индексом $ref
+- merge_entries(): записи вне сгенерированных каталогов сохраняются,
+  порядок — по fileMatch, как в файле, который вели руками
+
+Usage:
+    generator = SchemaConfigGenerator(base_path)
+    entries = merge_entries(existing, generator.generate(), generator.dirs)
+    generator.save_state()
+    print(generator.stats)
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .bundle import SAMPLES_DIR, is_root_schema
+from .config import INDEX_DIR, is_skipped_dir
+
+PathLike = Union[str, Path]
+
+# Версия формата состояния: при изменении все каталоги перечитываются
+STATE_VERSION = 1
+
+# Категории, схемы которых описывают только примеры из samples/
+SAMPLES_ONLY = {"components"}
+
+Entry = Dict[str, object]
+
+
+@dataclass
+class GenerateStats:
+    """Итоги generate()"""
+    dirs: int = 0        # Каталогов в раскладке
+    scanned: int = 0     # Перечитано (новые или с изменённым mtime)
+    schemas: int = 0     # Схем компонентов
+    entries: int = 0     # Записей fileMatch → url
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.dirs} каталогов, {self.scanned} перечитано, {self.schemas} схем, "
+                f"{self.entries} записей, {self.elapsed:.2f}s")
+
+
+def default_state_path(root: PathLike) -> Path:
+    """Файл состояния дерева: INDEX_DIR/vscode/<sha1(root)[:12]>.json"""
+    digest = hashlib.sha1(str(Path(root).resolve()).encode("utf-8")).hexdigest()[:12]
+    return INDEX_DIR / "vscode" / f"{digest}.json"
+
+
+def file_url(path: PathLike) -> str:
+    """file:///абсолютный/путь — без процентного кодирования, как в $ref проекта"""
+    return "file://" + str(path)
+
+
+def schema_entries(relative_dir: str, schema: str, has_samples: bool, url: str) -> List[Entry]:
+    """
+    Записи одной схемы.
+
+    Args:
+        relative_dir: Каталог схемы от корня, через '/' (SDUI/components/ButtonView/v1)
+        schema: Имя файла схемы (ButtonView.json, ButtonView_web.json)
+        has_samples: Есть ли в каталоге samples/
+        url: Куда указывает запись (схема или её бандл)
+    """
+    parts = relative_dir.split("/")
+    name = parts[-1]
+    if name[:1] == "v" and name[1:].isdigit() and len(parts) > 1:
+        name = parts[-2]
+    stem = schema[:-5] if schema.endswith(".json") else schema
+    mask = "*" + stem[len(name):] + ".json"
+
+    category = parts[1] if len(parts) > 1 else ""
+    patterns = []
+    if category not in SAMPLES_ONLY or not has_samples:
+        patterns.append(f"{relative_dir}/{mask}")
+    if has_samples and category in SAMPLES_ONLY | {"layouts"}:
+        patterns.append(f"{relative_dir}/{SAMPLES_DIR}/{mask}")
+    return [{"fileMatch": [pattern], "url": url} for pattern in patterns]
+
+
+def merge_entries(existing: Iterable[Entry], generated: Iterable[Entry],
+                  dirs: Sequence[str]) -> List[Entry]:
+    """
+    Сгенерированные записи + записи existing вне каталогов dirs.
+
+    Записи существующего файла, чей fileMatch начинается с одного из dirs,
+    заменяются сгенерированными; остальные (добавленные руками) остаются.
+    Порядок — по первому fileMatch, стабильный.
+    """
+    prefixes = tuple(d.rstrip("/") + "/" for d in dirs)
+    kept = [
+        entry for entry in existing
+        if not any(str(m).startswith(prefixes) for m in entry.get("fileMatch", []))
+    ]
+    merged = kept + list(generated)
+    merged.sort(key=lambda entry: entry.get("fileMatch", [""])[0])
+    return merged
+
+
+class SchemaConfigGenerator:
+    """
+    Инкрементальный генератор записей vscode_schemas_config.json.
+
+    Args:
+        root: Корень front-middle-schema (fileMatch строится от него)
+        dirs: Каталоги раскладки (по умолчанию SDUI)
+        state_path: Файл состояния (по умолчанию default_state_path(root))
+    """
+
+    def __init__(self, root: PathLike, dirs: Sequence[str] = ("SDUI",),
+                 state_path: Optional[PathLike] = None):
+        self.root = Path(root).resolve()
+        self.dirs = list(dirs)
+        self.state_path = Path(state_path) if state_path else default_state_path(self.root)
+        self.stats = GenerateStats()
+
+        # Каталог (от корня) → [mtime_ns, подкаталоги, схемы]
+        self._dirs: Dict[str, list] = {}
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            if state.get("version") == STATE_VERSION and state.get("root") == str(self.root):
+                self._dirs = state["dirs"]
+        except (OSError, ValueError, KeyError):
+            pass
+        self._dirty = False
+
+    def _list(self, relative: str, mtime_ns: int) -> Tuple[List[str], List[str]]:
+        """Подкаталоги и схемы каталога: из состояния, если mtime тот же"""
+        cached = self._dirs.get(relative)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1], cached[2]
+
+        subdirs, schemas = [], []
+        directory = self.root / relative
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if not is_skipped_dir(entry.name):
+                        subdirs.append(entry.name)
+                elif is_root_schema(directory / entry.name):
+                    schemas.append(entry.name)
+        subdirs.sort()
+        schemas.sort()
+        self._dirs[relative] = [mtime_ns, subdirs, schemas]
+        self._dirty = True
+        self.stats.scanned += 1
+        return subdirs, schemas
+
+    def generate(self, url_for: Optional[Callable[[Path], str]] = None) -> List[Entry]:
+        """
+        Записи всех схем раскладки, отсортированные по fileMatch.
+
+        Args:
+            url_for: url по пути схемы (по умолчанию file_url — сама схема)
+        """
+        started = time.perf_counter()
+        url_for = url_for or file_url
+        self.stats = GenerateStats()
+        entries: List[Entry] = []
+        seen = set()
+
+        stack = [d.strip("/") for d in reversed(self.dirs)]
+        while stack:
+            relative = stack.pop()
+            try:
+                mtime_ns = os.stat(self.root / relative).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(relative)
+            self.stats.dirs += 1
+            subdirs, schemas = self._list(relative, mtime_ns)
+
+            has_samples = SAMPLES_DIR in subdirs
+            for schema in schemas:
+                url = url_for(self.root / relative / schema)
+                entries.extend(schema_entries(relative, schema, has_samples, url))
+            self.stats.schemas += len(schemas)
+
+            # Содержимое samples не влияет на записи — не спускаемся
+            stack.extend(f"{relative}/{name}" for name in reversed(subdirs) if name != SAMPLES_DIR)
+
+        # Удалённые каталоги выпадают из состояния
+        for relative in [r for r in self._dirs if r not in seen]:
+            del self._dirs[relative]
+            self._dirty = True
+
+        entries.sort(key=lambda entry: entry["fileMatch"][0])
+        self.stats.entries = len(entries)
+        self.stats.elapsed = time.perf_counter() - started
+        return entries
+
+    def save_state(self) -> None:
+        """Сохраняет mtime и списки каталогов (атомарно)"""
+        if not self._dirty:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.state_path.with_name(self.state_path.name + ".tmp")
+        temp.write_text(json.dumps({"version": STATE_VERSION, "root": str(self.root),
+                                    "dirs": self._dirs}, ensure_ascii=False),
+                        encoding="utf-8")
+        os.replace(temp, self.state_path)
+        self._dirty = False
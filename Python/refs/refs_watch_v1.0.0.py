@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Наблюдатель за здоровьем $ref ссылок front-middle-schema
+Держит общий индекс актуальным по событиям файловой системы и сразу
+показывает ссылки, которые сломались (удалили или переименовали цель)
+или починились. Текущее состояние — в JSON файле для редактора / CI / prompt.
+"""
+
+import os
+import sys
+import signal
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from refs_tools import VERSION, RefHealth, open_index, open_watcher
+
+# Сколько ссылок одной пачки показывать в консоли
+MAX_PRINTED = 20
+
+
+def print_changes(changes, root: Path) -> None:
+    stamp = datetime.now().strftime("%H:%M:%S")
+    for title, refs in (("❌ Сломано", changes.broken), ("✅ Починено", changes.fixed)):
+        if not refs:
+            continue
+        print(f"[{stamp}] {title}: {len(refs)}")
+        for ref in refs[:MAX_PRINTED]:
+            print(f"  📄 {os.path.relpath(ref.source, root)} #{ref.pointer}")
+            print(f"     {ref.ref}")
+        if len(refs) > MAX_PRINTED:
+            print(f"  ... и ещё {len(refs) - MAX_PRINTED}")
+    for target, candidates in changes.moved:
+        print(f"[{stamp}] 🚚 {os.path.relpath(target, root)} → "
+              + ", ".join(os.path.relpath(p, root) for p in candidates))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Живое состояние $ref ссылок: индекс обновляется по событиям файлов",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Примеры:
+  %(prog)s ~/Documents/front-middle-schema          # Следить за деревом (watchdog или опрос)
+  %(prog)s . --polling --interval 5                  # Без watchdog: опрос раз в 5 секунд
+  %(prog)s . --once                                  # Обновить индекс, записать состояние и выйти
+  cat ~/.refs_index/health/<hash>.json               # Текущее состояние
+        """
+    )
+    parser.add_argument(
+        "path",
+        nargs='?',
+        default=".",
+        help="Путь к проекту front-middle-schema"
+    )
+    parser.add_argument(
+        "--db",
+        help="Файл индекса (по умолчанию ~/.refs_index/<hash>.sqlite)"
+    )
+    parser.add_argument(
+        "--status",
+        help="Файл состояния (по умолчанию ~/.refs_index/health/<hash>.json)"
+    )
+    parser.add_argument(
+        "--polling",
+        action="store_true",
+        help="Опрос вместо watchdog"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="Пауза между опросами, секунд (по умолчанию 2)"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.3,
+        help="Пауза тишины перед обработкой пачки событий, секунд (по умолчанию 0.3)"
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Не следить: обновить индекс, записать состояние; код 1, если есть битые ссылки"
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {VERSION}"
+    )
+
+    args = parser.parse_args()
+
+    base_path = Path(args.path).resolve()
+    if not base_path.exists():
+        print(f"❌ Путь не существует: {base_path}")
+        sys.exit(1)
+
+    # SIGTERM (launchd, systemd, kill) завершает так же, как Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    with open_index(base_path, args.db) as index:
+        print(f"🎯 Проект: {index.root}")
+        print(f"🔄 Индекс: {index.refresh()}")
+
+        health = RefHealth(index, args.status)
+        broken = health.scan()
+        print(f"{'❌' if broken else '✅'} Битых ссылок: {broken} в {len(health.broken_files())} файлах")
+
+        if args.once:
+            health.watcher = "once"
+            print(f"📝 Состояние: {health.write_status()}")
+            sys.exit(1 if broken else 0)
+
+        watcher = open_watcher(index, args.polling, args.interval, args.debounce)
+        health.watcher = watcher.name
+        print(f"📝 Состояние: {health.write_status()}")
+        print(f"👀 Слежу ({watcher.name}), Ctrl+C — выход")
+
+        try:
+            while True:
+                paths = watcher.poll()
+                if not paths:
+                    continue
+                changes = health.apply(paths)
+                print_changes(changes, index.root)
+                health.write_status()
+        except KeyboardInterrupt:
+            print("\n👋 Остановлено")
+        finally:
+            watcher.stop()
+            health.write_status(stopped=datetime.now().isoformat(timespec="seconds"))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,20 +9,28 @@ import os
 import sys
 import argparse
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Optional, Set
+
+from refs_tools import PathCache, PrefilterStats, RefIndex, contains_ref, open_index, rewrite_refs
 
 class SDUIRefsManager:
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, index: Optional[RefIndex] = None):
         """
         Инициализация менеджера
 
         Args:
             base_path: Базовый путь к SDUI директории
+            index: Общий индекс $ref — читаются только файлы, которые изменятся
         """
         self.base_path = Path(base_path).resolve()
+        self.index = index
         self.changes_made = 0
         self.files_processed = 0
         self.errors = []
+        # Файлы без "$ref" не разбираются
+        self.prefilter = PrefilterStats()
+        # resolve() один раз на пару (каталог, ссылка)
+        self.paths = PathCache()
 
     def resolve_ref_path(self, ref_value: str, current_file_path: Path) -> str:
         """Преобразует относительный путь в абсолютный file:/// URI"""
@@ -39,7 +47,7 @@ class SDUIRefsManager:
 
         # Резолвим относительный путь
         try:
-            resolved_path = (current_dir / ref_value).resolve()
+            resolved_path = self.paths.resolve(current_dir, ref_value)
 
             # Добавляем .json если его нет
             if not str(resolved_path).endswith('.json'):
@@ -83,33 +91,40 @@ class SDUIRefsManager:
 
         return ref_value
 
-    def process_refs_in_dict(self, obj: Any, current_file_path: Path, mode: str) -> None:
+    def change_ref(self, value: str, current_file_path: Path, mode: str) -> str:
         """
-        Рекурсивно обрабатывает $ref в словаре
+        Новое значение одной $ref
 
         Args:
-            obj: Объект для обработки
+            value: Текущее значение
             current_file_path: Путь к текущему файлу
             mode: 'absolute' или 'relative'
         """
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                if key == "$ref" and isinstance(value, str):
-                    old_value = value
-                    if mode == "absolute":
-                        new_value = self.resolve_ref_path(value, current_file_path)
-                    else:  # relative
-                        new_value = self.make_relative_ref(value, current_file_path)
-
-                    if old_value != new_value:
-                        obj[key] = new_value
-                        self.changes_made += 1
-                        print(f"  Changed: {old_value} -> {new_value}")
-                else:
-                    self.process_refs_in_dict(value, current_file_path, mode)
-        elif isinstance(obj, list):
-            for item in obj:
-                self.process_refs_in_dict(item, current_file_path, mode)
+        if mode == "absolute":
+            new_value = self.resolve_ref_path(value, current_file_path)
+        else:  # relative
+            new_value = self.make_relative_ref(value, current_file_path)
+
+        if new_value != value:
+            print(f"  Changed: {value} -> {new_value}")
+        return new_value
+
+    @staticmethod
+    def needs_change(ref_value: str, mode: str) -> bool:
+        """Изменит ли change_ref эту ссылку в данном режиме"""
+        if ref_value.startswith("#"):
+            return False
+        if mode == "absolute":
+            return not ref_value.startswith("file:///")
+        return ref_value.startswith("file:///")
+
+    def _indexed_candidates(self, mode: str) -> Set[Path]:
+        """Файлы с ссылками, которые изменятся в режиме mode (по индексу)"""
+        return {
+            source
+            for source, refs in self.index.refs_by_file(under=self.base_path).items()
+            if any(self.needs_change(ref, mode) for _pointer, ref in refs)
+        }
 
     def process_schema_file(self, filepath: Path, mode: str, dry_run: bool = False) -> bool:
         """
@@ -120,27 +135,28 @@ class SDUIRefsManager:
             mode: 'absolute' или 'relative'
             dry_run: Если True, только показать изменения без записи
         """
+        if not contains_ref(filepath, self.prefilter):
+            return False
+
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
-                schema = json.load(f)
+                content = f.read()
 
-            # Создаем копию для сравнения
-            original = json.dumps(schema, sort_keys=True)
+            # Невалидный JSON не трогаем
+            json.loads(content)
 
-            # Сбрасываем счетчик изменений для этого файла
-            file_changes = self.changes_made
-
-            # Обрабатываем ссылки
-            self.process_refs_in_dict(schema, filepath, mode)
+            # Обрабатываем ссылки: заменяются только значения "$ref", остальной текст сохраняется
+            content, changes_count = rewrite_refs(
+                content, lambda value: self.change_ref(value, filepath, mode)
+            )
+            self.changes_made += changes_count
 
             # Проверяем, были ли изменения
-            modified = json.dumps(schema, sort_keys=True)
-            if original != modified:
+            if changes_count:
                 if not dry_run:
                     with open(filepath, 'w', encoding='utf-8') as f:
-                        json.dump(schema, f, indent=2, ensure_ascii=False)
+                        f.write(content)
 
-                changes_count = self.changes_made - file_changes
                 action = "Would change" if dry_run else "Changed"
                 print(f"✓ {action} {changes_count} refs in: {filepath.relative_to(self.base_path.parent)}")
                 return True
@@ -171,12 +187,27 @@ class SDUIRefsManager:
 
         files_changed = 0
 
-        for filepath in self.base_path.glob(pattern):
+        candidates = None
+        if self.index is not None:
+            candidates = self._indexed_candidates(mode)
+            if pattern == "**/*.json":
+                files = self.index.file_paths(under=self.base_path)
+            else:
+                files = self.base_path.glob(pattern)
+        else:
+            files = self.base_path.glob(pattern)
+
+        for filepath in files:
             # Пропускаем samples если не указано обратное
             if "samples" in str(filepath) and "--include-samples" not in sys.argv:
                 continue
 
             self.files_processed += 1
+
+            # Нечего менять — файл не читается
+            if candidates is not None and filepath not in candidates:
+                continue
+
             if self.process_schema_file(filepath, mode, dry_run):
                 files_changed += 1
 
@@ -185,6 +216,8 @@ class SDUIRefsManager:
         print(f"  Обработано файлов: {self.files_processed}")
         print(f"  Изменено файлов: {files_changed}")
         print(f"  Всего изменено refs: {self.changes_made}")
+        if self.prefilter.checked:
+            print(f"  Префильтр: {self.prefilter}")
 
         if self.errors:
             print(f"\n⚠️ Ошибки ({len(self.errors)}):")
@@ -225,14 +258,21 @@ def main():
                         help="Glob паттерн для поиска файлов (по умолчанию '**/*.json')")
     parser.add_argument("--include-samples", action="store_true",
                         help="Включить обработку файлов в папках samples")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Не использовать общий индекс $ref (читать все файлы заново)")
 
     args = parser.parse_args()
 
     # Определяем режим
     mode = "relative" if args.relative else "absolute"
 
+    index = None
+    if not args.no_index:
+        index = open_index(args.path)
+        print(f"🗃️  Индекс: {index.refresh()}")
+
     # Создаем менеджер и запускаем обработку
-    manager = SDUIRefsManager(args.path)
+    manager = SDUIRefsManager(args.path, index=index)
     manager.process_directory(mode, args.dry_run, args.pattern)
 
 if __name__ == "__main__":
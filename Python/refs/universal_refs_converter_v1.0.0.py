@@ -8,60 +8,92 @@ Universal JSON Schema $ref Converter
 import json
 import sys
 from pathlib import Path
-from typing import Dict, Any, Optional, Set
+from typing import Dict, List, Optional, Set
 import argparse
 from datetime import datetime
 import shutil
 
+from refs_tools import (
+    CONVERT_DIRS,
+    PathCache,
+    PrefilterStats,
+    RefIndex,
+    RewriteTransaction,
+    contains_ref,
+    find_project_root,
+    open_index,
+    recover,
+    rewrite_refs,
+    rollback_last,
+)
+
 
 class UniversalRefConverter:
     """Универсальный конвертер для преобразования всех $ref в абсолютные пути"""
 
-    def __init__(self, base_path: Path, verbose: bool = False, dry_run: bool = False):
+    def __init__(self, base_path: Path, verbose: bool = False, dry_run: bool = False,
+                 index: Optional[RefIndex] = None,
+                 transaction: Optional[RewriteTransaction] = None):
         self.base_path = base_path.resolve()
         self.verbose = verbose
         self.dry_run = dry_run
+        # Пакетный режим: файлы копятся в транзакции и пишутся разом в commit()
+        self.transaction = transaction
+        # Общий индекс $ref: читаются только файлы с относительными ссылками
+        self.index = index
         self.converted_count = 0
         self.files_modified = 0
+        self.modified_files: List[Path] = []  # Для index.update() после записи
         self.errors = []
         self.processed_files: Set[Path] = set()
+        # Файлы без "$ref" не разбираются
+        self.prefilter = PrefilterStats()
+        # Существование целей: файлы из обхода индекса + мемоизация промахов
+        self.paths = PathCache(index.existing_files() if index is not None else ())
 
     def convert_refs_in_file(self, file_path: Path) -> bool:
         """Конвертирует все ref'ы в одном файле"""
+        if not contains_ref(file_path, self.prefilter):
+            return False
+
         try:
             # Читаем файл
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
                 original_content = content
 
-            # Парсим JSON
+            # Проверяем, что это JSON: невалидный файл не трогаем
             try:
-                data = json.loads(content)
+                json.loads(content)
             except json.JSONDecodeError as e:
                 if self.verbose:
                     print(f"  ⚠️  Пропускаю {file_path.name}: не валидный JSON - {e}")
                 return False
 
-            # Конвертируем ref'ы
-            file_modified = self._convert_refs_recursive(data, file_path)
+            # Конвертируем ref'ы: заменяются только значения "$ref", форматирование файла сохраняется
+            new_content, converted = rewrite_refs(
+                original_content, lambda ref: self._convert_logged(ref, file_path)
+            )
+            self.converted_count += converted
 
             # Если файл изменился, сохраняем
-            if file_modified and not self.dry_run:
-                new_content = json.dumps(data, indent=2, ensure_ascii=False)
-
-                # Сохраняем с резервной копией
-                backup_path = file_path.with_suffix('.json.backup')
-                shutil.copy2(file_path, backup_path)
+            if converted and not self.dry_run:
+                if self.transaction is not None:
+                    # Запись — в commit() вместе с остальными файлами
+                    self.transaction.stage(file_path, new_content)
+                else:
+                    # Сохраняем с резервной копией
+                    backup_path = file_path.with_suffix('.json.backup')
+                    shutil.copy2(file_path, backup_path)
 
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
-                    if not new_content.endswith('\n'):
-                        f.write('\n')
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        f.write(new_content)
 
-                # Удаляем резервную копию если всё прошло успешно
-                backup_path.unlink()
+                    # Удаляем резервную копию если всё прошло успешно
+                    backup_path.unlink()
 
                 self.files_modified += 1
+                self.modified_files.append(file_path)
                 return True
 
         except Exception as e:
@@ -71,33 +103,12 @@ class UniversalRefConverter:
 
         return False
 
-    def _convert_refs_recursive(self, obj: Any, source_file: Path, depth: int = 0) -> bool:
-        """Рекурсивно конвертирует все $ref в объекте"""
-        if depth > 50:  # Защита от бесконечной рекурсии
-            return False
-
-        modified = False
-
-        if isinstance(obj, dict):
-            for key, value in list(obj.items()):
-                if key == "$ref" and isinstance(value, str):
-                    new_ref = self._convert_ref(value, source_file)
-                    if new_ref != value:
-                        obj[key] = new_ref
-                        self.converted_count += 1
-                        modified = True
-                        if self.verbose:
-                            print(f"    ✓ {value} → file:///{Path(new_ref[8:]).as_posix()}")
-                else:
-                    if self._convert_refs_recursive(value, source_file, depth + 1):
-                        modified = True
-
-        elif isinstance(obj, list):
-            for item in obj:
-                if self._convert_refs_recursive(item, source_file, depth + 1):
-                    modified = True
-
-        return modified
+    def _convert_logged(self, ref: str, source_file: Path) -> str:
+        """_convert_ref с выводом замены в подробном режиме"""
+        new_ref = self._convert_ref(ref, source_file)
+        if new_ref != ref and self.verbose:
+            print(f"    ✓ {ref} → file:///{Path(new_ref[8:]).as_posix()}")
+        return new_ref
 
     def _convert_ref(self, ref: str, source_file: Path) -> str:
         """Конвертирует одну $ref ссылку в абсолютный путь"""
@@ -126,10 +137,10 @@ class UniversalRefConverter:
                 ref_path = Path(ref)
             else:
                 # Относительный путь от текущего файла
-                ref_path = (source_file.parent / ref).resolve()
+                ref_path = self.paths.resolve(source_file.parent, ref)
 
             # Проверяем существование файла
-            if not ref_path.exists():
+            if not self.paths.exists(ref_path):
                 # Если файл не найден, возвращаем оригинальную ссылку
                 if self.verbose:
                     print(f"    ⚠️  Файл не найден: {ref_path}")
@@ -149,11 +160,33 @@ class UniversalRefConverter:
                 print(f"    ⚠️  Не могу конвертировать: {ref} - {e}")
             return ref
 
+    @staticmethod
+    def needs_conversion(ref: str) -> bool:
+        """Ссылка, которую _convert_ref попытается переписать"""
+        return not (ref.startswith("file:///") or ref.startswith("#")
+                    or ref.startswith("http://") or ref.startswith("https://"))
+
+    def _indexed_candidates(self, directory: Path) -> Set[Path]:
+        """Файлы директории, в которых есть что конвертировать (по индексу)"""
+        candidates = {
+            source
+            for source, refs in self.index.refs_by_file(under=directory).items()
+            if any(self.needs_conversion(ref) for _pointer, ref in refs)
+        }
+        # Не разобранные файлы читаются, чтобы сообщить об ошибке как раньше
+        candidates.update(self.index.file_errors(under=directory))
+        return candidates
+
     def process_directory(self, directory: Path, pattern: str = "**/*.json") -> None:
         """Обрабатывает все JSON файлы в директории"""
         print(f"\n📁 Обрабатываю директорию: {directory.name}")
 
-        json_files = list(directory.glob(pattern))
+        candidates = None
+        if self.index is not None:
+            json_files = self.index.file_paths(under=directory)
+            candidates = self._indexed_candidates(directory)
+        else:
+            json_files = list(directory.glob(pattern))
         total_files = len(json_files)
 
         if total_files == 0:
@@ -174,6 +207,10 @@ class UniversalRefConverter:
 
             self.processed_files.add(json_file)
 
+            # Без относительных ссылок файл не меняется — не читаем
+            if candidates is not None and json_file not in candidates:
+                continue
+
             # Показываем прогресс
             if self.verbose or (i % 100 == 0):
                 print(f"  [{i}/{total_files}] {json_file.name}...")
@@ -190,35 +227,30 @@ class UniversalRefConverter:
     def process_all(self) -> None:
         """Обрабатывает ВСЕ директории в front-middle-schema"""
 
-        # Список основных директорий для обработки
-        main_dirs = [
-            "SDUI",
-            "widgets",
-            "multistep",
-            "valuefields",
-            "dependentfields",
-            "analytics",
-            "metaschema",
-            "api",
-            "documentation"
-        ]
-
         print(f"\n🚀 Начинаю обработку проекта: {self.base_path}")
         print(f"   Режим: {'DRY RUN (без изменений)' if self.dry_run else 'ОБНОВЛЕНИЕ ФАЙЛОВ'}")
 
         # Обрабатываем каждую директорию
-        for dir_name in main_dirs:
+        for dir_name in CONVERT_DIRS:
             dir_path = self.base_path / dir_name
             if dir_path.exists() and dir_path.is_dir():
                 self.process_directory(dir_path)
 
         # Обрабатываем корневые JSON файлы
-        root_json_files = list(self.base_path.glob("*.json"))
+        candidates = None
+        if self.index is not None:
+            root_json_files = [p for p in self.index.file_paths(under=self.base_path)
+                               if p.parent == self.base_path]
+            candidates = self._indexed_candidates(self.base_path)
+        else:
+            root_json_files = list(self.base_path.glob("*.json"))
         if root_json_files:
             print(f"\n📁 Корневые JSON файлы")
             for json_file in root_json_files:
                 if json_file not in self.processed_files:
                     self.processed_files.add(json_file)
+                    if candidates is not None and json_file not in candidates:
+                        continue
                     if self.convert_refs_in_file(json_file):
                         print(f"  ✅ {json_file.name}")
 
@@ -229,6 +261,10 @@ class UniversalRefConverter:
         print(f"  📁 Обработано файлов: {len(self.processed_files)}")
         print(f"  ✏️  Модифицировано файлов: {self.files_modified}")
         print(f"  🔗 Конвертировано ссылок: {self.converted_count}")
+        if self.prefilter.checked:
+            print(f"  ⏭️  Префильтр: {self.prefilter}")
+        if self.paths.hits or self.paths.stats:
+            print(f"  💾 Проверки путей: {self.paths}")
 
         if self.errors:
             print(f"\n⚠️  Ошибки ({len(self.errors)}):")
@@ -266,24 +302,31 @@ def main():
         "-d", "--directory",
         help="Обработать только указанную директорию"
     )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Не использовать общий индекс $ref (читать все файлы заново)"
+    )
+    parser.add_argument(
+        "--no-transaction",
+        action="store_true",
+        help="Писать каждый файл сразу, с резервной копией (без общей транзакции)"
+    )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Откатить последнюю транзакцию конвертации и выйти"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="С --rollback: откатить и файлы, изменённые после транзакции"
+    )
 
     args = parser.parse_args()
 
-    # Определяем базовый путь
-    base_path = Path(args.path).resolve()
-
-    # Ищем корень проекта front-middle-schema
-    if base_path.name != "front-middle-schema":
-        # Пытаемся найти front-middle-schema в родительских директориях
-        for parent in base_path.parents:
-            if parent.name == "front-middle-schema":
-                base_path = parent
-                break
-        else:
-            # Или в дочерних
-            potential = base_path / "front-middle-schema"
-            if potential.exists():
-                base_path = potential
+    # Определяем базовый путь (корень проекта front-middle-schema)
+    base_path = find_project_root(Path(args.path))
 
     if not base_path.exists():
         print(f"❌ Путь не существует: {base_path}")
@@ -291,11 +334,36 @@ def main():
 
     print(f"🎯 Базовый путь проекта: {base_path}")
 
+    # Прерванный прошлый запуск: довести до конца или отменить
+    for txid, state in recover(base_path):
+        print(f"🩹 Транзакция {txid}: {state}")
+
+    if args.rollback:
+        stats = rollback_last(base_path, force=args.force)
+        if stats is None:
+            print("ℹ️  Нет транзакций для отката")
+            return
+        print(f"↩️  Откат: {stats}")
+        for path in stats.skipped_files[:10]:
+            print(f"  ⚠️  Изменён после транзакции: {path}")
+        return
+
+    index = None
+    if not args.no_index:
+        index = open_index(base_path)
+        print(f"🗃️  Индекс: {index.refresh()}")
+
+    transaction = None
+    if not args.dry_run and not args.no_transaction:
+        transaction = RewriteTransaction(base_path)
+
     # Создаём конвертер
     converter = UniversalRefConverter(
         base_path=base_path,
         verbose=args.verbose,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        index=index,
+        transaction=transaction
     )
 
     # Обрабатываем
@@ -310,6 +378,15 @@ def main():
         # Обработка всего проекта
         converter.process_all()
 
+    # Все изменённые файлы — одной транзакцией
+    if transaction is not None and len(transaction):
+        print(f"\n💾 Транзакция: {transaction.commit()}")
+        print("   Откат: --rollback")
+
+    # Перезаписанные файлы — в индекс: иначе у них старые SHA-1 и moved_to() их не найдёт
+    if index is not None and converter.modified_files:
+        print(f"🗃️  Индекс: {index.update(converter.modified_files)}")
+
     # Выводим статистику
     converter.print_summary()
 
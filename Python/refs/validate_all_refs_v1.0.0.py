@@ -7,20 +7,67 @@
 import json
 import sys
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Any
+from typing import Dict, List, Set, Tuple, Any, Optional
 import argparse
+import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import re
 
+from refs_tools import (
+    SCHEMA_DIRS,
+    PathCache,
+    PrefilterStats,
+    RefIndex,
+    build_ref_graph,
+    contains_ref,
+    find_cycles,
+    find_project_root,
+    format_node,
+    iter_refs,
+    open_index,
+    ref_edges,
+    rewrite_refs,
+)
+from refs_tools.index import PARALLEL_MIN_FILES
+
+# Счётчики и карты ошибок, которые воркеры возвращают для слияния
+_COUNTERS = ('total_refs', 'valid_refs', 'invalid_refs', 'internal_refs', 'fixed_refs')
+_MAPS = ('broken_refs', 'missing_extensions', 'invalid_format')
+
+# Версия логики _validate_single_ref: при изменении вердикты в индексе сбрасываются
+VERDICT_VERSION = "1"
+
+# Категории корректных ссылок
+_VALID_CATEGORIES = ('internal', 'external', 'local')
+
+
+def _validate_chunk(base_path: Path, fix: bool, files: List[Path]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Валидирует пачку файлов в процессе пула: результаты по файлам + состояние для слияния"""
+    validator = RefValidator(base_path, fix=fix)
+    results = [validator.validate_file(json_file) for json_file in files]
+    return results, validator.export_state()
+
 
 class RefValidator:
     """Валидатор для проверки всех $ref ссылок"""
 
-    def __init__(self, base_path: Path, verbose: bool = False, fix: bool = False):
+    def __init__(self, base_path: Path, verbose: bool = False, fix: bool = False,
+                 index: Optional[RefIndex] = None, workers: int = 1):
         self.base_path = base_path.resolve()
         self.verbose = verbose
         self.fix = fix
+        # Общий индекс $ref: файлы не читаются, если в них нечего исправлять
+        self.index = index
+        # Процессов для чтения и разбора файлов (1 — без пула)
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._new_verdicts: List[Tuple[str, Optional[str], int]] = []
+        # Файлы без "$ref" не разбираются
+        self.prefilter = PrefilterStats()
+        # Существование целей: файлы из обхода индекса + мемоизация промахов
+        self.paths = PathCache(index.existing_files() if index is not None else ())
 
         # Статистика
         self.total_refs = 0
@@ -28,13 +75,17 @@ class RefValidator:
         self.invalid_refs = 0
         self.internal_refs = 0
         self.fixed_refs = 0
+        self.rechecked_refs = 0  # С индексом: проверено заново, остальные — сохранённые вердикты
 
         # Детальные отчёты
         self.broken_refs: Dict[Path, List[Tuple[str, str]]] = defaultdict(list)
         self.missing_extensions: Dict[Path, List[str]] = defaultdict(list)
         self.invalid_format: Dict[Path, List[str]] = defaultdict(list)
-        self.circular_refs: Set[Tuple[Path, Path]] = set()
+        # Циклы $ref: узлы (файл, фрагмент) по порядку обхода цикла
+        self.circular_refs: List[List[Tuple[str, str]]] = []
         self.processed_files: Set[Path] = set()
+        # Без индекса: рёбра разобранных файлов (формат index.ref_edges) — для поиска циклов
+        self.ref_edges: List[tuple] = []
 
     def validate_file(self, file_path: Path) -> Dict[str, Any]:
         """Валидирует все ссылки в одном файле"""
@@ -46,6 +97,10 @@ class RefValidator:
             'errors': []
         }
 
+        # Нет "$ref" — нечего проверять
+        if not contains_ref(file_path, self.prefilter):
+            return result
+
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
@@ -58,10 +113,11 @@ class RefValidator:
 
             # Валидируем все ref'ы
             self._validate_refs_recursive(data, file_path, result)
+            self.ref_edges.extend(ref_edges(str(file_path), iter_refs(data)))
 
             # Если нужно исправить и есть ошибки
             if self.fix and result['invalid_refs'] > 0:
-                self._fix_refs_in_file(file_path, data)
+                self._fix_refs_in_file(file_path, content)
 
         except Exception as e:
             result['errors'].append(f"Error reading file: {e}")
@@ -80,26 +136,7 @@ class RefValidator:
         if isinstance(obj, dict):
             for key, value in obj.items():
                 if key == "$ref" and isinstance(value, str):
-                    result['total_refs'] += 1
-                    self.total_refs += 1
-
-                    validation = self._validate_single_ref(value, source_file, visited)
-
-                    if validation['valid']:
-                        result['valid_refs'] += 1
-                        self.valid_refs += 1
-                    else:
-                        result['invalid_refs'] += 1
-                        self.invalid_refs += 1
-                        result['errors'].append(validation['error'])
-
-                        # Категоризируем ошибку
-                        if validation['category'] == 'broken':
-                            self.broken_refs[source_file].append((value, validation['error']))
-                        elif validation['category'] == 'missing_extension':
-                            self.missing_extensions[source_file].append(value)
-                        elif validation['category'] == 'invalid_format':
-                            self.invalid_format[source_file].append(value)
+                    self._count_ref(value, source_file, result, visited)
                 else:
                     self._validate_refs_recursive(value, source_file, result, depth + 1, visited)
 
@@ -107,12 +144,86 @@ class RefValidator:
             for item in obj:
                 self._validate_refs_recursive(item, source_file, result, depth + 1, visited)
 
+    def _count_ref(self, ref: str, source_file: Path, result: Dict, visited: Set[str],
+                   validation: Optional[Dict] = None) -> None:
+        """Проверяет ссылку (или берёт готовый вердикт) и учитывает её в статистике"""
+        result['total_refs'] += 1
+        self.total_refs += 1
+
+        if validation is None:
+            validation = self._validate_single_ref(ref, source_file, visited)
+
+        if validation['category'] == 'internal':
+            self.internal_refs += 1
+
+        if validation['valid']:
+            result['valid_refs'] += 1
+            self.valid_refs += 1
+        else:
+            result['invalid_refs'] += 1
+            self.invalid_refs += 1
+            result['errors'].append(validation['error'])
+
+            # Категоризируем ошибку
+            if validation['category'] == 'broken':
+                self.broken_refs[source_file].append((ref, validation['error']))
+            elif validation['category'] == 'missing_extension':
+                self.missing_extensions[source_file].append(ref)
+            elif validation['category'] == 'invalid_format':
+                self.invalid_format[source_file].append(ref)
+
+    def validate_indexed(self, file_path: Path, refs: List[tuple],
+                         error: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Валидирует ссылки файла по рёбрам индекса — без чтения файла.
+
+        Ссылка проверяется заново, только если у ребра нет вердикта (файл
+        изменился, цель появилась или исчезла) или цель вне проекта —
+        её появление индекс не отслеживает.
+        """
+        result = {
+            'file': file_path,
+            'total_refs': 0,
+            'valid_refs': 0,
+            'invalid_refs': 0,
+            'errors': []
+        }
+
+        if error is not None:
+            result['errors'].append(f"JSON parse error: {error}")
+            return result
+
+        visited: Set[str] = set()
+        root_prefix = str(self.base_path) + "/"
+        for _source, rowid, _pointer, ref, target, verdict, message in refs:
+            if verdict is None or (target is not None and not target.startswith(root_prefix)):
+                validation = self._validate_single_ref(ref, file_path, visited)
+                self.rechecked_refs += 1
+                self._new_verdicts.append((validation['category'], validation.get('error'), rowid))
+            else:
+                validation = {
+                    'valid': verdict in _VALID_CATEGORIES,
+                    'category': verdict,
+                    'error': message,
+                }
+            self._count_ref(ref, file_path, result, visited, validation)
+
+        # Исправление требует самого документа
+        if self.fix and result['invalid_refs'] > 0:
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                self._fix_refs_in_file(file_path, content)
+            except Exception as e:
+                result['errors'].append(f"Error reading file: {e}")
+
+        return result
+
     def _validate_single_ref(self, ref: str, source_file: Path, visited: Set[str]) -> Dict:
         """Валидирует одну $ref ссылку"""
 
         # Внутренние ссылки (#/definitions/...)
         if ref.startswith("#"):
-            self.internal_refs += 1
             return {'valid': True, 'category': 'internal'}
 
         # HTTP/HTTPS ссылки
@@ -141,8 +252,7 @@ class RefValidator:
                 }
 
             # Проверяем существование файла
-            target_path = Path(path_str)
-            if not target_path.exists():
+            if not self.paths.exists(path_str):
                 return {
                     'valid': False,
                     'category': 'broken',
@@ -168,36 +278,21 @@ class RefValidator:
             'error': f"Unknown reference format: {ref}"
         }
 
-    def _fix_refs_in_file(self, file_path: Path, data: Any) -> bool:
-        """Пытается исправить проблемные ссылки"""
-        fixed = False
-
-        def fix_recursive(obj: Any) -> bool:
-            nonlocal fixed
-
-            if isinstance(obj, dict):
-                for key, value in list(obj.items()):
-                    if key == "$ref" and isinstance(value, str):
-                        new_ref = self._try_fix_ref(value, file_path)
-                        if new_ref != value:
-                            obj[key] = new_ref
-                            fixed = True
-                            self.fixed_refs += 1
-                            if self.verbose:
-                                print(f"  🔧 Fixed: {value} → {new_ref}")
-                    else:
-                        fix_recursive(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    fix_recursive(item)
-
-            return fixed
-
-        if fix_recursive(data):
+    def _fix_refs_in_file(self, file_path: Path, content: str) -> bool:
+        """Пытается исправить проблемные ссылки; меняются только значения "$ref" """
+
+        def fix_ref(value: str) -> str:
+            new_ref = self._try_fix_ref(value, file_path)
+            if new_ref != value and self.verbose:
+                print(f"  🔧 Fixed: {value} → {new_ref}")
+            return new_ref
+
+        content, fixed = rewrite_refs(content, fix_ref)
+        if fixed:
+            self.fixed_refs += fixed
             # Сохраняем исправленный файл
             with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                f.write('\n')
+                f.write(content)
             return True
 
         return False
@@ -212,26 +307,81 @@ class RefValidator:
         # Добавляем .json если отсутствует
         if ref.startswith("file:///") and not ref.endswith('.json'):
             test_path = ref + '.json'
-            if Path(test_path[8:]).exists():
+            if self.paths.exists(test_path[8:]):
                 return test_path
 
         # Конвертируем относительные пути в абсолютные
         if not ref.startswith("file:///") and not ref.startswith("#") and not ref.startswith("http"):
             if ref.startswith("../") or ref.startswith("./"):
                 try:
-                    target = (source_file.parent / ref).resolve()
-                    if target.exists():
+                    target = self.paths.resolve(source_file.parent, ref)
+                    if self.paths.exists(target):
                         return f"file:///{target.as_posix()}"
                 except:
                     pass
 
         return ref
 
+    # ==================== Parallel ====================
+
+    def export_state(self) -> Dict[str, Any]:
+        """Счётчики и карты ошибок — для слияния результатов воркера"""
+        state = {name: getattr(self, name) for name in _COUNTERS}
+        for name in _MAPS:
+            state[name] = dict(getattr(self, name))
+        state['prefilter'] = self.prefilter
+        state['paths'] = (self.paths.hits, self.paths.stats)
+        state['ref_edges'] = self.ref_edges
+        return state
+
+    def merge_state(self, state: Dict[str, Any]) -> None:
+        """Добавляет состояние воркера; файлы пачек не пересекаются, порядок — порядок пачек"""
+        for name in _COUNTERS:
+            setattr(self, name, getattr(self, name) + state[name])
+        for name in _MAPS:
+            target = getattr(self, name)
+            for file_path, entries in state[name].items():
+                target[file_path].extend(entries)
+        self.prefilter.merge(state['prefilter'])
+        hits, stats = state['paths']
+        self.paths.hits += hits
+        self.paths.stats += stats
+        self.ref_edges.extend(state['ref_edges'])
+
+    def _validate_parallel(self, files: List[Path]):
+        """Результаты по файлам в порядке files; разбор — в пуле процессов"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        # Пачки по порядку: слияние в порядке пачек даёт тот же отчёт, что и один процесс
+        size = max(8, len(files) // (self.workers * 4))
+        chunks = [files[i:i + size] for i in range(0, len(files), size)]
+        base_paths = [self.base_path] * len(chunks)
+        fixes = [self.fix] * len(chunks)
+
+        for results, state in self._pool.map(_validate_chunk, base_paths, fixes, chunks):
+            self.merge_state(state)
+            yield from results
+
+    def close(self) -> None:
+        """Останавливает пул процессов"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    # ==================== Scan ====================
+
     def scan_directory(self, directory: Path, pattern: str = "**/*.json") -> None:
         """Сканирует директорию и валидирует все JSON файлы"""
         print(f"\n🔍 Сканирование: {directory.relative_to(self.base_path)}")
 
-        json_files = list(directory.glob(pattern))
+        if self.index is not None:
+            json_files = self.index.file_paths(under=directory)
+            indexed_refs = self.index.verdicts(under=directory, version=VERDICT_VERSION)
+            parse_errors = self.index.file_errors(under=directory)
+        else:
+            # Сортировка — отчёт не зависит от порядка обхода файловой системы
+            json_files = sorted(directory.glob(pattern), key=str)
         total = len(json_files)
 
         if total == 0:
@@ -240,7 +390,7 @@ class RefValidator:
 
         print(f"  📄 Найдено файлов: {total}")
 
-        errors_in_dir = 0
+        queue = []
         for i, json_file in enumerate(json_files, 1):
             # Пропускаем служебные файлы
             if any(part.startswith('.') for part in json_file.parts):
@@ -250,14 +400,27 @@ class RefValidator:
                 continue
 
             self.processed_files.add(json_file)
+            queue.append((i, json_file))
+
+        # С индексом файлы уже разобраны — проверка рёбер дешевле пересылки в пул
+        files = [json_file for _, json_file in queue]
+        if self.index is not None:
+            results = (
+                self.validate_indexed(json_file, indexed_refs.get(str(json_file), []),
+                                      parse_errors.get(json_file))
+                for json_file in files
+            )
+        elif self.workers > 1 and len(files) >= PARALLEL_MIN_FILES:
+            results = self._validate_parallel(files)
+        else:
+            results = (self.validate_file(json_file) for json_file in files)
 
+        errors_in_dir = 0
+        for (i, json_file), result in zip(queue, results):
             # Прогресс
             if i % 100 == 0 or self.verbose:
                 print(f"  [{i}/{total}] {json_file.name}...")
 
-            # Валидируем файл
-            result = self.validate_file(json_file)
-
             if result['invalid_refs'] > 0:
                 errors_in_dir += 1
                 if not self.verbose:
@@ -267,20 +430,30 @@ class RefValidator:
         if errors_in_dir > 0:
             print(f"  ⚠️  Файлов с ошибками: {errors_in_dir}")
 
+        # Вердикты заново проверенных ссылок — в индекс, до следующего изменения файлов
+        if self._new_verdicts:
+            self.index.store_verdicts(self._new_verdicts)
+            self._new_verdicts = []
+
+    def detect_cycles(self) -> None:
+        """
+        Ищет циклы $ref через проверенные файлы.
+
+        С индексом граф строится по всем рёбрам проекта (цикл может проходить
+        через файлы вне проверенных каталогов), без индекса — по рёбрам
+        разобранных файлов.
+        """
+        edges = self.index.ref_edges() if self.index is not None else self.ref_edges
+        processed = {str(path) for path in self.processed_files}
+        self.circular_refs = [
+            cycle for cycle in find_cycles(build_ref_graph(edges))
+            if any(path in processed for path, _fragment in cycle)
+        ]
+
     def scan_all(self) -> None:
         """Сканирует весь проект"""
 
-        directories = [
-            "SDUI",
-            "widgets",
-            "multistep",
-            "valuefields",
-            "dependentfields",
-            "analytics",
-            "metaschema"
-        ]
-
-        for dir_name in directories:
+        for dir_name in SCHEMA_DIRS:
             dir_path = self.base_path / dir_name
             if dir_path.exists():
                 self.scan_directory(dir_path)
@@ -298,6 +471,12 @@ class RefValidator:
         print(f"  • ✅ Валидных: {self.valid_refs}")
         print(f"  • ❌ Невалидных: {self.invalid_refs}")
         print(f"  • 🔗 Внутренних (#): {self.internal_refs}")
+        if self.prefilter.checked:
+            print(f"  • ⏭️  Префильтр: {self.prefilter}")
+        if self.paths.hits or self.paths.stats:
+            print(f"  • 💾 Проверки путей: {self.paths}")
+        if self.index is not None:
+            print(f"  • ♻️  Проверено заново: {self.rechecked_refs} (остальные — из индекса)")
 
         if self.fix:
             print(f"  • 🔧 Исправлено: {self.fixed_refs}")
@@ -329,8 +508,10 @@ class RefValidator:
 
         if self.circular_refs:
             print(f"\n🔄 ЦИКЛИЧЕСКИЕ ЗАВИСИМОСТИ ({len(self.circular_refs)} total):")
-            for source, target in list(self.circular_refs)[:5]:
-                print(f"  • {source.name} → {target.name}")
+            for cycle in self.circular_refs[:10]:
+                print("  • " + " → ".join(format_node(node, self.base_path) for node in cycle + cycle[:1]))
+            if len(self.circular_refs) > 10:
+                print(f"  ... и ещё {len(self.circular_refs) - 10}")
 
         # Результат
         if self.invalid_refs == 0:
@@ -369,22 +550,22 @@ def main():
         "-f", "--file",
         help="Проверить только указанный файл"
     )
+    parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=None,
+        help="Процессов для разбора файлов (по умолчанию — число ядер, 1 — без пула)"
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Не использовать общий индекс $ref (читать все файлы заново)"
+    )
 
     args = parser.parse_args()
 
-    # Определяем базовый путь
-    base_path = Path(args.path).resolve()
-
-    # Ищем корень проекта
-    if base_path.name != "front-middle-schema":
-        for parent in base_path.parents:
-            if parent.name == "front-middle-schema":
-                base_path = parent
-                break
-        else:
-            potential = base_path / "front-middle-schema"
-            if potential.exists():
-                base_path = potential
+    # Определяем базовый путь (корень проекта)
+    base_path = find_project_root(Path(args.path))
 
     if not base_path.exists():
         print(f"❌ Путь не существует: {base_path}")
@@ -393,16 +574,25 @@ def main():
     print(f"🎯 Проект: {base_path}")
     print(f"📋 Режим: {'ИСПРАВЛЕНИЕ' if args.fix else 'ПРОВЕРКА'}")
 
+    # Запускаем проверку
+    start_time = datetime.now()
+
+    workers = args.workers or os.cpu_count() or 1
+
+    index = None
+    if not args.no_index and not args.file:
+        index = open_index(base_path)
+        print(f"🗃️  Индекс: {index.refresh(workers=workers)}")
+
     # Создаём валидатор
     validator = RefValidator(
         base_path=base_path,
         verbose=args.verbose,
-        fix=args.fix
+        fix=args.fix,
+        index=index,
+        workers=workers
     )
 
-    # Запускаем проверку
-    start_time = datetime.now()
-
     if args.file:
         # Проверка одного файла
         file_path = Path(args.file).resolve()
@@ -426,13 +616,17 @@ def main():
             print(f"❌ Директория не найдена: {target_dir}")
             sys.exit(1)
         validator.scan_directory(target_dir)
+        validator.detect_cycles()
         validator.print_report()
 
     else:
         # Проверка всего проекта
         validator.scan_all()
+        validator.detect_cycles()
         validator.print_report()
 
+    validator.close()
+
     # Время выполнения
     elapsed = datetime.now() - start_time
     print(f"\n⏱️  Время выполнения: {elapsed.total_seconds():.2f} сек")
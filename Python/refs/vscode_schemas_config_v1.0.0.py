@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Генератор vscode_schemas_config.json
+Строит записи fileMatch → url по раскладке SDUI (actions/*, atoms/*,
+components/*/v*, functions/*/*/v*, layouts/*/v*) и сливает их с
+существующим файлом. Перечитываются только каталоги, изменённые с прошлого запуска.
+"""
+
+import json
+import sys
+import argparse
+from pathlib import Path
+
+from refs_tools import (
+    VERSION,
+    SchemaBundler,
+    SchemaConfigGenerator,
+    file_url,
+    find_project_root,
+    merge_entries,
+)
+
+DEFAULT_OUTPUT = Path(__file__).resolve().parent.parent / "vscode_schemas_config.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Генерация vscode_schemas_config.json по раскладке front-middle-schema",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Примеры:
+  %(prog)s ~/Documents/front-middle-schema                # Обновить vscode_schemas_config.json
+  %(prog)s . --output .vscode/schemas.json               # Другой файл
+  %(prog)s . --bundled                                   # url на бандлы (bundle_schemas)
+  %(prog)s . --check                                     # Только проверить, что файл актуален
+        """
+    )
+    parser.add_argument(
+        "path",
+        nargs='?',
+        default=".",
+        help="Путь к проекту front-middle-schema"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=str(DEFAULT_OUTPUT),
+        help=f"Файл конфигурации (по умолчанию {DEFAULT_OUTPUT.name} рядом со скриптами)"
+    )
+    parser.add_argument(
+        "--dirs",
+        nargs='+',
+        default=["SDUI"],
+        help="Каталоги раскладки (по умолчанию SDUI)"
+    )
+    parser.add_argument(
+        "--bundled",
+        action="store_true",
+        help="url на бандлы схем; устаревшие бандлы пересобираются"
+    )
+    parser.add_argument(
+        "--bundle-dir",
+        help="Каталог бандлов (по умолчанию ~/.refs_index/bundles/<hash>)"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Не записывать; код 1, если файл устарел"
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {VERSION}"
+    )
+
+    args = parser.parse_args()
+
+    base_path = Path(args.path).resolve()
+    if not base_path.exists():
+        print(f"❌ Путь не существует: {base_path}")
+        sys.exit(1)
+    base_path = find_project_root(base_path)
+    output = Path(args.output)
+
+    existing = []
+    if output.exists():
+        try:
+            existing = json.loads(output.read_text(encoding="utf-8"))
+        except ValueError as e:
+            print(f"❌ {output} не разбирается как JSON: {e}")
+            sys.exit(1)
+
+    generator = SchemaConfigGenerator(base_path, args.dirs)
+    print(f"🎯 Проект: {generator.root}")
+
+    url_for = file_url
+    bundler = None
+    if args.bundled:
+        bundler = SchemaBundler(base_path, args.bundle_dir)
+        print(f"📦 Бандлы: {bundler.out_dir}")
+
+        def bundled_url(schema: Path) -> str:
+            if not args.check:
+                try:
+                    bundler.write(schema)
+                except ValueError as e:
+                    print(f"⚠️  {e}")
+            return file_url(bundler.output_path(schema))
+
+        url_for = bundled_url
+
+    entries = merge_entries(existing, generator.generate(url_for), args.dirs)
+    generator.save_state()
+    if bundler is not None:
+        bundler.save_manifest()
+        print(f"📦 {bundler.stats}")
+    print(f"🔄 {generator.stats}")
+
+    old = {json.dumps(e, sort_keys=True) for e in existing}
+    new = {json.dumps(e, sort_keys=True) for e in entries}
+    added, removed = len(new - old), len(old - new)
+    print(f"\n📈 Записей: {len(entries)}  ➕ {added}  ➖ {removed}")
+
+    if entries == existing:
+        print(f"✅ {output.name} актуален")
+        return
+    if args.check:
+        print(f"❌ {output.name} устарел")
+        sys.exit(1)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    temp = output.with_name(f".{output.name}.tmp")
+    temp.write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+    temp.replace(output)
+    print(f"💾 Записан: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+refs/refs_fix_v1.0.0.py
\ No newline at end of file
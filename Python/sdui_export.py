@@ -7,6 +7,11 @@ Changes in v6.3:
 - [FEAT] Versioning: If content differs from existing file, creates a new timestamped file
 - [LOGIC] Skips writing if content is identical to existing file
 - [ARCH] Includes v6.2 fixes (TagView schema, directory auto-creation)
+- [PERF] FigmaClient: pooled keep-alive Session, one backoff + Retry-After
+  policy for 429 / 5xx / network errors, request timeouts
+  (same client as utils/sdui/sdui_export_v7.9.1.py: shared 429 cool-down,
+  MAX_NETWORK_RETRY_TIME cap, fail-fast for an unreachable FIGMA_API_URL override)
+- [FEAT] FIGMA_API_URL env: run against the local utils/sdui/figma_api_stub.py
 
 Previous versions:
 - v6.2: Default paths, directory creation
@@ -14,12 +19,16 @@ Previous versions:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import re
 import argparse
 import sys
 import os
 import time
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple, Callable
 
@@ -40,6 +49,17 @@ INITIAL_DELAY = 2.0
 BACKOFF_FACTOR = 2.0
 MAX_DELAY = 120.0
 MAX_RETRY_AFTER = 180.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REQUEST_TIMEOUT = (10, 120)  # connect, read (seconds)
+MAX_NETWORK_RETRY_TIME = 60.0  # connection / timeout retries of one call, waits included (seconds)
+MAX_WORKERS = 4  # FigmaClient pool size
+# Override for a local stand-in (utils/sdui/figma_api_stub.py)
+DEFAULT_FIGMA_API_URL = "https://api.figma.com"
+FIGMA_API_URL = os.getenv("FIGMA_API_URL", DEFAULT_FIGMA_API_URL).rstrip("/")
+
+# 429 cool-down shared by concurrent fetch workers (time.monotonic deadline)
+_RATE_LIMIT_UNTIL = 0.0
+_RATE_LIMIT_LOCK = threading.Lock()
 
 # === CONSTANTS ===
 SPACING_MAP = {
@@ -400,33 +420,189 @@ def transform_node_full(node: Dict) -> Optional[Dict]:
 # === NETWORK & CACHE ===
 
 
-def retry_with_backoff(func: Callable) -> Optional[Any]:
+def wait_for_rate_limit() -> None:
+    """Block while another worker holds a 429 cool-down"""
+    while True:
+        with _RATE_LIMIT_LOCK:
+            remaining = _RATE_LIMIT_UNTIL - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(remaining)
+
+
+def retry_after_seconds(response: requests.Response) -> float:
+    """Retry-After as seconds (delta or HTTP date), capped at MAX_RETRY_AFTER"""
+    value = response.headers.get("Retry-After", "").strip()
+    if not value:
+        return 0.0
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return 0.0
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def retry_with_backoff(func: Callable, fail_fast_connect: bool = False) -> Optional[Any]:
+    """
+    Single retry policy for every Figma call:
+    429 / 5xx / connection errors → wait max(backoff, Retry-After) and retry,
+    other HTTP errors → fail at once.
+
+    Connection / timeout retries stop once the call would exceed
+    MAX_NETWORK_RETRY_TIME; there is no wait after the last attempt.
+    fail_fast_connect: a refused / unresolvable host is not retried
+    (a mistyped --api-url / FIGMA_API_URL should not hang for minutes).
+    """
+    global _RATE_LIMIT_UNTIL
+    started = time.monotonic()
     delay = INITIAL_DELAY
     for attempt in range(MAX_RETRIES):
+        wait_for_rate_limit()
         try:
             return func()
         except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:
-                retry_after = int(e.response.headers.get("Retry-After", 0))
-                if retry_after > MAX_RETRY_AFTER:
-                    retry_after = MAX_RETRY_AFTER
-                wait_time = max(delay, retry_after) if retry_after > 0 else delay
-                print(
-                    f"⏳ 429 Rate Limit. Waiting {int(wait_time)}s...", file=sys.stderr
-                )
-                time.sleep(wait_time)
-                delay = min(delay * BACKOFF_FACTOR, MAX_DELAY)
-            else:
-                print(f"❌ HTTP Error {e.response.status_code}", file=sys.stderr)
+            status = e.response.status_code
+            if status not in RETRY_STATUSES:
+                print(f"❌ HTTP Error {status}", file=sys.stderr)
+                return None
+            retry = retry_after_seconds(e.response)
+            wait = max(delay, retry) if retry else delay
+            label = "429 Rate Limit." if status == 429 else f"HTTP {status}."
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if fail_fast_connect and isinstance(e, requests.exceptions.ConnectionError):
+                print(f"❌ Cannot connect: {e}", file=sys.stderr)
                 return None
+            status = None
+            wait = delay
+            label = f"Network Error: {e}."
         except Exception as e:
             print(f"❌ Network Error: {e}", file=sys.stderr)
             return None
+
+        if attempt + 1 == MAX_RETRIES:
+            break
+        if status is None and time.monotonic() - started + wait > MAX_NETWORK_RETRY_TIME:
+            print(f"❌ Giving up after {int(time.monotonic() - started)}s of network errors", file=sys.stderr)
+            return None
+        print(
+            f"⏳ {label} Waiting {int(wait)}s... ({attempt+1}/{MAX_RETRIES})",
+            file=sys.stderr,
+        )
+        if status == 429:
+            # Shared cool-down: concurrent workers pause too instead of
+            # hammering the limit with their own requests
+            with _RATE_LIMIT_LOCK:
+                _RATE_LIMIT_UNTIL = max(_RATE_LIMIT_UNTIL, time.monotonic() + wait)
+        else:
+            time.sleep(wait)
+        delay = min(delay * BACKOFF_FACTOR, MAX_DELAY)
+    print(f"❌ Max retries ({MAX_RETRIES}) exceeded", file=sys.stderr)
     return None
 
 
-def fetch_figma_node(file_key: str, node_id: str, use_cache: bool) -> Optional[Dict]:
-    if not FIGMA_TOKEN:
+# === FIGMA CLIENT ===
+# Kept identical in sdui_export.py and utils/sdui/sdui_export_v7.9.1.py:
+# from wait_for_rate_limit() to the end of FigmaClient.
+
+
+class FigmaClient:
+    """
+    Figma REST API over one keep-alive requests.Session.
+
+    Node, metadata and image calls share the connection pool, so a batch
+    export pays the TCP + TLS handshake once per pooled connection instead
+    of once per request and retry. pool_size should cover the worker count.
+    A non-default base_url (local stub) fails fast on connection errors.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        pool_size: int = MAX_WORKERS,
+        base_url: Optional[str] = None,
+    ):
+        self.token = token
+        self.base_url = (base_url or FIGMA_API_URL).rstrip("/")
+        self.fail_fast_connect = self.base_url != DEFAULT_FIGMA_API_URL
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=2, pool_maxsize=max(1, pool_size), max_retries=0
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {"X-Figma-Token": token, "Accept-Encoding": "gzip, deflate"}
+        )
+
+    def get_json(self, path: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        def req():
+            r = self.session.get(
+                f"{self.base_url}{path}", params=params, timeout=REQUEST_TIMEOUT
+            )
+            r.raise_for_status()
+            return r.json()
+
+        return retry_with_backoff(req, fail_fast_connect=self.fail_fast_connect)
+
+    def nodes(self, file_key: str, node_ids: List[str]) -> Optional[Dict]:
+        ids = ",".join(n.replace("-", ":") for n in node_ids)
+        return self.get_json(f"/v1/files/{file_key}/nodes", {"ids": ids})
+
+    def file_meta(self, file_key: str) -> Optional[Dict]:
+        """depth=1: name, version, lastModified without the node tree"""
+        return self.get_json(f"/v1/files/{file_key}", {"depth": 1})
+
+    def images(
+        self, file_key: str, node_ids: List[str], fmt: str = "png", scale: float = 2
+    ) -> Dict[str, str]:
+        """node_id → rendered image URL (one request for all ids)"""
+        ids = ",".join(n.replace("-", ":") for n in node_ids)
+        data = self.get_json(
+            f"/v1/images/{file_key}", {"ids": ids, "format": fmt, "scale": scale}
+        )
+        if not data or data.get("err"):
+            if data:
+                print(f"❌ Render error: {data['err']}", file=sys.stderr)
+            return {}
+        return {
+            key.replace(":", "-"): url
+            for key, url in (data.get("images") or {}).items()
+            if url
+        }
+
+    def download(self, url: str, path: Path) -> bool:
+        def req():
+            # Rendered images live outside the API host: no token there
+            r = self.session.get(
+                url, headers={"X-Figma-Token": None}, timeout=REQUEST_TIMEOUT
+            )
+            r.raise_for_status()
+            return r.content
+
+        content = retry_with_backoff(req)
+        if content is None:
+            return False
+        path.write_bytes(content)
+        return True
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "FigmaClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def fetch_figma_node(
+    client: FigmaClient, file_key: str, node_id: str, use_cache: bool
+) -> Optional[Dict]:
+    if not client.token:
+        # requests drops a None header: the request would fail with a bare 403
         print("❌ FIGMA_TOKEN missing", file=sys.stderr)
         return None
 
@@ -436,13 +612,7 @@ def fetch_figma_node(file_key: str, node_id: str, use_cache: bool) -> Optional[D
         with open(cache_path) as f:
             return json.load(f)
 
-    def _req():
-        url = f"https://api.figma.com/v1/files/{file_key}/nodes?ids={node_id.replace('-', '%3A')}"
-        r = requests.get(url, headers={"X-Figma-Token": FIGMA_TOKEN})
-        r.raise_for_status()
-        return r.json()
-
-    data = retry_with_backoff(_req)
+    data = client.nodes(file_key, [node_id])
     if data:
         try:
             key = list(data["nodes"].keys())[0]
@@ -451,7 +621,7 @@ def fetch_figma_node(file_key: str, node_id: str, use_cache: bool) -> Optional[D
                 with open(cache_path, "w") as f:
                     json.dump(node_data, f)
             return node_data
-        except (KeyError, IndexError):
+        except (KeyError, IndexError, TypeError):
             print("❌ Error parsing Figma API response", file=sys.stderr)
     return None
 
@@ -549,7 +719,12 @@ if __name__ == "__main__":
     file_key, node_id = match.groups()
     node_id = node_id.replace(":", "-")
 
-    root = fetch_figma_node(file_key, node_id, not args.no_cache)
+    if not FIGMA_TOKEN:
+        print("❌ FIGMA_TOKEN missing", file=sys.stderr)
+        sys.exit(1)
+
+    with FigmaClient(FIGMA_TOKEN) as client:
+        root = fetch_figma_node(client, file_key, node_id, not args.no_cache)
     if root:
         res = transform_node_full(root)
         if res:
@@ -31,6 +31,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from sdui_tools import (
     VERSION,
+    IncrementalValidator,
+    ValidationCache,
     generate_output_paths,
     get_max_mtime,
     render_template,
@@ -56,16 +58,24 @@ def print_config(template_path, data_path, jj_full_path, map_path, full_path):
 
 
 def run_watch_mode(template_path, data_path, jj_full_path, map_path, full_path,
-                   validate_computed=True, verbose_validation=False):
+                   validate_computed=True, verbose_validation=False, cache=None):
     """
     Run in smart watch mode - monitors file changes and re-renders.
+
+    Validation is incremental: only subtrees changed since the previous
+    render are re-checked. Contracts already validated (by any tool sharing
+    the cache) are not re-checked at all.
     """
     print("👀 Smart mode enabled. Watching for file changes...\n")
 
+    validator = IncrementalValidator()
+
     success, watched_files = render_template(
         template_path, data_path, jj_full_path, map_path, full_path,
         validate_computed=validate_computed,
-        verbose_validation=verbose_validation
+        verbose_validation=verbose_validation,
+        validator=validator,
+        cache=cache
     )
 
     last_mtime, _ = get_max_mtime(watched_files)
@@ -95,7 +105,9 @@ def run_watch_mode(template_path, data_path, jj_full_path, map_path, full_path,
                 success, watched_files = render_template(
                     template_path, data_path, jj_full_path, map_path, full_path,
                     validate_computed=validate_computed,
-                    verbose_validation=verbose_validation
+                    verbose_validation=verbose_validation,
+                    validator=validator,
+                    cache=cache
                 )
 
                 last_mtime, _ = get_max_mtime(watched_files)
@@ -120,6 +132,7 @@ Examples:
   %(prog)s --template my_template.java --data my_data.json --smart
   %(prog)s --template my_template.java --data my_data.json --no-validate
   %(prog)s --template my_template.java --data my_data.json --smart --verbose
+  %(prog)s --template my_template.java --data my_data.json --no-cache
         """
     )
     
@@ -150,6 +163,11 @@ Examples:
         action="store_true",
         help="Verbose validation output (show all computed keys)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-validate (skip the shared validation result cache)",
+    )
     parser.add_argument(
         "--version",
         action="version",
@@ -174,18 +192,21 @@ Examples:
 
     # Run
     validate_computed = not args.no_validate
+    cache = None if args.no_cache else ValidationCache()
     
     if args.smart:
         run_watch_mode(
             template_path, data_path, jj_full_path, map_path, full_path,
             validate_computed=validate_computed,
-            verbose_validation=args.verbose
+            verbose_validation=args.verbose,
+            cache=cache
         )
     else:
         success, _ = render_template(
             template_path, data_path, jj_full_path, map_path, full_path,
             validate_computed=validate_computed,
-            verbose_validation=args.verbose
+            verbose_validation=args.verbose,
+            cache=cache
         )
         sys.exit(0 if success else 1)
 
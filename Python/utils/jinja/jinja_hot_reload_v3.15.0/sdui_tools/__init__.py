@@ -8,7 +8,15 @@ Modules:
 - utils: JSON processing, file operations
 - paths: Output path generation
 - imports: Module and Jinja include resolution
+- traversal: Single-pass contract index (computed refs + JSON Pointers)
+- rules: Validation rule registry with per-rule cost accounting
+- graph: Computed dependency graph (cycles, dead keys, evaluation depth)
+- scc: Strongly connected components (symlink to refs_tools/scc.py, shared)
+- incremental: Re-validation of changed subtrees between renders
+- cache: Content-hash-keyed persistent validation result cache
+- batch: Parallel validation of [FULL_*] contracts, JSONL/JUnit/SARIF reports
 - validators: Computed section validation
+- schemas: Component validation against front-middle-schema JSON Schemas
 - renderer: Main template rendering pipeline
 
 Usage:
@@ -41,6 +49,19 @@ from .imports import (
     parse_module_imports,
     resolve_jinja_includes,
 )
+from .traversal import (
+    ContractIndex,
+    index_contract,
+    format_pointer,
+)
+from .graph import ComputedGraph, build_computed_graph
+from .rules import (
+    NodeKind,
+    Rule,
+    RuleRegistry,
+    RuleStats,
+    DEFAULT_REGISTRY,
+)
 from .validators import (
     ValidationIssue,
     ValidationResult,
@@ -51,6 +72,16 @@ from .validators import (
     format_validation_report,
     validate_file,
 )
+from .schemas import SchemaStore
+from .incremental import IncrementalValidator, IncrementalStats
+from .cache import ValidationCache
+from .batch import (
+    FileReport,
+    discover_contracts,
+    validate_many,
+    write_junit,
+    write_sarif,
+)
 from .renderer import render_template
 
 
@@ -74,6 +105,19 @@ __all__ = [
     # Imports
     "parse_module_imports",
     "resolve_jinja_includes",
+    # Traversal
+    "ContractIndex",
+    "index_contract",
+    "format_pointer",
+    # Graph
+    "ComputedGraph",
+    "build_computed_graph",
+    # Rules
+    "NodeKind",
+    "Rule",
+    "RuleRegistry",
+    "RuleStats",
+    "DEFAULT_REGISTRY",
     # Validators
     "ValidationIssue",
     "ValidationResult",
@@ -83,6 +127,19 @@ __all__ = [
     "validate_computed_references",
     "format_validation_report",
     "validate_file",
+    # Schemas
+    "SchemaStore",
+    # Incremental
+    "IncrementalValidator",
+    "IncrementalStats",
+    # Cache
+    "ValidationCache",
+    # Batch
+    "FileReport",
+    "discover_contracts",
+    "validate_many",
+    "write_junit",
+    "write_sarif",
     # Renderer
     "render_template",
 ]
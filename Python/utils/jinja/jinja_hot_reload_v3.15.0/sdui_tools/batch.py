@@ -0,0 +1,282 @@
+"""
+SDUI Batch Validation
+=====================
+Параллельная валидация каталогов [FULL_*] контрактов и отчёты для CI.
+
+- Поиск файлов: каталоги (рекурсивно [FULL_*].json), glob-паттерны, файлы
+- Валидация в пуле процессов, результаты отдаются по мере готовности
+- Отчёты: JSON Lines, JUnit XML, SARIF 2.1.0
+
+Usage:
+    files = discover_contracts(["_JSON/WEB"])
+    for report in validate_many(files, workers=8):
+        print(report.path, report.elapsed)
+"""
+
+import glob
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from .config import VERSION
+from .cache import ValidationCache
+from .rules import DEFAULT_REGISTRY
+from .schemas import SchemaStore
+from .validators import Severity, ValidationIssue, validate_sdui_contract
+
+
+FULL_PREFIX = "[FULL_"
+FULL_SUFFIX = ".json"
+
+# SchemaStore процесса-воркера: валидаторы компилируются один раз на процесс
+_schema_stores = {}
+_validation_caches = {}
+
+
+@dataclass
+class FileReport:
+    """Результат валидации одного файла"""
+    path: str
+    elapsed: float = 0.0                      # секунды
+    issues: List[ValidationIssue] = field(default_factory=list)
+    error: Optional[str] = None               # Ошибка чтения файла
+
+    @property
+    def errors(self) -> List[ValidationIssue]:
+        return [i for i in self.issues if i.severity == Severity.ERROR]
+
+    @property
+    def warnings(self) -> List[ValidationIssue]:
+        return [i for i in self.issues if i.severity == Severity.WARNING]
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error is None and not self.errors
+
+
+def is_full_contract(file_name: str) -> bool:
+    """[FULL_<PLATFORM>]_name.json"""
+    return file_name.startswith(FULL_PREFIX) and file_name.endswith(FULL_SUFFIX)
+
+
+def discover_contracts(targets: Iterable[str]) -> List[str]:
+    """
+    Собирает пути к контрактам из каталогов, glob-паттернов и файлов.
+
+    Каталоги обходятся рекурсивно и дают только [FULL_*].json;
+    файлы и результаты glob берутся как есть. Скрытые каталоги пропускаются.
+
+    Returns:
+        List[str]: Абсолютные пути без дублей, отсортированные
+    """
+    found = set()
+
+    for target in targets:
+        if os.path.isdir(target):
+            for root, dirs, files in os.walk(target):
+                dirs[:] = [d for d in dirs if not d.startswith(".")]
+                for name in files:
+                    if is_full_contract(name):
+                        found.add(os.path.abspath(os.path.join(root, name)))
+        elif os.path.isfile(target):
+            found.add(os.path.abspath(target))
+        else:
+            for match in glob.glob(target, recursive=True):
+                if os.path.isfile(match):
+                    found.add(os.path.abspath(match))
+
+    return sorted(found)
+
+
+def validate_path(path: str, disabled: Sequence[str] = (),
+                  schema_root: Optional[str] = None,
+                  cache_dir: Optional[str] = None) -> FileReport:
+    """
+    Валидирует один файл. Выполняется в процессе пула.
+
+    Args:
+        path: Путь к JSON контракту
+        disabled: Выключенные правила/коды (как --disable)
+        schema_root: front-middle-schema/SDUI — дополнительно валидировать компоненты
+        cache_dir: Каталог ValidationCache — неизменённые файлы не перевалидируются
+    """
+    started = time.perf_counter()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+    except Exception as e:
+        return FileReport(path=path, elapsed=time.perf_counter() - started, error=str(e))
+
+    registry = DEFAULT_REGISTRY
+    if disabled:
+        registry = DEFAULT_REGISTRY.copy()
+        for code in disabled:
+            registry.disable(code)
+
+    schemas = None
+    if schema_root:
+        schemas = _schema_stores.get(schema_root)
+        if schemas is None:
+            schemas = _schema_stores[schema_root] = SchemaStore(schema_root)
+
+    cache = None
+    if cache_dir:
+        cache = _validation_caches.get(cache_dir)
+        if cache is None:
+            cache = _validation_caches[cache_dir] = ValidationCache(cache_dir)
+
+    result = validate_sdui_contract(content, registry=registry, schemas=schemas, cache=cache)
+    return FileReport(path=path, elapsed=time.perf_counter() - started, issues=result.issues)
+
+
+def validate_many(paths: Sequence[str], workers: Optional[int] = None,
+                  disabled: Sequence[str] = (),
+                  schema_root: Optional[str] = None,
+                  cache_dir: Optional[str] = None) -> Iterator[FileReport]:
+    """
+    Валидирует файлы в пуле процессов и отдаёт результаты по мере готовности.
+
+    Args:
+        paths: Пути к контрактам
+        workers: Размер пула (по умолчанию os.cpu_count()); 1 — без пула
+        disabled: Выключенные правила/коды
+        schema_root: Валидировать компоненты по схемам из этой директории
+        cache_dir: Каталог ValidationCache (None — без кеша)
+
+    Yields:
+        FileReport: В порядке завершения, не в порядке paths
+    """
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            yield validate_path(path, disabled, schema_root, cache_dir)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(validate_path, path, tuple(disabled), schema_root, cache_dir): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield FileReport(path=futures[future], error=f"Worker failed: {e}")
+
+
+# ==================== Reports ====================
+
+def issue_to_dict(issue: ValidationIssue) -> dict:
+    return {
+        "severity": issue.severity.value,
+        "code": issue.code,
+        "key": issue.key,
+        "message": issue.message,
+        "hint": issue.hint,
+        "found_type": issue.found_type,
+        "location": issue.location,
+    }
+
+
+def report_to_json_line(report: FileReport) -> str:
+    """Одна строка JSON Lines на файл"""
+    return json.dumps({
+        "path": report.path,
+        "valid": report.is_valid,
+        "elapsed_ms": round(report.elapsed * 1000, 3),
+        "errors": len(report.errors),
+        "warnings": len(report.warnings),
+        "error": report.error,
+        "issues": [issue_to_dict(i) for i in report.issues],
+    }, ensure_ascii=False)
+
+
+def write_junit(reports: Sequence[FileReport], out_path: str, base_dir: Optional[str] = None) -> None:
+    """JUnit XML: файл — testcase, ошибки валидации — failure"""
+    failures = sum(1 for r in reports if r.error is None and r.errors)
+    errors = sum(1 for r in reports if r.error is not None)
+    total_time = sum(r.elapsed for r in reports)
+
+    suites = ET.Element("testsuites")
+    suite = ET.SubElement(suites, "testsuite", {
+        "name": "sdui-computed-validation",
+        "tests": str(len(reports)),
+        "failures": str(failures),
+        "errors": str(errors),
+        "time": f"{total_time:.3f}",
+    })
+
+    for report in reports:
+        name = os.path.relpath(report.path, base_dir) if base_dir else report.path
+        case = ET.SubElement(suite, "testcase", {
+            "classname": os.path.dirname(name) or ".",
+            "name": os.path.basename(name),
+            "time": f"{report.elapsed:.3f}",
+        })
+        if report.error is not None:
+            node = ET.SubElement(case, "error", {"message": report.error})
+            node.text = report.error
+        elif report.errors:
+            node = ET.SubElement(case, "failure", {
+                "message": f"{len(report.errors)} error(s)",
+                "type": ",".join(sorted({i.code for i in report.errors})),
+            })
+            node.text = "\n".join(
+                f"[{i.code}] {i.message} @ {i.location or '-'}" for i in report.errors
+            )
+
+    tree = ET.ElementTree(suites)
+    tree.write(out_path, encoding="utf-8", xml_declaration=True)
+
+
+_SARIF_LEVELS = {
+    Severity.ERROR: "error",
+    Severity.WARNING: "warning",
+    Severity.INFO: "note",
+}
+
+
+def build_sarif(reports: Sequence[FileReport], base_dir: Optional[str] = None) -> dict:
+    """SARIF 2.1.0: одна run, правила — коды проблем"""
+    rules = {}
+    results = []
+
+    for report in reports:
+        uri = os.path.relpath(report.path, base_dir) if base_dir else report.path
+        uri = uri.replace(os.sep, "/")
+        for issue in report.issues:
+            if issue.code not in rules:
+                rules[issue.code] = {
+                    "id": issue.code,
+                    "shortDescription": {"text": issue.message},
+                    "help": {"text": issue.hint},
+                }
+            location = {"physicalLocation": {"artifactLocation": {"uri": uri}}}
+            if issue.location:
+                location["logicalLocations"] = [{"fullyQualifiedName": issue.location}]
+            results.append({
+                "ruleId": issue.code,
+                "level": _SARIF_LEVELS.get(issue.severity, "note"),
+                "message": {"text": f"{issue.message} 💡 {issue.hint}"},
+                "locations": [location],
+            })
+
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [{
+            "tool": {
+                "driver": {
+                    "name": "sdui-computed-validator",
+                    "version": VERSION,
+                    "rules": sorted(rules.values(), key=lambda r: r["id"]),
+                }
+            },
+            "results": results,
+        }],
+    }
+
+
+def write_sarif(reports: Sequence[FileReport], out_path: str, base_dir: Optional[str] = None) -> None:
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(build_sarif(reports, base_dir), f, indent=2, ensure_ascii=False)
@@ -0,0 +1,396 @@
+"""
+SDUI Validation Result Cache
+============================
+Кеш результатов валидации по содержимому контракта.
+
+- Ключ — SHA-256 компактного JSON в порядке документа + версия набора правил
+  (порядок ключей не нормализуется: от него зависят location в issues);
+  в версию входит и исходный код модулей обхода/графа/правил
+- Watch mode ищет только по хешу сырого текста (lookup(..., parse=False)):
+  контракт уже разобран, а сериализовать его ради ключа — лишний O(N)
+- Для строк сначала проверяется хеш сырого текста: тот же файл
+  отвечается без json.loads и без обхода
+- Записи — файлы в общем каталоге: watcher, CI и batch CLI делят один кеш
+- Вытеснение: TTL с последнего использования (и для LRU в памяти),
+  лимит записей и байт (LRU по mtime)
+
+Usage:
+    cache = ValidationCache()
+    result = validate_sdui_contract(content, cache=cache)
+    print(cache.hits, cache.misses)
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .config import (
+    VERSION,
+    MAX_COMPUTED_DEPTH,
+    VALID_COMPUTED_TYPES,
+    KNOWN_UI_COMPONENTS,
+    VALIDATION_CACHE_DIR,
+    VALIDATION_CACHE_MAX_ENTRIES,
+    VALIDATION_CACHE_MAX_BYTES,
+    VALIDATION_CACHE_TTL,
+)
+from . import graph, incremental, rules, scc, traversal, validators
+from .rules import DEFAULT_REGISTRY, RuleRegistry
+from .validators import Severity, ValidationIssue, ValidationResult
+
+
+# Формат записи — меняется при изменении сериализации или ключа
+# (2: ключ в порядке документа, записи с sort_keys ключами недействительны)
+CACHE_FORMAT = 2
+
+# Как часто store() запускает prune()
+PRUNE_EVERY = 64
+
+_RESULT_PREFIX = "r-"
+_ALIAS_PREFIX = "a-"
+
+# Модули, от логики которых зависит результат — fingerprint() реестра
+# видит только байткод check/finish самих правил
+_LOGIC_MODULES = (traversal, scc, graph, rules, validators, incremental)
+
+_logic_digest: Optional[str] = None
+
+
+def logic_digest() -> str:
+    """SHA-1 исходников _LOGIC_MODULES — правка обхода или графа меняет ключ кеша"""
+    global _logic_digest
+    if _logic_digest is None:
+        digest = hashlib.sha1()
+        for module in _LOGIC_MODULES:
+            digest.update(module.__name__.encode("utf-8"))
+            try:
+                with open(module.__file__, "rb") as f:
+                    digest.update(f.read())
+            except (OSError, TypeError):
+                digest.update(VERSION.encode("utf-8"))
+        _logic_digest = digest.hexdigest()
+    return _logic_digest
+
+
+def result_to_dict(result: ValidationResult) -> Dict[str, Any]:
+    """ValidationResult → JSON-совместимый dict (без rule_stats и графа)"""
+    return {
+        "is_valid": result.is_valid,
+        "issues": [
+            [i.severity.value, i.code, i.key, i.message, i.hint, i.found_type, i.location]
+            for i in result.issues
+        ],
+        "computed_keys": sorted(result.computed_keys),
+        "valid_computed_keys": sorted(result.valid_computed_keys),
+        "invalid_computed_keys": result.invalid_computed_keys,
+    }
+
+
+def result_from_dict(payload: Dict[str, Any]) -> ValidationResult:
+    return ValidationResult(
+        is_valid=payload["is_valid"],
+        issues=[
+            ValidationIssue(
+                severity=Severity(severity), code=code, key=key, message=message,
+                hint=hint, found_type=found_type, location=location,
+            )
+            for severity, code, key, message, hint, found_type, location in payload["issues"]
+        ],
+        computed_keys=set(payload["computed_keys"]),
+        valid_computed_keys=set(payload["valid_computed_keys"]),
+        invalid_computed_keys=dict(payload["invalid_computed_keys"]),
+        cached=True,
+    )
+
+
+def canonical_digest(data: Any) -> str:
+    """
+    SHA-256 компактного JSON: форматирование не влияет, порядок ключей — влияет.
+
+    REF правила сообщают первое вхождение в порядке документа, поэтому
+    контракты, различающиеся только порядком ключей, — разные записи.
+    """
+    text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ValidationCache:
+    """
+    Персистентный кеш ValidationResult.
+
+    Поверх файлов — небольшой LRU в памяти процесса (watch mode).
+    Ошибки файловой системы не ломают валидацию: кеш просто промахивается.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_entries: int = VALIDATION_CACHE_MAX_ENTRIES,
+                 max_bytes: int = VALIDATION_CACHE_MAX_BYTES,
+                 ttl: float = VALIDATION_CACHE_TTL,
+                 memory_entries: int = 64):
+        self.cache_dir = cache_dir or VALIDATION_CACHE_DIR
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+
+        # key → (payload, время последнего использования)
+        self._memory: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._aliases: Dict[str, str] = {}
+        self._rulesets: Dict[Tuple, str] = {}
+        self._puts = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    # ==================== Keys ====================
+
+    def ruleset_version(self, registry: Optional[RuleRegistry] = None) -> str:
+        """Версия набора правил: VERSION, настройки, байткод правил, код обхода"""
+        registry = registry or DEFAULT_REGISTRY
+        signature = registry.signature()
+        version = self._rulesets.get(signature)
+        if version is None:
+            digest = hashlib.sha1()
+            digest.update(repr((
+                CACHE_FORMAT, VERSION, MAX_COMPUTED_DEPTH,
+                sorted(VALID_COMPUTED_TYPES), sorted(KNOWN_UI_COMPONENTS),
+            )).encode("utf-8"))
+            digest.update(registry.fingerprint().encode("utf-8"))
+            digest.update(logic_digest().encode("utf-8"))
+            version = self._rulesets[signature] = digest.hexdigest()[:16]
+        return version
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    # ==================== Lookup ====================
+
+    def lookup(self, content: Any, registry: Optional[RuleRegistry] = None,
+               parse: bool = True) -> Tuple[Optional[str], Optional[ValidationResult], Any]:
+        """
+        Ищет результат для контракта.
+
+        Args:
+            content: JSON строка или распарсенный контракт
+            registry: Набор правил, которым будет валидироваться контракт
+            parse: False — только хеш сырого текста: строка не разбирается,
+                ключом записи становится сам хеш (для вызывающих, у которых
+                контракт уже разобран — watch mode)
+
+        Returns:
+            tuple: (key, result или None, распарсенный контракт или None).
+            key = None — контракт не разобрать, кешировать нечего.
+        """
+        ruleset = self.ruleset_version(registry)
+        raw_key = None
+        missed = None
+
+        if isinstance(content, str):
+            raw_key = hashlib.sha256(content.encode("utf-8")).hexdigest() + "-" + ruleset
+            key = self._read_alias(raw_key)
+            if key is not None:
+                result = self.get(key)
+                if result is not None:
+                    return key, result, None
+                missed = key
+            if not parse:
+                if missed is not None:
+                    return missed, None, None
+                return raw_key, self.get(raw_key), None
+            try:
+                data = json.loads(content)
+            except json.JSONDecodeError:
+                return None, None, None
+        else:
+            data = content
+
+        key = canonical_digest(data) + "-" + ruleset
+        if raw_key is not None:
+            self._write_alias(raw_key, key)
+        if key == missed:
+            return key, None, data
+        return key, self.get(key), data
+
+    def get(self, key: str) -> Optional[ValidationResult]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            payload, used = entry
+            now = time.time()
+            if self.ttl and now - used > self.ttl:
+                # Тот же TTL, что у файлов: дальше решает запись на диске
+                del self._memory[key]
+            else:
+                self._memory[key] = (payload, now)
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return result_from_dict(payload)
+
+        path = self._path(_RESULT_PREFIX + key + ".json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry.get("format") != CACHE_FORMAT:
+                raise ValueError("stale format")
+            if self.ttl and time.time() - os.stat(path).st_mtime > self.ttl:
+                os.remove(path)
+                self.evicted += 1
+                raise ValueError("expired")
+            os.utime(path)  # LRU: отметка последнего использования
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        self._remember(key, entry["result"])
+        self.hits += 1
+        return result_from_dict(entry["result"])
+
+    # ==================== Store ====================
+
+    def store(self, key: str, result: ValidationResult) -> None:
+        """Сохраняет результат под ключом из lookup()"""
+        payload = result_to_dict(result)
+        self._remember(key, payload)
+        self._write(_RESULT_PREFIX + key + ".json", {
+            "format": CACHE_FORMAT,
+            "created": time.time(),
+            "result": payload,
+        })
+
+        self._puts += 1
+        if self._puts % PRUNE_EVERY == 0:
+            self.prune()
+
+    def _remember(self, key: str, payload: Dict[str, Any]) -> None:
+        self._memory[key] = (payload, time.time())
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_alias(self, raw_key: str) -> Optional[str]:
+        key = self._aliases.get(raw_key)
+        if key is None:
+            try:
+                with open(self._path(_ALIAS_PREFIX + raw_key), "r", encoding="utf-8") as f:
+                    key = f.read().strip() or None
+            except OSError:
+                return None
+            if key is not None:
+                self._aliases[raw_key] = key
+        return key
+
+    def _write_alias(self, raw_key: str, key: str) -> None:
+        if self._aliases.get(raw_key) == key:
+            return
+        self._aliases[raw_key] = key
+        self._write(_ALIAS_PREFIX + raw_key, key)
+
+    def _write(self, name: str, value: Any) -> None:
+        """Атомарная запись: batch-воркеры пишут в один каталог"""
+        path = self._path(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                if isinstance(value, str):
+                    f.write(value)
+                else:
+                    json.dump(value, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # Кеш — оптимизация, не ошибка валидации
+
+    # ==================== Eviction ====================
+
+    def prune(self) -> int:
+        """
+        Удаляет просроченные записи и самые старые сверх лимитов.
+
+        Лимиты max_entries / max_bytes — только по результатам (r-*);
+        алиасы (a-*) удаляются вместе с результатом, на который указывают.
+
+        Returns:
+            int: Сколько файлов удалено
+        """
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return 0
+
+        now = time.time()
+        removed = 0
+        results = []
+        aliases = []
+        for name in names:
+            path = self._path(name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith(".tmp"):
+                # Недописанный файл другого процесса — только если давно брошен
+                if now - st.st_mtime > 60 and self._remove(path):
+                    removed += 1
+                continue
+            if name.startswith(_RESULT_PREFIX):
+                results.append((st.st_mtime, st.st_size, name))
+            elif name.startswith(_ALIAS_PREFIX):
+                aliases.append(name)
+
+        # Лимиты считаются только по результатам; свежие первыми — вытесняются с конца
+        results.sort(reverse=True)
+        kept = set()
+        kept_bytes = 0
+        for mtime, size, name in results:
+            key = name[len(_RESULT_PREFIX):-len(".json")]
+            expired = self.ttl and now - mtime > self.ttl
+            over = len(kept) >= self.max_entries or kept_bytes + size > self.max_bytes
+            if expired or over:
+                if self._remove(self._path(name)):
+                    removed += 1
+                    self._memory.pop(key, None)
+                continue
+            kept.add(key)
+            kept_bytes += size
+
+        # Алиасы на удалённые результаты больше ничего не ускоряют
+        for name in aliases:
+            raw_key = name[len(_ALIAS_PREFIX):]
+            key = self._aliases.get(raw_key)
+            if key is None:
+                try:
+                    with open(self._path(name), "r", encoding="utf-8") as f:
+                        key = f.read().strip()
+                except OSError:
+                    continue
+            if key not in kept and self._remove(self._path(name)):
+                self._aliases.pop(raw_key, None)
+                removed += 1
+
+        self.evicted += removed
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def clear(self) -> None:
+        """Полностью очищает кеш"""
+        self._memory.clear()
+        self._aliases.clear()
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
@@ -27,6 +27,23 @@ _DATA_REL = "_JSON/WEB/payroll/1.0_main_screen/[data]_1.0_main_screen.json"
 DEFAULT_TEMPLATE_PATH = os.path.join(PROJECT_ROOT, _TEMPLATE_REL)
 DEFAULT_DATA_PATH = os.path.join(PROJECT_ROOT, _DATA_REL)
 
+# ==================== SDUI SCHEMAS ====================
+# Корень схем front-middle-schema/SDUI (components/<Name>/v<N>/<Name>.json)
+DEFAULT_SCHEMA_ROOT = os.environ.get(
+    "SDUI_SCHEMA_ROOT",
+    os.path.join(os.path.expanduser("~"), "Documents", "front-middle-schema", "SDUI"),
+)
+
+# Собранные (bundled) схемы компонентов между запусками
+SCHEMA_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".sdui_schema_cache")
+
+# ==================== VALIDATION CACHE ====================
+# Результаты валидации по хешу контракта — общий для watcher, CI и batch
+VALIDATION_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".sdui_validation_cache")
+VALIDATION_CACHE_MAX_ENTRIES = 5000
+VALIDATION_CACHE_MAX_BYTES = 64 * 1024 * 1024
+VALIDATION_CACHE_TTL = 14 * 24 * 3600  # секунды с последнего использования
+
 # ==================== SDUI COMPUTED TYPES ====================
 # Валидные типы для секции computed (функции, не UI-компоненты)
 VALID_COMPUTED_TYPES = {
@@ -55,6 +72,9 @@ VALID_COMPUTED_TYPES = {
     "toBoolean",
 }
 
+# Цепочка computed → computed длиннее этого — предупреждение GRAPH-004
+MAX_COMPUTED_DEPTH = 5
+
 # UI-компоненты которые ТОЧНО не должны быть в computed
 KNOWN_UI_COMPONENTS = {
     # Layouts
@@ -0,0 +1,183 @@
+"""
+SDUI Computed Dependency Graph
+==============================
+Граф зависимостей computed → computed / data по индексу контракта.
+
+- Рёбра строятся по выражениям секции computed: владелец выражения
+  записан в индексе (owner_spans), путь до него не разбирается
+- Корни — ключи, упомянутые выражениями вне computed
+- Циклы — сильно связные компоненты (Tarjan, итеративно, scc.py)
+- Недостижимые ключи — не используются разметкой ни напрямую, ни через другие computed
+- Глубина вычисления — длина самой длинной цепочки computed под ключом
+
+Usage:
+    graph = computed_graph(index_contract(data))
+    for cycle in graph.cycles:
+        print(" → ".join(cycle + [cycle[0]]))
+    print(graph.depth)
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .scc import cycle_path, strongly_connected
+from .traversal import ContractIndex
+
+
+# computed.X внутри любого выражения: ${computed.a}, ${computed.a > 0 ? ...}
+COMPUTED_DEP_PATTERN = re.compile(r"(?<![\w.$])computed\.(\w+)")
+
+# Простые ссылки на данные: ${source.deeplink}, ${data.user.name}
+DATA_REF_PATTERN = re.compile(r"\$\{(?!computed\.)(\w+\.[\w.\[\]]+)\}")
+
+
+@dataclass
+class ComputedGraph:
+    """Граф зависимостей секции computed"""
+    keys: List[str] = field(default_factory=list)                   # Порядок документа
+    edges: Dict[str, List[str]] = field(default_factory=dict)       # key → computed-зависимости
+    data_refs: Dict[str, List[str]] = field(default_factory=dict)   # key → ссылки на данные
+    roots: Set[str] = field(default_factory=set)                    # Используются вне computed
+    referenced: Set[str] = field(default_factory=set)               # Используются хоть где-то
+    cycles: List[List[str]] = field(default_factory=list)           # Путь каждого цикла
+    depth: Dict[str, Optional[int]] = field(default_factory=dict)   # None — зависит от цикла
+
+    @property
+    def unused(self) -> List[str]:
+        """Ключи, на которые нет ни одной ссылки"""
+        return [key for key in self.keys if key not in self.referenced]
+
+    @property
+    def unreachable(self) -> List[str]:
+        """Ключи, не достижимые из разметки (включая unused)"""
+        reachable = set(self.roots)
+        queue = deque(self.roots)
+        while queue:
+            for dep in self.edges.get(queue.popleft(), ()):
+                if dep not in reachable:
+                    reachable.add(dep)
+                    queue.append(dep)
+        return [key for key in self.keys if key not in reachable]
+
+
+def _top_tokens(path: Optional[tuple]):
+    """Первые два токена связного пути: (top, second)"""
+    top = second = None
+    while path is not None:
+        path, token = path
+        second, top = top, token
+    return top, second
+
+
+def owned_expressions(expressions: Iterable[Tuple[Optional[tuple], str]]) -> List[Tuple[str, str]]:
+    """
+    (key, text) для выражений со связными путями внутри /computed/<key>.
+
+    Для инкрементального валидатора: его юнит computed хранит пути,
+    а не owner_spans. Вызывается только когда секция computed изменилась.
+    """
+    owned = []
+    for path, text in expressions:
+        top, owner = _top_tokens(path)
+        if top == "computed" and owner is not None:
+            owned.append((owner, text))
+    return owned
+
+
+def assemble_computed_graph(computed: Dict[str, object],
+                            owned: Iterable[Tuple[str, str]],
+                            external: Iterable[str]) -> ComputedGraph:
+    """
+    Граф по выражениям секции computed и ссылкам извне.
+
+    Args:
+        computed: Секция computed (порядок ключей — порядок документа)
+        owned: (key, text) — выражения внутри /computed/<key>
+        external: Имена computed.X из выражений вне computed
+    """
+    graph = ComputedGraph(keys=list(computed.keys()))
+    edges = {key: [] for key in graph.keys}
+    data_refs = {key: [] for key in graph.keys}
+    roots = graph.roots
+    referenced = graph.referenced
+    find_deps = COMPUTED_DEP_PATTERN.findall
+    find_data = DATA_REF_PATTERN.findall
+
+    for owner, text in owned:
+        owner_edges = edges.get(owner)
+        if owner_edges is None:
+            continue
+        if "computed." in text:
+            for dep in find_deps(text):
+                if dep in computed and dep not in owner_edges:
+                    owner_edges.append(dep)
+                referenced.add(dep)
+        owner_data = data_refs[owner]
+        for ref in find_data(text):
+            if ref not in owner_data:
+                owner_data.append(ref)
+
+    for dep in external:
+        if dep in computed:
+            roots.add(dep)
+        referenced.add(dep)
+
+    graph.edges = edges
+    graph.data_refs = data_refs
+
+    # Tarjan отдаёт компоненты от листьев к корням — глубина считается тем же проходом
+    order = {key: i for i, key in enumerate(graph.keys)}
+    depth = graph.depth
+    for component in strongly_connected(graph.keys, edges):
+        if len(component) > 1 or component[0] in edges[component[0]]:
+            graph.cycles.append(cycle_path(component, edges, order.__getitem__))
+            for key in component:
+                depth[key] = None
+            continue
+        key = component[0]
+        deps = edges[key]
+        if not deps:
+            depth[key] = 0
+        elif any(depth[dep] is None for dep in deps):
+            depth[key] = None
+        else:
+            depth[key] = 1 + max(depth[dep] for dep in deps)
+
+    graph.cycles.sort(key=lambda cycle: order[cycle[0]])
+    return graph
+
+
+def build_computed_graph(index: ContractIndex) -> ComputedGraph:
+    """
+    Строит граф зависимостей computed по индексу из index_contract.
+
+    Выражения /computed/<key> — отрезки owner_spans индекса, всё
+    остальное — ссылки извне (делают ключ корнем: его использует разметка).
+    Одинаковые выражения вне computed (их в разметке большинство)
+    разбираются регуляркой один раз.
+    """
+    expressions = index.expressions
+    spans = index.owner_spans
+    owned = [
+        (owner, text)
+        for owner, start, end in spans
+        for _, text in expressions[start:end]
+    ]
+    if spans:
+        outside = expressions[:spans[0][1]] + expressions[spans[-1][2]:]
+    else:
+        outside = expressions
+    find_deps = COMPUTED_DEP_PATTERN.findall
+    external: Set[str] = set()
+    for text in {text for _, text in outside if "computed." in text}:
+        external.update(find_deps(text))
+    return assemble_computed_graph(index.computed, owned, external)
+
+
+def computed_graph(index: ContractIndex) -> ComputedGraph:
+    """Граф для индекса — строится один раз и запоминается в index.computed_graph"""
+    if index.computed_graph is None:
+        index.computed_graph = build_computed_graph(index)
+    return index.computed_graph
@@ -0,0 +1,447 @@
+"""
+SDUI Incremental Validator
+==========================
+Перевалидация только изменившихся поддеревьев между рендерами (watch mode).
+
+Контракт делится на юниты: каждое значение верхнего уровня (computed,
+layout, ...) и каждый элемент-контейнер массива $children. Для юнита
+хранится объект прошлого рендера, узлы правил и найденные проблемы.
+
+На следующем рендере юнит сравнивается с прошлой версией (dict/list ==
+работает на C и не строит хешей); совпавшие поддеревья переиспользуются
+целиком, изменённые — обходятся заново, но только до границ дочерних
+юнитов. Если изменилась секция computed, правила перезапускаются
+дополнительно на узлах, ссылающихся на изменённые ключи (обратные ссылки).
+Граф computed хранится между рендерами и строится заново, только если
+изменилась секция computed или набор ключей, упомянутых вне неё.
+
+Usage:
+    validator = IncrementalValidator()
+    result = validator.validate(json_obj)   # первый рендер — полный обход
+    result = validator.validate(json_obj2)  # дальше — только изменения
+    print(validator.last_stats)
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from .graph import (
+    COMPUTED_DEP_PATTERN,
+    ComputedGraph,
+    assemble_computed_graph,
+    owned_expressions,
+)
+from .rules import (
+    DEFAULT_REGISTRY,
+    NodeKind,
+    RuleContext,
+    RuleRegistry,
+    RuleStats,
+    dedupe_issues,
+)
+from .traversal import (
+    COMPUTED_REF_PATTERN,
+    EXPRESSION_MARKER,
+    ContractIndex,
+    classify_computed,
+    iter_child_references,
+)
+from .validators import Severity, ValidationResult
+
+
+# Виды элементов стека обхода юнита
+_NODE = 0           # Обычный узел
+_CHILDREN = 1       # Массив $children — его контейнеры становятся юнитами
+_UNIT = 2           # Граница дочернего юнита
+_COMPUTED_UNIT = 3  # Граница юнита секции computed
+
+_KINDS = tuple(NodeKind)
+
+# Путь юнита секции computed
+_COMPUTED_PATH = (None, "computed")
+
+
+@dataclass
+class IncrementalStats:
+    """Стоимость последнего прогона"""
+    units_total: int = 0
+    units_rebuilt: int = 0     # Юниты, обойдённые заново
+    units_rechecked: int = 0   # Неизменённые юниты с перепроверкой по computed
+    nodes_walked: int = 0      # Контейнеры, пройденные обходом
+    nodes_checked: int = 0     # Узлы, переданные правилам
+    changed_computed: int = 0  # Изменённые ключи computed
+    graph_rebuilt: bool = False  # Граф computed построен заново
+    elapsed: float = 0.0       # секунды
+
+
+class _Unit:
+    """Юнит: поддерево контракта с закешированными узлами и проблемами"""
+    __slots__ = ("value", "events", "children", "keys", "deps", "own_deps",
+                 "nodes", "issues", "count")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.events: list = []           # Записи узлов и дочерние юниты в порядке документа
+        self.children: Dict[tuple, "_Unit"] = {}
+        self.keys: Set[str] = set()      # computed-ключи, упомянутые в поддереве
+        self.deps: Set[str] = set()      # computed.X из выражений поддерева (для графа)
+        self.own_deps: Set[str] = set()  # То же, без дочерних юнитов
+        self.nodes: Dict[NodeKind, list] = {}
+        self.issues: Dict[tuple, list] = {}  # (rule_id, kind) → проблемы поддерева
+        self.count = 1                   # Юнитов в поддереве
+
+
+def _referenced_keys(kind: NodeKind, node: Any) -> Set[str]:
+    """computed-ключи, на которые ссылается узел"""
+    if kind is NodeKind.COMPUTED_REF or kind is NodeKind.COMPUTED_ENTRY:
+        return {node[0]}
+    if kind is NodeKind.EXPRESSION:
+        text = node[1]
+        if "${computed." in text:
+            return set(COMPUTED_REF_PATTERN.findall(text))
+        return set()
+    if kind is NodeKind.CHILDREN:
+        return {key for _, key in iter_child_references(node[1])}
+    return set()
+
+
+class IncrementalValidator:
+    """
+    Валидатор, который помнит прошлый рендер и перепроверяет только изменения.
+
+    Объекты, переданные в validate(), хранятся до следующего вызова —
+    их нельзя менять на месте (renderer каждый раз парсит JSON заново).
+    Результат совпадает с validate_sdui_contract для того же контракта.
+    """
+
+    def __init__(self, registry: Optional[RuleRegistry] = None):
+        self.registry = registry if registry is not None else DEFAULT_REGISTRY
+        self.last_stats = IncrementalStats()
+        self._root: Optional[_Unit] = None
+        self._signature = None
+        self._graph: Optional[ComputedGraph] = None
+        self._graph_inputs = None  # (юнит computed, внешние ссылки), по которым построен граф
+
+    def reset(self) -> None:
+        """Сбрасывает кеш — следующий прогон будет полным"""
+        self._root = None
+        self._signature = None
+        self._graph = None
+        self._graph_inputs = None
+
+    # ==================== Public API ====================
+
+    def validate(self, data: Any) -> ValidationResult:
+        """
+        Валидирует контракт, переиспользуя результаты прошлого рендера.
+
+        Args:
+            data: Распарсенный JSON контракт
+
+        Returns:
+            ValidationResult: Тот же результат, что у validate_sdui_contract
+        """
+        started = time.perf_counter()
+        self._stats = IncrementalStats()
+
+        signature = self.registry.signature()
+        if signature != self._signature:
+            self.reset()
+            self._signature = signature
+
+        self._rules = self.registry.enabled_rules
+        self._rule_stats = {rule.rule_id: RuleStats(rule_id=rule.rule_id) for rule in self._rules}
+
+        # Классификация computed нужна правилам до обхода остальных юнитов
+        computed = data.get("computed", {}) if isinstance(data, dict) else {}
+        if not isinstance(computed, dict):
+            computed = {}
+        self._index = ContractIndex(computed=computed)
+        self._index.valid_keys, self._index.invalid_keys = classify_computed(computed)
+
+        old_root = self._root
+        self._changed = self._changed_computed_keys(old_root, computed)
+        self._stats.changed_computed = len(self._changed)
+
+        root = self._process(data, None, old_root, _UNIT)
+        self._root = root
+
+        result = self._build_result(root)
+        self._stats.units_total = root.count
+        self._stats.elapsed = time.perf_counter() - started
+        self.last_stats = self._stats
+        return result
+
+    # ==================== Units ====================
+
+    def _changed_computed_keys(self, old_root: Optional[_Unit], computed: Dict[str, Any]) -> Set[str]:
+        """Ключи computed, добавленные, удалённые или изменённые с прошлого рендера"""
+        if old_root is None:
+            return set()
+        old_unit = old_root.children.get((None, "computed"))
+        old_computed = old_unit.value if old_unit is not None else {}
+        if not isinstance(old_computed, dict):
+            old_computed = {}
+        if old_computed is computed or old_computed == computed:
+            return set()
+        changed = set()
+        for key in set(old_computed) | set(computed):
+            if old_computed.get(key, changed) != computed.get(key, changed):
+                changed.add(key)
+        return changed
+
+    def _process(self, value: Any, path: Optional[tuple], old: Optional[_Unit], unit_kind: int) -> _Unit:
+        """Переиспользует, перепроверяет или строит юнит заново"""
+        if old is not None:
+            if old.value is value:
+                unchanged = True
+            elif unit_kind == _COMPUTED_UNIT:
+                # computed уже сравнён в _changed_computed_keys
+                unchanged = not self._changed
+            elif path is None:
+                # Корень почти всегда отличается, а его собственное
+                # содержимое — только ключи верхнего уровня
+                unchanged = False
+            else:
+                unchanged = old.value == value
+            if unchanged:
+                if self._changed and old.keys & self._changed:
+                    self._recheck(old)
+                return old
+        return self._build(value, path, old, unit_kind)
+
+    def _build(self, value: Any, path: Optional[tuple], old: Optional[_Unit], unit_kind: int) -> _Unit:
+        """Обходит юнит до границ дочерних юнитов и прогоняет правила по его узлам"""
+        unit = _Unit(value)
+        events = unit.events
+        own_deps = unit.own_deps
+        old_children = old.children if old is not None else {}
+        is_root = path is None
+        entries = []
+
+        def add(kind, node):
+            entry = [kind, node, None]
+            events.append(entry)
+            entries.append(entry)
+
+        if unit_kind == _COMPUTED_UNIT:
+            for key, item in value.items():
+                add(NodeKind.COMPUTED_ENTRY, (key, item))
+
+        stack = [(value, path, _NODE)]
+        push = stack.append
+        pop = stack.pop
+        marker = EXPRESSION_MARKER
+        findall = COMPUTED_REF_PATTERN.findall
+        find_deps = COMPUTED_DEP_PATTERN.findall
+        walked = 0
+
+        # Тот же порядок обхода, что у index_contract
+        while stack:
+            obj, obj_path, kind = pop()
+
+            if kind == _UNIT or kind == _COMPUTED_UNIT:
+                child = self._process(obj, obj_path, old_children.get(obj_path), kind)
+                unit.children[obj_path] = child
+                events.append(child)
+                continue
+
+            obj_type = type(obj)
+
+            if obj_type is str:
+                add(NodeKind.EXPRESSION, (obj_path, obj))
+                if "computed." in obj:
+                    own_deps.update(find_deps(obj))
+                    if "${computed." in obj:
+                        for key in findall(obj):
+                            add(NodeKind.COMPUTED_REF, (key, obj_path, obj))
+                continue
+
+            walked += 1
+
+            if obj_type is dict:
+                top_level = is_root and obj is value
+                for key, item in reversed(obj.items()):
+                    item_type = type(item)
+                    if item_type is str:
+                        if marker in item:
+                            push((item, (obj_path, key), _NODE))
+                    elif item_type is dict or item_type is list:
+                        item_path = (obj_path, key)
+                        if key == "$children" and item_type is list:
+                            add(NodeKind.CHILDREN, (item_path, item))
+                            push((item, item_path, _CHILDREN))
+                        elif top_level:
+                            is_computed = key == "computed" and item_type is dict
+                            push((item, item_path, _COMPUTED_UNIT if is_computed else _UNIT))
+                        else:
+                            push((item, item_path, _NODE))
+                    if marker in key:
+                        push((key, (obj_path, key), _NODE))
+
+            elif obj_type is list:
+                item_kind = _UNIT if kind == _CHILDREN else _NODE
+                for i in range(len(obj) - 1, -1, -1):
+                    item = obj[i]
+                    item_type = type(item)
+                    if item_type is str:
+                        if marker in item:
+                            push((item, (obj_path, i), _NODE))
+                    elif item_type is dict or item_type is list:
+                        push((item, (obj_path, i), item_kind))
+
+        self._stats.units_rebuilt += 1
+        self._stats.nodes_walked += walked
+        self._check(entries)
+        self._aggregate(unit)
+        return unit
+
+    def _recheck(self, unit: _Unit) -> None:
+        """Перезапускает правила на узлах, ссылающихся на изменённые computed-ключи"""
+        changed = self._changed
+        entries = []
+        for event in unit.events:
+            if type(event) is list:
+                if _referenced_keys(event[0], event[1]) & changed:
+                    entries.append(event)
+            elif event.keys & changed:
+                self._recheck(event)
+        self._stats.units_rechecked += 1
+        self._check(entries)
+        self._aggregate(unit)
+
+    def _check(self, entries: List[list]) -> None:
+        """
+        Прогоняет правила по узлам юнита и сохраняет проблемы в записи.
+
+        Контекст правила живёт в пределах одного юнита, поэтому
+        дедупликация через ctx.state не протекает между юнитами.
+        """
+        if not entries:
+            return
+        by_kind: Dict[NodeKind, List[list]] = {}
+        for entry in entries:
+            by_kind.setdefault(entry[0], []).append(entry)
+            entry[2] = {}
+
+        disabled = self.registry.disabled_codes
+        for rule in self._rules:
+            ctx = None
+            rule_stats = self._rule_stats[rule.rule_id]
+            check = rule.check
+            started = time.perf_counter()
+            for kind in rule.kinds:
+                kind_entries = by_kind.get(kind)
+                if not kind_entries:
+                    continue
+                if ctx is None:
+                    ctx = RuleContext(index=self._index, disabled_codes=disabled)
+                issues = ctx.issues
+                for entry in kind_entries:
+                    before = len(issues)
+                    check(ctx, entry[1])
+                    if len(issues) > before:
+                        entry[2][rule.rule_id] = issues[before:]
+                rule_stats.nodes += len(kind_entries)
+                self._stats.nodes_checked += len(kind_entries)
+            rule_stats.elapsed += time.perf_counter() - started
+
+    def _aggregate(self, unit: _Unit) -> None:
+        """Собирает узлы, проблемы и ключи поддерева из записей и дочерних юнитов"""
+        nodes = {kind: [] for kind in _KINDS}
+        issues: Dict[tuple, list] = {}
+        keys: Set[str] = set()
+        deps = set(unit.own_deps)
+        count = 1
+
+        for event in unit.events:
+            if type(event) is list:
+                kind, node, entry_issues = event
+                nodes[kind].append(node)
+                if kind is NodeKind.COMPUTED_REF:
+                    keys.add(node[0])
+                if entry_issues:
+                    for rule_id, rule_issues in entry_issues.items():
+                        issues.setdefault((rule_id, kind), []).extend(rule_issues)
+            else:
+                for kind, child_nodes in event.nodes.items():
+                    if child_nodes:
+                        nodes[kind].extend(child_nodes)
+                for slot, child_issues in event.issues.items():
+                    issues.setdefault(slot, []).extend(child_issues)
+                keys |= event.keys
+                deps |= event.deps
+                count += event.count
+
+        unit.nodes = nodes
+        unit.issues = issues
+        unit.keys = keys
+        unit.deps = deps
+        unit.count = count
+
+    # ==================== Graph ====================
+
+    def _computed_graph(self, root: _Unit) -> ComputedGraph:
+        """
+        Граф computed прошлого рендера, если его входы не изменились.
+
+        Входы — юнит секции computed (новый объект, только если секция
+        изменилась) и computed.X, упомянутые вне неё. Выражения секции
+        перебираются только при перестройке графа.
+        """
+        computed_unit = root.children.get(_COMPUTED_PATH)
+        external = set(root.own_deps)
+        for path, child in root.children.items():
+            if path != _COMPUTED_PATH:
+                external |= child.deps
+
+        if self._graph is not None:
+            cached_unit, cached_external = self._graph_inputs
+            if cached_unit is computed_unit and cached_external == external:
+                return self._graph
+
+        owned = []
+        if computed_unit is not None:
+            owned = owned_expressions(computed_unit.nodes[NodeKind.EXPRESSION])
+        self._graph = assemble_computed_graph(self._index.computed, owned, external)
+        self._graph_inputs = (computed_unit, external)
+        self._stats.graph_rebuilt = True
+        return self._graph
+
+    # ==================== Result ====================
+
+    def _build_result(self, root: _Unit) -> ValidationResult:
+        """Собирает ValidationResult в порядке правил реестра"""
+        index = self._index
+        index.expressions = root.nodes[NodeKind.EXPRESSION]
+        index.raw_references = root.nodes[NodeKind.COMPUTED_REF]
+        index.children_arrays = root.nodes[NodeKind.CHILDREN]
+        index.nodes_visited = self._stats.nodes_walked
+        index.computed_graph = self._computed_graph(root)
+
+        all_issues = []
+        for rule in self._rules:
+            rule_issues = []
+            for kind in rule.kinds:
+                rule_issues.extend(root.issues.get((rule.rule_id, kind), ()))
+            if rule.finish is not None:
+                ctx = RuleContext(index=index, disabled_codes=self.registry.disabled_codes)
+                started = time.perf_counter()
+                rule.finish(ctx)
+                self._rule_stats[rule.rule_id].elapsed += time.perf_counter() - started
+                rule_issues.extend(ctx.issues)
+            if rule.dedupe:
+                rule_issues = dedupe_issues(rule_issues)
+            self._rule_stats[rule.rule_id].issues = len(rule_issues)
+            all_issues.extend(rule_issues)
+
+        return ValidationResult(
+            is_valid=not any(i.severity == Severity.ERROR for i in all_issues),
+            issues=all_issues,
+            computed_keys=set(index.computed.keys()),
+            valid_computed_keys=set(index.valid_keys),
+            invalid_computed_keys=dict(index.invalid_keys),
+            rule_stats=self._rule_stats,
+            computed_graph=index.computed_graph,
+        )
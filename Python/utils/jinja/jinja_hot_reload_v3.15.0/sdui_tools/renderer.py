@@ -17,7 +17,8 @@ from .validators import validate_sdui_contract, format_validation_report
 
 
 def render_template(template_path, data_path, jj_full_path, map_path, full_path, 
-                   validate_computed=True, verbose_validation=False):
+                   validate_computed=True, verbose_validation=False, validator=None,
+                   cache=None):
     """
     Main rendering function.
     
@@ -38,6 +39,8 @@ def render_template(template_path, data_path, jj_full_path, map_path, full_path,
         full_path: Output path for clean JSON
         validate_computed: Whether to run computed validation
         verbose_validation: Show detailed validation info
+        validator: IncrementalValidator to reuse between renders (watch mode)
+        cache: ValidationCache — skip validation of an already checked contract
         
     Returns:
         tuple: (success: bool, watched_files: set)
@@ -225,7 +228,31 @@ def render_template(template_path, data_path, jj_full_path, map_path, full_path,
             # === STEP 11: Validate Computed Section (NEW!) ===
             if validate_computed:
                 print(f"[{time.strftime('%H:%M:%S')}] 🔍 Validating computed section...")
-                validation_result = validate_sdui_contract(json_obj)
+                if validator is not None:
+                    # Кеш ищется до инкрементального прохода — тот же контракт не проверяется вовсе.
+                    # Только по хешу текста: сериализация json_obj ради ключа стоила бы O(N) на каждый save
+                    validation_result = None
+                    cache_key = None
+                    if cache is not None:
+                        cache_key, validation_result, _ = cache.lookup(
+                            clean_content, validator.registry, parse=False
+                        )
+                    if validation_result is None:
+                        validation_result = validator.validate(json_obj)
+                        if cache_key is not None:
+                            cache.store(cache_key, validation_result)
+                        if verbose_validation:
+                            stats = validator.last_stats
+                            print(
+                                f"[{time.strftime('%H:%M:%S')}]    ↳ incremental: "
+                                f"{stats.units_rebuilt}/{stats.units_total} units rebuilt, "
+                                f"{stats.nodes_checked} node(s) checked, {stats.elapsed * 1000:.1f} ms"
+                            )
+                else:
+                    validation_result = validate_sdui_contract(json_obj, cache=cache)
+
+                if validation_result.cached and verbose_validation:
+                    print(f"[{time.strftime('%H:%M:%S')}]    ↳ cached result (contract unchanged)")
                 
                 if not validation_result.is_valid or validation_result.warnings:
                     print()  # Empty line before report
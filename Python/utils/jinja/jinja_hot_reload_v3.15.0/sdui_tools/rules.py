@@ -0,0 +1,253 @@
+"""
+SDUI Validation Rule Registry
+=============================
+Реестр правил валидации поверх однопроходного индекса контракта.
+
+Каждое правило подписывается на виды узлов (NodeKind) и получает их
+из общего ContractIndex — новое правило не добавляет ещё один обход
+контракта. Правила включаются/выключаются по коду и сами считают
+своё время выполнения и количество найденных проблем.
+
+Usage:
+    registry = RuleRegistry()
+
+    @registry.rule("DATA", kinds=(NodeKind.EXPRESSION,), codes=("DATA-001",))
+    def check_data_refs(ctx, node):
+        location, text = node
+        ...
+        ctx.report(ValidationIssue(...))
+
+    issues, stats = registry.run(index_contract(data))
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .traversal import ContractIndex
+
+
+class NodeKind(Enum):
+    """Виды узлов, на которые подписываются правила"""
+    COMPUTED_ENTRY = "computed_entry"  # (key, value) из секции computed
+    COMPUTED_REF = "computed_ref"      # (key, location, text) — каждое ${computed.X}
+    EXPRESSION = "expression"          # (location, text) — строка, содержащая ${
+    CHILDREN = "children"              # (location, list) — массив $children
+    # location превращается в JSON Pointer через ctx.index.pointer(location)
+
+
+@dataclass
+class Rule:
+    """
+    Правило валидации.
+
+    check(ctx, node) должен зависеть только от самого узла и от тех
+    computed-ключей, на которые узел ссылается (ctx.index.computed /
+    invalid_keys) — на этом держится инкрементальная перевалидация.
+    Проверки уровня всего документа делаются в finish(ctx).
+    """
+    rule_id: str                       # Короткий id правила: COMP, REF, CHILD
+    check: Callable[["RuleContext", Any], None]
+    kinds: Tuple[NodeKind, ...]
+    codes: Tuple[str, ...] = ()        # Коды проблем, которые правило выдаёт
+    description: str = ""
+    finish: Optional[Callable[["RuleContext"], None]] = None  # Вызов после всех узлов
+    dedupe: bool = False               # Одна проблема на (code, key) — первое вхождение
+
+
+@dataclass
+class RuleStats:
+    """Стоимость одного правила за прогон"""
+    rule_id: str
+    nodes: int = 0
+    issues: int = 0
+    elapsed: float = 0.0  # секунды
+
+
+@dataclass
+class RuleContext:
+    """Контекст, который правило получает вместе с узлом"""
+    index: ContractIndex
+    state: Dict[str, Any] = field(default_factory=dict)  # Личное состояние правила
+    issues: List[Any] = field(default_factory=list)
+    disabled_codes: Set[str] = field(default_factory=set)
+
+    def report(self, issue: Any) -> None:
+        """Добавляет проблему, если её код не выключен"""
+        if issue.code not in self.disabled_codes:
+            self.issues.append(issue)
+
+
+def iter_nodes(index: ContractIndex, kind: NodeKind) -> Iterable[Any]:
+    """Отдаёт узлы нужного вида из индекса"""
+    if kind is NodeKind.COMPUTED_ENTRY:
+        return index.computed.items()
+    if kind is NodeKind.COMPUTED_REF:
+        return index.raw_references
+    if kind is NodeKind.EXPRESSION:
+        return index.expressions
+    if kind is NodeKind.CHILDREN:
+        return index.children_arrays
+    return ()
+
+
+def dedupe_issues(issues: List[Any]) -> List[Any]:
+    """Оставляет первое вхождение каждой пары (code, key)"""
+    seen = set()
+    unique = []
+    for issue in issues:
+        marker = (issue.code, issue.key)
+        if marker not in seen:
+            seen.add(marker)
+            unique.append(issue)
+    return unique
+
+
+def _update_code_digest(digest, code) -> None:
+    """Байткод и константы функции, включая вложенные lambda/генераторы"""
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode("utf-8"))
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _update_code_digest(digest, const)
+        else:
+            digest.update(repr(const).encode("utf-8"))
+
+
+class RuleRegistry:
+    """Упорядоченный набор правил с включением/выключением по коду"""
+
+    def __init__(self):
+        self._rules: Dict[str, Rule] = {}
+        self._disabled: Set[str] = set()
+
+    def register(self, rule: Rule) -> Rule:
+        """Регистрирует правило (повторная регистрация заменяет старое)"""
+        self._rules[rule.rule_id] = rule
+        return rule
+
+    def rule(self, rule_id: str, kinds: Tuple[NodeKind, ...],
+             codes: Tuple[str, ...] = (), description: str = "", dedupe: bool = False):
+        """Декоратор для регистрации функции-правила"""
+        def decorator(check):
+            self.register(Rule(
+                rule_id=rule_id,
+                check=check,
+                kinds=tuple(kinds),
+                codes=tuple(codes),
+                description=description or (check.__doc__ or "").strip(),
+                dedupe=dedupe,
+            ))
+            return check
+        return decorator
+
+    @property
+    def rules(self) -> List[Rule]:
+        return list(self._rules.values())
+
+    def get(self, rule_id: str) -> Optional[Rule]:
+        return self._rules.get(rule_id)
+
+    def disable(self, code: str) -> None:
+        """Выключает правило (COMP) или отдельный код проблемы (COMP-002)"""
+        self._disabled.add(code)
+
+    def enable(self, code: str) -> None:
+        self._disabled.discard(code)
+
+    def is_enabled(self, rule: Rule) -> bool:
+        """Правило выключено целиком или все его коды выключены"""
+        if rule.rule_id in self._disabled:
+            return False
+        if rule.codes and all(code in self._disabled for code in rule.codes):
+            return False
+        return True
+
+    @property
+    def disabled_codes(self) -> Set[str]:
+        return self._disabled
+
+    @property
+    def enabled_rules(self) -> List[Rule]:
+        return [rule for rule in self._rules.values() if self.is_enabled(rule)]
+
+    def signature(self) -> Tuple:
+        """Отпечаток набора правил — меняется при регистрации/выключении"""
+        rules = tuple((rule_id, id(rule)) for rule_id, rule in self._rules.items())
+        return (rules, tuple(sorted(self._disabled)))
+
+    def fingerprint(self) -> str:
+        """
+        Стабильный между процессами отпечаток набора правил.
+
+        В отличие от signature() учитывает байткод check/finish —
+        правка логики правила меняет отпечаток (нужно для кешей на диске).
+        """
+        digest = hashlib.sha1()
+        for rule in self._rules.values():
+            digest.update(repr((rule.rule_id, rule.codes, rule.dedupe,
+                                [kind.value for kind in rule.kinds])).encode("utf-8"))
+            for func in (rule.check, rule.finish):
+                if func is not None:
+                    _update_code_digest(digest, func.__code__)
+        digest.update(repr(sorted(self._disabled)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def copy(self) -> "RuleRegistry":
+        """Независимая копия с теми же правилами и выключенными кодами"""
+        clone = RuleRegistry()
+        clone._rules = dict(self._rules)
+        clone._disabled = set(self._disabled)
+        return clone
+
+    def run(self, index: ContractIndex,
+            only: Optional[Iterable[str]] = None) -> Tuple[List[Any], Dict[str, RuleStats]]:
+        """
+        Прогоняет включённые правила по индексу контракта.
+
+        Правила выполняются в порядке регистрации — порядок проблем
+        в отчёте стабилен.
+
+        Args:
+            index: Результат index_contract
+            only: Ограничить прогон этими rule_id
+
+        Returns:
+            tuple: (issues, {rule_id: RuleStats})
+        """
+        only = set(only) if only is not None else None
+        issues: List[Any] = []
+        stats: Dict[str, RuleStats] = {}
+
+        for rule in self._rules.values():
+            if only is not None and rule.rule_id not in only:
+                continue
+            if not self.is_enabled(rule):
+                continue
+
+            ctx = RuleContext(index=index, disabled_codes=self._disabled)
+            rule_stats = RuleStats(rule_id=rule.rule_id)
+            check = rule.check
+
+            started = time.perf_counter()
+            for kind in rule.kinds:
+                nodes = iter_nodes(index, kind)
+                for node in nodes:
+                    check(ctx, node)
+                rule_stats.nodes += len(nodes)
+            if rule.finish is not None:
+                rule.finish(ctx)
+            rule_stats.elapsed = time.perf_counter() - started
+
+            rule_issues = dedupe_issues(ctx.issues) if rule.dedupe else ctx.issues
+            rule_stats.issues = len(rule_issues)
+            issues.extend(rule_issues)
+            stats[rule.rule_id] = rule_stats
+
+        return issues, stats
+
+
+# Реестр по умолчанию — встроенные правила регистрируются в validators.py
+DEFAULT_REGISTRY = RuleRegistry()
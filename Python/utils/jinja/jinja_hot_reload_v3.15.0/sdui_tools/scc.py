@@ -0,0 +1 @@
+../../../../refs/refs_tools/scc.py
\ No newline at end of file
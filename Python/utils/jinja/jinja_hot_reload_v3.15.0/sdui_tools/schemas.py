@@ -0,0 +1,522 @@
+"""
+SDUI Component Schema Validation
+================================
+Валидация отрендеренных компонентов (StackView, LabelView, ButtonView...)
+по их JSON Schema из front-middle-schema/SDUI.
+
+- Схема компонента ищется как <Name>/v<N>/<Name>.json (N = поле version, по умолчанию 1)
+- Все $ref (file:///..., относительные, #/definitions) собираются в один
+  документ с #/$defs — валидатор больше не ходит по файлам
+- Собранная схема кешируется на диске по отпечатку (mtime, size) всех
+  входящих файлов: повторный запуск на неизменённых схемах сразу валидирует;
+  кандидаты неразрешённых $ref в отпечатке как отсутствующие — появление
+  файла пересобирает схему
+- Разрешение $ref мемоизировано: общие atoms загружаются один раз на все компоненты
+- Компоненты валидируются в пуле процессов, контракт передаётся воркеру один раз
+
+Зависимость: jsonschema (Python/requirements.txt). Без неё SchemaStore
+создаётся, но validate() выдаёт одну проблему SCHEMA-000.
+
+Usage:
+    store = SchemaStore("~/Documents/front-middle-schema/SDUI")
+    issues = store.validate(data, workers=4)
+
+    result = validate_sdui_contract(content, schemas=store)
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+try:
+    import jsonschema
+except ImportError:  # jsonschema — опциональная зависимость
+    jsonschema = None
+
+from .config import DEFAULT_SCHEMA_ROOT, SCHEMA_CACHE_DIR
+from .traversal import EXPRESSION_MARKER, escape_pointer_token, format_pointer
+from .validators import Severity, ValidationIssue
+
+
+# Формат файла в кеше — меняется при изменении алгоритма сборки
+# (2: в отпечатке — отсутствующие цели неразрешённых $ref)
+BUNDLE_FORMAT = 2
+
+# Сколько ошибок jsonschema показывать на один компонент
+MAX_ERRORS_PER_COMPONENT = 20
+
+_VERSION_DIR = re.compile(r"^v(\d+)$")
+
+
+class SchemaStore:
+    """
+    Схемы компонентов одной директории front-middle-schema/SDUI.
+
+    Валидаторы компилируются один раз на (компонент, версия) и живут
+    в памяти процесса; собранные схемы переживают процесс в cache_dir.
+    """
+
+    def __init__(self, schema_root: Optional[str] = None, cache_dir: Optional[str] = None,
+                 workers: int = 1):
+        self.workers = workers
+        self.schema_root = os.path.abspath(os.path.expanduser(schema_root or DEFAULT_SCHEMA_ROOT))
+        if cache_dir is None:
+            # Отдельная поддиректория на каждый корень схем
+            digest = hashlib.sha1(self.schema_root.encode("utf-8")).hexdigest()[:12]
+            cache_dir = os.path.join(SCHEMA_CACHE_DIR, digest)
+        self.cache_dir = cache_dir
+
+        self._components: Optional[Dict[Tuple[str, int], str]] = None
+        self._names: Optional[set] = None
+        self._documents: Dict[str, Any] = {}                       # path → JSON
+        self._resolved: Dict[Tuple[str, str], Optional[str]] = {}  # (base_dir, uri) → path
+        self._validators: Dict[Tuple[str, int], Any] = {}
+        self._unresolved: Dict[Tuple[str, int], List[str]] = {}
+
+        # Счётчики для отчёта
+        self.bundles_built = 0
+        self.bundles_loaded = 0
+
+    # ==================== Component index ====================
+
+    @property
+    def components(self) -> Dict[Tuple[str, int], str]:
+        """(имя, версия) → путь к схеме. Сканируется один раз"""
+        if self._components is None:
+            self._components = self._scan_components()
+            self._names = {name for name, _ in self._components}
+        return self._components
+
+    @property
+    def names(self) -> set:
+        self.components
+        return self._names
+
+    def _scan_components(self) -> Dict[Tuple[str, int], str]:
+        found = {}
+        if not os.path.isdir(self.schema_root):
+            return found
+
+        for root, dirs, files in os.walk(self.schema_root):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d != "samples"]
+            match = _VERSION_DIR.match(os.path.basename(root))
+            if not match:
+                continue
+            name = os.path.basename(os.path.dirname(root))
+            if f"{name}.json" in files:
+                found[(name, int(match.group(1)))] = os.path.join(root, f"{name}.json")
+
+        return found
+
+    # ==================== $ref resolution ====================
+
+    def _load_document(self, path: str) -> Any:
+        doc = self._documents.get(path)
+        if doc is None:
+            with open(path, "r", encoding="utf-8") as f:
+                doc = json.load(f)
+            self._documents[path] = doc
+        return doc
+
+    def _candidates(self, base_dir: str, uri: str) -> List[str]:
+        """
+        Пути, где может лежать файл URI части $ref, в порядке проверки.
+
+        file:///Users/<кто-то>/.../SDUI/x.json с чужой машины
+        переносится на свой schema_root по хвосту после /SDUI/.
+        """
+        parsed = urlparse(uri)
+        if parsed.scheme == "file":
+            candidates = [unquote(parsed.path)]
+            marker = "/" + os.path.basename(self.schema_root) + "/"
+            if marker in candidates[0]:
+                tail = candidates[0].split(marker, 1)[1]
+                candidates.append(os.path.join(self.schema_root, tail))
+            return candidates
+        if not parsed.scheme:
+            return [os.path.normpath(os.path.join(base_dir, unquote(uri)))]
+        return []
+
+    def _resolve_uri(self, base_dir: str, uri: str) -> Optional[str]:
+        """
+        Путь к файлу для URI части $ref (без фрагмента).
+
+        Мемоизируются только найденные файлы: неразрешённая ссылка
+        проверяется заново — файл может появиться в watch mode.
+        """
+        cache_key = (base_dir, uri)
+        path = self._resolved.get(cache_key)
+        if path is not None:
+            return path
+
+        for candidate in self._candidates(base_dir, uri):
+            if os.path.isfile(candidate):
+                self._resolved[cache_key] = candidate
+                return candidate
+        return None
+
+    def _doc_key(self, path: str) -> str:
+        rel = os.path.relpath(path, self.schema_root)
+        return rel.replace(os.sep, "/")
+
+    def _def_ref(self, path: str, fragment: str) -> str:
+        """#/$defs/<key><fragment> для ссылки внутрь собранного документа"""
+        ref = "#/$defs/" + escape_pointer_token(self._doc_key(path))
+        if fragment and fragment != "/":
+            ref += fragment if fragment.startswith("/") else "/" + fragment
+        return ref
+
+    def _rewrite(self, doc: Any, path: str, pending: List[str],
+                 unresolved: List[str], absent: set) -> Any:
+        """
+        Копия документа с $ref, переписанными на #/$defs.
+
+        Новые файлы, на которые ссылается документ, добавляются в pending,
+        пути-кандидаты неразрешённых ссылок — в absent.
+        Обход итеративный — схемы бывают глубокими.
+        """
+        base_dir = os.path.dirname(path)
+        root = {"": doc}
+        stack = [(doc, root, "")]
+
+        while stack:
+            node, parent, slot = stack.pop()
+            if type(node) is dict:
+                copy = {}
+                parent[slot] = copy
+                for key, value in node.items():
+                    if key == "$ref" and type(value) is str:
+                        uri, _, fragment = value.partition("#")
+                        target = path if not uri else self._resolve_uri(base_dir, uri)
+                        if target is None:
+                            if urlparse(uri).scheme in ("http", "https"):
+                                copy[key] = value
+                            else:
+                                unresolved.append(f"{self._doc_key(path)}: {value}")
+                                absent.update(self._candidates(base_dir, uri))
+                            continue
+                        pending.append(target)
+                        copy[key] = self._def_ref(target, unquote(fragment))
+                    elif (key == "$id" or key == "$schema") and type(value) is str:
+                        # Вложенные $id/$schema сменили бы базу разрешения ссылок
+                        continue
+                    else:
+                        copy[key] = None  # Сохраняем порядок ключей
+                        stack.append((value, copy, key))
+            elif type(node) is list:
+                copy = [None] * len(node)
+                parent[slot] = copy
+                for i, item in enumerate(node):
+                    stack.append((item, copy, i))
+            else:
+                parent[slot] = node
+
+        return root[""]
+
+    def _bundle(self, schema_path: str) -> Tuple[dict, Dict[str, list], List[str]]:
+        """
+        Собирает схему компонента и все достижимые по $ref файлы в один документ.
+
+        Returns:
+            tuple: (bundle, fingerprint {key: [mtime_ns, size] или None — файла нет},
+                    unresolved refs)
+        """
+        defs = {}
+        fingerprint = {}
+        unresolved: List[str] = []
+        absent = set()
+        pending = [schema_path]
+        seen = set()
+
+        while pending:
+            path = pending.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            key = self._doc_key(path)
+            st = os.stat(path)
+            fingerprint[key] = [st.st_mtime_ns, st.st_size]
+            try:
+                doc = self._load_document(path)
+            except (OSError, json.JSONDecodeError) as e:
+                unresolved.append(f"{key}: {e}")
+                defs[key] = {}
+                continue
+            defs[key] = self._rewrite(doc, path, pending, unresolved, absent)
+
+        for path in sorted(absent):
+            fingerprint.setdefault(self._doc_key(path), None)
+
+        root_doc = self._documents.get(schema_path, {})
+        bundle = {
+            "$ref": self._def_ref(schema_path, ""),
+            "$defs": defs,
+        }
+        if isinstance(root_doc, dict) and "$schema" in root_doc:
+            bundle["$schema"] = root_doc["$schema"]
+        return bundle, fingerprint, unresolved
+
+    # ==================== Persistent cache ====================
+
+    def _cache_path(self, name: str, version: int) -> str:
+        return os.path.join(self.cache_dir, f"{name}_v{version}.json")
+
+    def _fingerprint_matches(self, fingerprint: Dict[str, Optional[list]]) -> bool:
+        for key, signature in fingerprint.items():
+            path = os.path.join(self.schema_root, key)
+            if signature is None:
+                # Цель неразрешённой ссылки появилась — бандл устарел
+                if os.path.isfile(path):
+                    return False
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+            if st.st_mtime_ns != signature[0] or st.st_size != signature[1]:
+                return False
+        return True
+
+    def _load_cached_bundle(self, name: str, version: int) -> Optional[dict]:
+        try:
+            with open(self._cache_path(name, version), "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if cached.get("format") != BUNDLE_FORMAT:
+            return None
+        if not self._fingerprint_matches(cached.get("fingerprint", {})):
+            return None
+        return cached
+
+    def _save_bundle(self, name: str, version: int, cached: dict) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._cache_path(name, version) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cached, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self._cache_path(name, version))
+        except OSError:
+            pass  # Кеш — оптимизация, не ошибка валидации
+
+    def bundle_for(self, name: str, version: int) -> Optional[dict]:
+        """Собранная схема компонента: из кеша на диске или заново"""
+        schema_path = self.components.get((name, version))
+        if schema_path is None:
+            return None
+
+        cached = self._load_cached_bundle(name, version)
+        if cached is not None:
+            self.bundles_loaded += 1
+        else:
+            bundle, fingerprint, unresolved = self._bundle(schema_path)
+            cached = {
+                "format": BUNDLE_FORMAT,
+                "component": name,
+                "version": version,
+                "fingerprint": fingerprint,
+                "unresolved": unresolved,
+                "schema": bundle,
+            }
+            self._save_bundle(name, version, cached)
+            self.bundles_built += 1
+
+        self._unresolved[(name, version)] = cached.get("unresolved", [])
+        return cached["schema"]
+
+    def validator_for(self, name: str, version: int) -> Any:
+        """Скомпилированный валидатор (один на компонент и версию за процесс)"""
+        key = (name, version)
+        if key in self._validators:
+            return self._validators[key]
+
+        validator = None
+        bundle = self.bundle_for(name, version)
+        if bundle is not None and jsonschema is not None:
+            cls = jsonschema.validators.validator_for(bundle, default=jsonschema.Draft7Validator)
+            validator = cls(bundle)
+        self._validators[key] = validator
+        return validator
+
+    # ==================== Validation ====================
+
+    def find_components(self, data: Any) -> List[Tuple[Optional[tuple], str, int]]:
+        """
+        Все узлы-компоненты контракта в порядке документа.
+
+        Returns:
+            list: (связный путь, имя, версия)
+        """
+        names = self.names
+        found = []
+        stack = [(data, None)]
+
+        while stack:
+            obj, path = stack.pop()
+            if type(obj) is dict:
+                obj_type = obj.get("type")
+                if type(obj_type) is str and obj_type in names:
+                    version = obj.get("version", 1)
+                    if type(version) is not int:
+                        version = int(version) if str(version).isdigit() else 1
+                    found.append((path, obj_type, version))
+                for key, value in reversed(obj.items()):
+                    if type(value) is dict or type(value) is list:
+                        stack.append((value, (path, key)))
+            elif type(obj) is list:
+                for i in range(len(obj) - 1, -1, -1):
+                    item = obj[i]
+                    if type(item) is dict or type(item) is list:
+                        stack.append((item, (path, i)))
+
+        return found
+
+    def check_component(self, node: Any, path: Optional[tuple],
+                        name: str, version: int) -> List[ValidationIssue]:
+        """Валидирует один узел-компонент по его схеме"""
+        pointer = format_pointer(path)
+
+        if (name, version) not in self.components:
+            known = sorted(v for n, v in self.components if n == name)
+            return [ValidationIssue(
+                severity=Severity.WARNING,
+                code="SCHEMA-002",
+                key=name,
+                message=f"{name} v{version}: схема не найдена",
+                hint=f"Доступные версии: {', '.join(f'v{v}' for v in known)}",
+                location=pointer,
+            )]
+
+        validator = self.validator_for(name, version)
+        if validator is None:
+            return []
+
+        issues = []
+        for error in validator.iter_errors(node):
+            # SDUI-выражения вычисляются на клиенте — тип значения заранее неизвестен
+            if type(error.instance) is str and EXPRESSION_MARKER in error.instance:
+                continue
+            location = pointer
+            for token in error.absolute_path:
+                location += "/" + escape_pointer_token(token)
+            message = error.message
+            if len(message) > 200:
+                message = message[:197] + "..."
+            issues.append(ValidationIssue(
+                severity=Severity.ERROR,
+                code="SCHEMA-001",
+                key=name,
+                message=f"{name} v{version}: {message}",
+                hint=f"См. схему {self._doc_key(self.components[(name, version)])}",
+                found_type=error.validator,
+                location=location,
+            ))
+            if len(issues) >= MAX_ERRORS_PER_COMPONENT:
+                break
+        return issues
+
+    def _check_paths(self, data: Any,
+                     targets: List[Tuple[Optional[tuple], str, int]]) -> List[ValidationIssue]:
+        issues = []
+        for path, name, version in targets:
+            issues.extend(self.check_component(resolve_path(data, path), path, name, version))
+        return issues
+
+    def validate(self, data: Any, workers: Optional[int] = None) -> List[ValidationIssue]:
+        """
+        Валидирует все компоненты контракта по их схемам.
+
+        Args:
+            data: Распарсенный контракт
+            workers: >1 — валидация поддеревьев в пуле процессов (по умолчанию self.workers)
+
+        Returns:
+            List[ValidationIssue]: SCHEMA-001 (нарушение схемы), SCHEMA-002
+            (нет схемы для версии), SCHEMA-003 (неразрешённый $ref)
+        """
+        workers = self.workers if workers is None else workers
+        targets = self.find_components(data)
+        if not targets:
+            return []
+
+        if jsonschema is None:
+            return [ValidationIssue(
+                severity=Severity.WARNING,
+                code="SCHEMA-000",
+                key="",
+                message="jsonschema не установлен — валидация по схемам пропущена",
+                hint="pip install -r Python/requirements.txt",
+            )]
+
+        # Собираем/загружаем схемы до пула — воркеры читают готовый кеш с диска
+        versions = sorted({(name, version) for _, name, version in targets})
+        for name, version in versions:
+            self.validator_for(name, version)
+
+        if workers > 1 and len(targets) > workers:
+            issues = self._validate_parallel(data, targets, workers)
+        else:
+            issues = self._check_paths(data, targets)
+
+        for name, version in versions:
+            for ref in self._unresolved.get((name, version), []):
+                issues.append(ValidationIssue(
+                    severity=Severity.WARNING,
+                    code="SCHEMA-003",
+                    key=name,
+                    message=f"{name} v{version}: не удалось разрешить $ref {ref}",
+                    hint="Проверьте путь в схеме (fix_broken_refs.py)",
+                ))
+
+        # Вложенный компонент мог попасть и в ошибки родителя
+        unique = {}
+        for issue in issues:
+            unique.setdefault((issue.code, issue.location, issue.message), issue)
+        return list(unique.values())
+
+    def _validate_parallel(self, data: Any, targets: list, workers: int) -> List[ValidationIssue]:
+        # Порции по порядку документа: соседние компоненты обычно одного типа
+        chunk_size = max(1, -(-len(targets) // (workers * 4)))
+        chunks = [targets[i:i + chunk_size] for i in range(0, len(targets), chunk_size)]
+
+        issues = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.schema_root, self.cache_dir, data),
+        ) as pool:
+            for chunk_issues in pool.map(_check_chunk, chunks):
+                issues.extend(chunk_issues)
+        return issues
+
+
+def resolve_path(data: Any, path: Optional[tuple]) -> Any:
+    """Узел по связному пути (parent_path, token)"""
+    tokens = []
+    while path is not None:
+        path, token = path
+        tokens.append(token)
+    node = data
+    for token in reversed(tokens):
+        node = node[token]
+    return node
+
+
+# ==================== Worker process ====================
+
+_worker_store: Optional[SchemaStore] = None
+_worker_data: Any = None
+
+
+def _init_worker(schema_root: str, cache_dir: str, data: Any) -> None:
+    global _worker_store, _worker_data
+    _worker_store = SchemaStore(schema_root, cache_dir)
+    _worker_data = data
+
+
+def _check_chunk(targets: list) -> List[ValidationIssue]:
+    return _worker_store._check_paths(_worker_data, targets)
@@ -0,0 +1,311 @@
+"""
+SDUI Contract Traversal
+=======================
+Однопроходный обход контракта: классификация computed-ключей и сбор
+всех ссылок ${computed.X} с локациями в формате JSON Pointer (RFC 6901).
+
+Обход итеративный (без рекурсии) и путей не строит: место строки
+запоминается парой (контейнер, ключ), а для контейнеров копится карта
+id(контейнер) → родитель. Связный путь и JSON Pointer восстанавливаются
+по ней только когда указатель действительно нужен (проблема попала
+в отчёт).
+
+Usage:
+    index = index_contract(data)
+    for key, location, text in index.raw_references:
+        print(key, index.pointer(location))
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Dict, Set, Optional, Any, Tuple
+
+from .config import VALID_COMPUTED_TYPES
+
+
+# Pattern для ${computed.keyName}
+COMPUTED_REF_PATTERN = re.compile(r"\$\{computed\.(\w+)\}")
+
+# Маркер SDUI-выражения — строки без него не сканируются регуляркой
+EXPRESSION_MARKER = "${"
+
+# Метка конца записи computed в стеке index_contract (начало — сам ключ)
+_OWNER_END = None
+
+
+@dataclass
+class ComputedReference:
+    """Ссылка ${computed.X}, найденная в контракте"""
+    key: str            # Имя computed-ключа
+    full_ref: str       # Полный текст ссылки: ${computed.X}
+    path: Optional[tuple]  # Связный путь до строки со ссылкой
+    value: str          # Строка целиком (контекст)
+
+    @property
+    def pointer(self) -> str:
+        """JSON Pointer узла, содержащего ссылку"""
+        return format_pointer(self.path)
+
+
+@dataclass
+class ChildReference:
+    """Ссылка ${computed.X} как элемент массива $children"""
+    key: str
+    index: int          # Позиция в $children
+    path: Optional[tuple]  # Связный путь до самого массива $children
+
+    @property
+    def pointer(self) -> str:
+        """JSON Pointer элемента $children"""
+        return format_pointer((self.path, self.index))
+
+
+@dataclass
+class ContractIndex:
+    """
+    Результат однопроходного обхода контракта.
+
+    Во время обхода ссылки копятся сырыми кортежами (key, location, text) —
+    объекты ComputedReference/ChildReference создаются только при
+    обращении к references/child_references.
+    location — (контейнер, ключ) или связный путь (parent_path, token);
+    в строку его превращает pointer().
+    Виды узлов этого индекса потребляют правила из rules.py.
+    """
+    computed: Dict[str, Any] = field(default_factory=dict)
+    valid_keys: Set[str] = field(default_factory=set)
+    invalid_keys: Dict[str, str] = field(default_factory=dict)  # key → type
+    expressions: List[Tuple[Optional[tuple], str]] = field(default_factory=list)  # (location, string)
+    children_arrays: List[Tuple[Optional[tuple], list]] = field(default_factory=list)  # (location, $children)
+    nodes_visited: int = 0
+    raw_references: List[Tuple[str, Optional[tuple], str]] = field(default_factory=list, repr=False)
+    computed_graph: Optional[Any] = field(default=None, repr=False)  # Кеш graph.computed_graph()
+    # (key, start, end): expressions[start:end] лежат внутри /computed/<key>
+    owner_spans: List[Tuple[str, int, int]] = field(default_factory=list, repr=False)
+    # id(контейнер) → родительский контейнер; корня в карте нет
+    parents: Dict[int, Any] = field(default_factory=dict, repr=False)
+
+    @property
+    def references(self) -> List[ComputedReference]:
+        """Все ссылки ${computed.X} в порядке документа"""
+        return [
+            ComputedReference(key=key, full_ref=f"${{computed.{key}}}",
+                              path=self.linked_path(location), value=text)
+            for key, location, text in self.raw_references
+        ]
+
+    @property
+    def child_references(self) -> List[ChildReference]:
+        """Все ${computed.X} элементы массивов $children"""
+        return [
+            ChildReference(key=key, index=i, path=self.linked_path(location))
+            for location, children in self.children_arrays
+            for i, key in iter_child_references(children)
+        ]
+
+    def first_references(self) -> Dict[str, ComputedReference]:
+        """Первое вхождение каждой ссылки в порядке документа"""
+        first = {}
+        for key, location, text in self.raw_references:
+            if key not in first:
+                first[key] = ComputedReference(
+                    key=key, full_ref=f"${{computed.{key}}}",
+                    path=self.linked_path(location), value=text
+                )
+        return first
+
+    def linked_path(self, location: Optional[tuple]) -> Optional[tuple]:
+        """
+        Связный путь (parent_path, token) для location из индекса.
+
+        Контейнер в голове location заменяется его собственным местом:
+        родитель берётся из карты, ключ — поиском контейнера в родителе.
+        """
+        tokens = []
+        while location is not None:
+            head, token = location
+            tokens.append(token)
+            if type(head) is dict or type(head) is list:
+                location = self.container_location(head)
+            else:
+                location = head
+        path = None
+        for token in reversed(tokens):
+            path = (path, token)
+        return path
+
+    def container_location(self, container: Any) -> Optional[tuple]:
+        """(родительский контейнер, ключ) для контейнера; None — корень"""
+        parent = self.parents.get(id(container))
+        if parent is None:
+            return None
+        items = parent.items() if type(parent) is dict else enumerate(parent)
+        for key, value in items:
+            if value is container:
+                return parent, key
+        return None
+
+    def pointer(self, location: Optional[tuple]) -> str:
+        """JSON Pointer для location из индекса"""
+        return format_pointer(self.linked_path(location))
+
+
+def escape_pointer_token(token: Any) -> str:
+    """Экранирует сегмент JSON Pointer: ~ → ~0, / → ~1"""
+    token = str(token)
+    if "~" in token or "/" in token:
+        token = token.replace("~", "~0").replace("/", "~1")
+    return token
+
+
+def format_pointer(path: Optional[tuple]) -> str:
+    """
+    Превращает связный путь (parent_path, token) в JSON Pointer.
+
+    Корень документа — пустая строка, как в RFC 6901.
+    """
+    tokens = []
+    while path is not None:
+        path, token = path
+        tokens.append(escape_pointer_token(token))
+    if not tokens:
+        return ""
+    tokens.reverse()
+    return "/" + "/".join(tokens)
+
+
+def iter_child_references(children: list):
+    """Отдаёт (index, key) для элементов $children вида ${computed.X}"""
+    for i, child in enumerate(children):
+        if type(child) is str and child.startswith("${computed."):
+            match = COMPUTED_REF_PATTERN.match(child)
+            if match:
+                yield i, match.group(1)
+
+
+def classify_computed(computed: Dict[str, Any]) -> Tuple[Set[str], Dict[str, str]]:
+    """
+    Делит ключи computed на валидные функции и невалидные объекты.
+
+    Returns:
+        tuple: (valid_keys, invalid_keys) где invalid_keys: key → type
+    """
+    valid_keys = set()
+    invalid_keys = {}
+
+    for key, value in computed.items():
+        if not isinstance(value, dict):
+            continue
+        obj_type = value.get("type", "")
+        if not obj_type:
+            continue
+        if obj_type in VALID_COMPUTED_TYPES:
+            valid_keys.add(key)
+        else:
+            invalid_keys[key] = obj_type
+
+    return valid_keys, invalid_keys
+
+
+def index_contract(data: Any) -> ContractIndex:
+    """
+    Обходит контракт один раз и собирает всё, что нужно правилам валидации.
+
+    Порядок обхода — порядок документа (pre-order), поэтому порядок
+    найденных ссылок совпадает с порядком их появления в JSON.
+    Узлы проверяются через type() is, а не isinstance(): json.loads
+    отдаёт только dict/list/str, а на больших контрактах это заметно быстрее.
+    Пути не строятся: в стек кладутся сами контейнеры (с записью родителя
+    в index.parents), а строки — кортежем ((контейнер, ключ), строка),
+    который сразу становится записью expressions.
+    Записи секции computed обрамляются метками в стеке — выражения между
+    ними принадлежат ключу записи (owner_spans).
+
+    Args:
+        data: Распарсенный JSON контракт
+
+    Returns:
+        ContractIndex: computed-классификация, ссылки и $children с местами
+    """
+    index = ContractIndex()
+
+    computed = data.get("computed", {}) if isinstance(data, dict) else {}
+    if isinstance(computed, dict):
+        index.computed = computed
+        index.valid_keys, index.invalid_keys = classify_computed(computed)
+
+    # В стеке: dict / list — контейнер, tuple — ((контейнер, ключ), строка),
+    # str / _OWNER_END — начало / конец записи computed.
+    # Дети кладутся в обратном порядке, чтобы pop() шёл в порядке документа;
+    # строки попадают в стек только если содержат "${".
+    stack = [(None, data)] if type(data) is str else [data]
+    push = stack.append
+    pop = stack.pop
+    marker = EXPRESSION_MARKER
+    findall = COMPUTED_REF_PATTERN.findall
+    expressions = index.expressions
+    add_expression = expressions.append
+    references = index.raw_references
+    children_arrays = index.children_arrays
+    owner_spans = index.owner_spans
+    parents = index.parents
+    owner = None
+    owner_start = 0
+    visited = 0
+
+    while stack:
+        obj = pop()
+        obj_type = type(obj)
+
+        if obj_type is dict:
+            visited += 1
+            owned = obj is computed
+            for key, value in reversed(obj.items()):
+                if owned:
+                    push(_OWNER_END)
+                value_type = type(value)
+                if value_type is str:
+                    if marker in value:
+                        push(((obj, key), value))
+                elif value_type is dict:
+                    parents[id(value)] = obj
+                    push(value)
+                elif value_type is list:
+                    if key == "$children":
+                        children_arrays.append(((obj, key), value))
+                    parents[id(value)] = obj
+                    push(value)
+                if marker in key:
+                    push(((obj, key), key))
+                if owned:
+                    push(key)
+
+        elif obj_type is tuple:
+            add_expression(obj)
+            text = obj[1]
+            if "${computed." in text:
+                location = obj[0]
+                for key in findall(text):
+                    references.append((key, location, text))
+
+        elif obj_type is list:
+            visited += 1
+            for i in range(len(obj) - 1, -1, -1):
+                item = obj[i]
+                item_type = type(item)
+                if item_type is str:
+                    if marker in item:
+                        push(((obj, i), item))
+                elif item_type is dict or item_type is list:
+                    parents[id(item)] = obj
+                    push(item)
+
+        elif obj is _OWNER_END:
+            owner_spans.append((owner, owner_start, len(expressions)))
+
+        else:
+            owner = obj
+            owner_start = len(expressions)
+
+    index.nodes_visited = visited
+    return index
@@ -10,13 +10,20 @@ SDUI Computed Validator
 вместо computed-функции (if, switch, applyTemplate, etc.)
 """
 
-import re
 import json
 from dataclasses import dataclass, field
 from typing import List, Dict, Set, Optional, Any
 from enum import Enum
 
-from .config import VALID_COMPUTED_TYPES, KNOWN_UI_COMPONENTS
+from .config import VALID_COMPUTED_TYPES, KNOWN_UI_COMPONENTS, MAX_COMPUTED_DEPTH
+from .traversal import (
+    ContractIndex,
+    index_contract,
+    escape_pointer_token,
+    iter_child_references,
+)
+from .rules import DEFAULT_REGISTRY, NodeKind, Rule, RuleContext, RuleRegistry, RuleStats
+from .graph import ComputedGraph, computed_graph
 
 
 class Severity(Enum):
@@ -35,7 +42,7 @@ class ValidationIssue:
     message: str        # Человекочитаемое сообщение
     hint: str           # Подсказка по исправлению
     found_type: Optional[str] = None
-    location: Optional[str] = None  # Где найдена ссылка (если применимо)
+    location: Optional[str] = None  # JSON Pointer места ссылки (если применимо)
 
 
 @dataclass 
@@ -46,6 +53,9 @@ class ValidationResult:
     computed_keys: Set[str] = field(default_factory=set)
     valid_computed_keys: Set[str] = field(default_factory=set)
     invalid_computed_keys: Dict[str, str] = field(default_factory=dict)  # key → type
+    rule_stats: Dict[str, RuleStats] = field(default_factory=dict)  # rule_id → стоимость
+    computed_graph: Optional[ComputedGraph] = None  # Граф зависимостей (правило GRAPH)
+    cached: bool = False  # Результат взят из ValidationCache, правила не запускались
     
     @property
     def errors(self) -> List[ValidationIssue]:
@@ -60,7 +70,176 @@ class ValidationResult:
         return len(self.errors) > 0
 
 
-def validate_computed_types(data: Dict[str, Any]) -> List[ValidationIssue]:
+# ==================== Rules ====================
+# Каждая проверка — правило в DEFAULT_REGISTRY, подписанное на свой вид узлов.
+# Все правила работают по одному ContractIndex (один обход контракта).
+
+@DEFAULT_REGISTRY.rule("COMP", kinds=(NodeKind.COMPUTED_ENTRY,), codes=("COMP-001", "COMP-002"))
+def check_computed_type(ctx: RuleContext, node) -> None:
+    """Объекты в computed должны быть computed-функциями, а не UI-компонентами"""
+    key, value = node
+    if not isinstance(value, dict):
+        return
+        
+    obj_type = value.get("type", "")
+    
+    if not obj_type:
+        # Нет type — возможно это просто данные, не функция
+        return
+        
+    # Проверка на известные UI-компоненты
+    if obj_type in KNOWN_UI_COMPONENTS:
+        ctx.report(ValidationIssue(
+            severity=Severity.ERROR,
+            code="COMP-001",
+            key=key,
+            found_type=obj_type,
+            location=f"/computed/{escape_pointer_token(key)}",
+            message=f"computed.{key} имеет type='{obj_type}' — это UI-компонент, не computed-функция",
+            hint=f"Перенеси '{key}' в секцию data или template. В computed используй только if/switch/applyTemplate для ссылки на него."
+        ))
+    elif obj_type not in VALID_COMPUTED_TYPES:
+        # Неизвестный тип — может быть новый компонент
+        ctx.report(ValidationIssue(
+            severity=Severity.WARNING,
+            code="COMP-002", 
+            key=key,
+            found_type=obj_type,
+            location=f"/computed/{escape_pointer_token(key)}",
+            message=f"computed.{key} имеет неизвестный type='{obj_type}'",
+            hint=f"Проверь: если это UI-компонент — перенеси в data/template. Если новая computed-функция — добавь в VALID_COMPUTED_TYPES."
+        ))
+
+
+@DEFAULT_REGISTRY.rule("REF", kinds=(NodeKind.COMPUTED_REF,), codes=("REF-001", "REF-002"), dedupe=True)
+def check_computed_reference(ctx: RuleContext, node) -> None:
+    """${computed.X} должна указывать на существующую computed-функцию"""
+    ref_key, path, _text = node
+    
+    # Чтобы не дублировать ошибки — только первое вхождение ключа
+    seen = ctx.state.get("seen")
+    if seen is None:
+        seen = ctx.state["seen"] = set()
+    if ref_key in seen:
+        return
+    seen.add(ref_key)
+    
+    invalid_keys = ctx.index.invalid_keys
+    
+    if ref_key in invalid_keys:
+        ctx.report(ValidationIssue(
+            severity=Severity.ERROR,
+            code="REF-001",
+            key=ref_key,
+            found_type=invalid_keys[ref_key],
+            message=f"${{computed.{ref_key}}} ссылается на '{invalid_keys[ref_key]}' — это не computed-функция",
+            hint=f"SDUI ожидает if/switch/applyTemplate. Используй ${{data.{ref_key}}} или ${{template.{ref_key}}} вместо computed.",
+            location=ctx.index.pointer(path)
+        ))
+    elif ref_key not in ctx.index.computed:
+        ctx.report(ValidationIssue(
+            severity=Severity.ERROR,
+            code="REF-002",
+            key=ref_key,
+            message=f"${{computed.{ref_key}}} ссылается на несуществующий ключ",
+            hint=f"Добавь '{ref_key}' в секцию computed или исправь имя ссылки.",
+            location=ctx.index.pointer(path)
+        ))
+
+
+@DEFAULT_REGISTRY.rule("CHILD", kinds=(NodeKind.CHILDREN,), codes=("CHILD-001",))
+def check_children_computed(ctx: RuleContext, node) -> None:
+    """$children не должен содержать ${computed.X} на не-функции"""
+    path, children = node
+    invalid_keys = ctx.index.invalid_keys
+    
+    for i, ref_key in iter_child_references(children):
+        if ref_key in invalid_keys:
+            ctx.report(ValidationIssue(
+                severity=Severity.ERROR,
+                code="CHILD-001",
+                key=ref_key,
+                found_type=invalid_keys[ref_key],
+                message=f"$children[{i}] содержит ${{computed.{ref_key}}} типа '{invalid_keys[ref_key]}'",
+                hint=f"В $children можно использовать только computed-функции (if/switch) или прямые компоненты.",
+                location=ctx.index.pointer((path, i))
+            ))
+
+
+def check_computed_graph(ctx: RuleContext) -> None:
+    """Циклы, неиспользуемые ключи и длинные цепочки computed"""
+    graph = computed_graph(ctx.index)
+    
+    for cycle in graph.cycles:
+        chain = " → ".join(cycle + [cycle[0]])
+        ctx.report(ValidationIssue(
+            severity=Severity.ERROR,
+            code="GRAPH-001",
+            key=cycle[0],
+            message=f"Циклическая зависимость computed: {chain}",
+            hint="Computed не может зависеть сам от себя — разорви цепочку.",
+            location=f"/computed/{escape_pointer_token(cycle[0])}"
+        ))
+    
+    unused = graph.unused
+    for key in unused:
+        ctx.report(ValidationIssue(
+            severity=Severity.WARNING,
+            code="GRAPH-002",
+            key=key,
+            message=f"computed.{key} нигде не используется",
+            hint="Удали ключ из computed — он только увеличивает payload.",
+            location=f"/computed/{escape_pointer_token(key)}"
+        ))
+    
+    unused = set(unused)
+    for key in graph.unreachable:
+        if key in unused:
+            continue
+        ctx.report(ValidationIssue(
+            severity=Severity.WARNING,
+            code="GRAPH-003",
+            key=key,
+            message=f"computed.{key} используется только недостижимыми computed",
+            hint="Разметка не доходит до этого ключа — удали всю цепочку.",
+            location=f"/computed/{escape_pointer_token(key)}"
+        ))
+    
+    for key in graph.keys:
+        depth = graph.depth.get(key)
+        if depth is not None and depth > MAX_COMPUTED_DEPTH:
+            ctx.report(ValidationIssue(
+                severity=Severity.WARNING,
+                code="GRAPH-004",
+                key=key,
+                message=f"computed.{key}: цепочка из {depth} вложенных computed",
+                hint=f"Длинные цепочки медленно вычисляются на клиенте (порог {MAX_COMPUTED_DEPTH}).",
+                location=f"/computed/{escape_pointer_token(key)}"
+            ))
+
+
+# Правило уровня документа — только finish, без подписки на узлы
+DEFAULT_REGISTRY.register(Rule(
+    rule_id="GRAPH",
+    check=lambda ctx, node: None,
+    kinds=(),
+    codes=("GRAPH-001", "GRAPH-002", "GRAPH-003", "GRAPH-004"),
+    description=check_computed_graph.__doc__,
+    finish=check_computed_graph,
+))
+
+
+def _run_rule(rule_id: str, data: Dict[str, Any],
+              index: Optional[ContractIndex]) -> List[ValidationIssue]:
+    """Прогоняет одно правило реестра по умолчанию"""
+    if index is None:
+        index = index_contract(data)
+    issues, _ = DEFAULT_REGISTRY.run(index, only=[rule_id])
+    return issues
+
+
+def validate_computed_types(data: Dict[str, Any],
+                            index: Optional[ContractIndex] = None) -> List[ValidationIssue]:
     """
     Проверяет что все объекты в computed секции имеют валидные computed-типы.
     
@@ -68,208 +247,100 @@ def validate_computed_types(data: Dict[str, Any]) -> List[ValidationIssue]:
     
     Args:
         data: Распарсенный JSON контракт
+        index: Готовый результат index_contract (чтобы не обходить заново)
         
     Returns:
         List[ValidationIssue]: Найденные проблемы
     """
-    issues = []
-    computed = data.get("computed", {})
-    
-    for key, value in computed.items():
-        if not isinstance(value, dict):
-            continue
-            
-        obj_type = value.get("type", "")
-        
-        if not obj_type:
-            # Нет type — возможно это просто данные, не функция
-            continue
-            
-        # Проверка на известные UI-компоненты
-        if obj_type in KNOWN_UI_COMPONENTS:
-            issues.append(ValidationIssue(
-                severity=Severity.ERROR,
-                code="COMP-001",
-                key=key,
-                found_type=obj_type,
-                message=f"computed.{key} имеет type='{obj_type}' — это UI-компонент, не computed-функция",
-                hint=f"Перенеси '{key}' в секцию data или template. В computed используй только if/switch/applyTemplate для ссылки на него."
-            ))
-        elif obj_type not in VALID_COMPUTED_TYPES:
-            # Неизвестный тип — может быть новый компонент
-            issues.append(ValidationIssue(
-                severity=Severity.WARNING,
-                code="COMP-002", 
-                key=key,
-                found_type=obj_type,
-                message=f"computed.{key} имеет неизвестный type='{obj_type}'",
-                hint=f"Проверь: если это UI-компонент — перенеси в data/template. Если новая computed-функция — добавь в VALID_COMPUTED_TYPES."
-            ))
-    
-    return issues
+    return _run_rule("COMP", data, index)
 
 
-def find_computed_references(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+def find_computed_references(data: Dict[str, Any],
+                             index: Optional[ContractIndex] = None) -> List[Dict[str, Any]]:
     """
     Находит все ссылки ${computed.X} в JSON контракте.
     
     Args:
         data: Распарсенный JSON контракт
+        index: Готовый результат index_contract (чтобы не обходить заново)
         
     Returns:
         List[Dict]: Список найденных ссылок с метаданными
     """
-    references = []
-    content_str = json.dumps(data, ensure_ascii=False)
-    
-    # Pattern для ${computed.keyName}
-    pattern = r'\$\{computed\.(\w+)\}'
-    
-    for match in re.finditer(pattern, content_str):
-        ref_key = match.group(1)
-        # Находим контекст (несколько символов вокруг)
-        start = max(0, match.start() - 50)
-        end = min(len(content_str), match.end() + 50)
-        context = content_str[start:end]
-        
-        references.append({
-            "key": ref_key,
-            "full_ref": match.group(0),
-            "context": context,
-            "position": match.start()
-        })
-    
-    return references
+    if index is None:
+        index = index_contract(data)
+    
+    return [
+        {
+            "key": ref.key,
+            "full_ref": ref.full_ref,
+            "context": ref.value,
+            "pointer": ref.pointer,
+        }
+        for ref in index.references
+    ]
 
 
-def validate_computed_references(data: Dict[str, Any]) -> List[ValidationIssue]:
+def validate_computed_references(data: Dict[str, Any],
+                                 index: Optional[ContractIndex] = None) -> List[ValidationIssue]:
     """
     Проверяет что все ${computed.X} ссылки указывают на валидные computed-функции.
     
     Args:
         data: Распарсенный JSON контракт
+        index: Готовый результат index_contract (чтобы не обходить заново)
         
     Returns:
         List[ValidationIssue]: Найденные проблемы
     """
-    issues = []
-    computed = data.get("computed", {})
-    
-    # Классифицируем computed ключи
-    valid_keys = set()
-    invalid_keys = {}  # key → type
-    
-    for key, value in computed.items():
-        if isinstance(value, dict):
-            obj_type = value.get("type", "")
-            if obj_type in VALID_COMPUTED_TYPES:
-                valid_keys.add(key)
-            elif obj_type in KNOWN_UI_COMPONENTS:
-                invalid_keys[key] = obj_type
-            elif obj_type:
-                # Неизвестный тип — помечаем как потенциально невалидный
-                invalid_keys[key] = obj_type
-    
-    # Находим все ссылки
-    references = find_computed_references(data)
-    
-    # Проверяем каждую ссылку
-    seen_refs = set()  # Чтобы не дублировать ошибки
-    
-    for ref in references:
-        ref_key = ref["key"]
-        
-        if ref_key in seen_refs:
-            continue
-        seen_refs.add(ref_key)
-        
-        if ref_key in invalid_keys:
-            issues.append(ValidationIssue(
-                severity=Severity.ERROR,
-                code="REF-001",
-                key=ref_key,
-                found_type=invalid_keys[ref_key],
-                message=f"${{computed.{ref_key}}} ссылается на '{invalid_keys[ref_key]}' — это не computed-функция",
-                hint=f"SDUI ожидает if/switch/applyTemplate. Используй ${{data.{ref_key}}} или ${{template.{ref_key}}} вместо computed.",
-                location=ref["context"][:80] + "..." if len(ref["context"]) > 80 else ref["context"]
-            ))
-        elif ref_key not in computed:
-            issues.append(ValidationIssue(
-                severity=Severity.ERROR,
-                code="REF-002",
-                key=ref_key,
-                message=f"${{computed.{ref_key}}} ссылается на несуществующий ключ",
-                hint=f"Добавь '{ref_key}' в секцию computed или исправь имя ссылки."
-            ))
-    
-    return issues
+    return _run_rule("REF", data, index)
 
 
-def validate_nested_computed_calls(data: Dict[str, Any]) -> List[ValidationIssue]:
+def validate_nested_computed_calls(data: Dict[str, Any],
+                                   index: Optional[ContractIndex] = None) -> List[ValidationIssue]:
     """
     Проверяет вложенные вызовы computed в $children и других массивах.
     
     Ищет паттерн где $children содержит ${computed.X} где X — не computed-функция.
     """
-    issues = []
-    computed = data.get("computed", {})
-    
-    # Собираем невалидные ключи
-    invalid_keys = {}
-    for key, value in computed.items():
-        if isinstance(value, dict):
-            obj_type = value.get("type", "")
-            if obj_type and obj_type not in VALID_COMPUTED_TYPES:
-                invalid_keys[key] = obj_type
-    
-    # Рекурсивно ищем $children с computed ссылками
-    def check_children(obj, path="root"):
-        if isinstance(obj, dict):
-            children = obj.get("$children", [])
-            if isinstance(children, list):
-                for i, child in enumerate(children):
-                    if isinstance(child, str) and child.startswith("${computed."):
-                        # Извлекаем ключ
-                        match = re.match(r'\$\{computed\.(\w+)\}', child)
-                        if match:
-                            ref_key = match.group(1)
-                            if ref_key in invalid_keys:
-                                issues.append(ValidationIssue(
-                                    severity=Severity.ERROR,
-                                    code="CHILD-001",
-                                    key=ref_key,
-                                    found_type=invalid_keys[ref_key],
-                                    message=f"$children[{i}] содержит ${{computed.{ref_key}}} типа '{invalid_keys[ref_key]}'",
-                                    hint=f"В $children можно использовать только computed-функции (if/switch) или прямые компоненты.",
-                                    location=path
-                                ))
-            
-            # Рекурсия
-            for k, v in obj.items():
-                check_children(v, f"{path}.{k}")
-        elif isinstance(obj, list):
-            for i, item in enumerate(obj):
-                check_children(item, f"{path}[{i}]")
-    
-    check_children(data)
-    return issues
+    return _run_rule("CHILD", data, index)
 
 
-def validate_sdui_contract(json_content: str) -> ValidationResult:
+def validate_sdui_contract(json_content: str,
+                           registry: Optional[RuleRegistry] = None,
+                           schemas: Optional[Any] = None,
+                           cache: Optional[Any] = None) -> ValidationResult:
     """
     Полная валидация SDUI контракта.
     
-    Проверяет:
+    Проверяет (правила DEFAULT_REGISTRY):
     1. Типы в computed секции
     2. Ссылки ${computed.X}
     3. Использование в $children
+    4. Граф зависимостей computed: циклы, мёртвые ключи, глубина
+    5. Компоненты по JSON Schema (если передан schemas)
     
     Args:
         json_content: JSON строка или уже распарсенный dict
+        registry: Набор правил (по умолчанию DEFAULT_REGISTRY)
+        schemas: SchemaStore из schemas.py — валидация компонентов по схемам
+        cache: ValidationCache из cache.py — неизменённый контракт отвечается
+               без обхода (не используется вместе со schemas: схемы меняются отдельно)
         
     Returns:
         ValidationResult: Полный результат валидации
     """
+    if registry is None:
+        registry = DEFAULT_REGISTRY
+    
+    cache_key = None
+    if cache is not None and schemas is None:
+        cache_key, cached, parsed = cache.lookup(json_content, registry)
+        if cached is not None:
+            return cached
+        if parsed is not None:
+            json_content = parsed
+    
     # Parse JSON if string
     if isinstance(json_content, str):
         try:
@@ -288,38 +359,32 @@ def validate_sdui_contract(json_content: str) -> ValidationResult:
     else:
         data = json_content
     
-    # Collect all issues
-    all_issues = []
-    
-    # Check 1: Computed types
-    all_issues.extend(validate_computed_types(data))
-    
-    # Check 2: Computed references  
-    all_issues.extend(validate_computed_references(data))
-    
-    # Check 3: Nested children
-    all_issues.extend(validate_nested_computed_calls(data))
+    # Single traversal — все правила работают по одному индексу
+    index = index_contract(data)
     
-    # Build result
-    computed = data.get("computed", {})
-    valid_keys = set()
-    invalid_keys = {}
+    all_issues, rule_stats = registry.run(index)
     
-    for key, value in computed.items():
-        if isinstance(value, dict):
-            obj_type = value.get("type", "")
-            if obj_type in VALID_COMPUTED_TYPES:
-                valid_keys.add(key)
-            elif obj_type:
-                invalid_keys[key] = obj_type
+    # Схемы выключаются целиком (SCHEMA) или по коду (SCHEMA-002)
+    if schemas is not None and "SCHEMA" not in registry.disabled_codes:
+        all_issues.extend(
+            issue for issue in schemas.validate(data)
+            if issue.code not in registry.disabled_codes
+        )
     
-    return ValidationResult(
+    result = ValidationResult(
         is_valid=len([i for i in all_issues if i.severity == Severity.ERROR]) == 0,
         issues=all_issues,
-        computed_keys=set(computed.keys()),
-        valid_computed_keys=valid_keys,
-        invalid_computed_keys=invalid_keys
+        computed_keys=set(index.computed.keys()),
+        valid_computed_keys=set(index.valid_keys),
+        invalid_computed_keys=dict(index.invalid_keys),
+        rule_stats=rule_stats,
+        computed_graph=index.computed_graph
     )
+    
+    if cache_key is not None:
+        cache.store(cache_key, result)
+    
+    return result
 
 
 def format_validation_report(result: ValidationResult, verbose: bool = False) -> str:
@@ -380,19 +445,56 @@ def format_validation_report(result: ValidationResult, verbose: bool = False) ->
             lines.append(f"\n  ✗ Invalid:")
             for k, t in sorted(result.invalid_computed_keys.items()):
                 lines.append(f"      {k}: {t}")
+        
+        graph = result.computed_graph
+        if graph is not None and graph.keys:
+            lines.append("")
+            lines.append("-" * 60)
+            lines.append("COMPUTED GRAPH:")
+            lines.append("-" * 60)
+            unreachable = set(graph.unreachable)
+            for key in graph.keys:
+                depth = graph.depth.get(key)
+                depth_text = "cycle" if depth is None else str(depth)
+                marks = " (unreachable)" if key in unreachable else ""
+                deps = ", ".join(graph.edges.get(key, ())) or "-"
+                lines.append(f"  {key:<32} depth {depth_text:>5}  → {deps}{marks}")
+                if graph.data_refs.get(key):
+                    lines.append(f"  {'':<32} data: {', '.join(graph.data_refs[key])}")
+        
+        if result.cached:
+            lines.append("")
+            lines.append("♻️  Result from validation cache (contract unchanged)")
+        
+        if result.rule_stats:
+            lines.append("")
+            lines.append("-" * 60)
+            lines.append("RULES:")
+            lines.append("-" * 60)
+            for rule_id, stats in result.rule_stats.items():
+                lines.append(
+                    f"  {rule_id:<8} {stats.elapsed * 1000:7.2f} ms  "
+                    f"{stats.nodes:>6} nodes  {stats.issues:>4} issue(s)"
+                )
     
     return "\n".join(lines)
 
 
 # ==================== CLI Interface ====================
 
-def validate_file(file_path: str, verbose: bool = False) -> bool:
+def validate_file(file_path: str, verbose: bool = False,
+                  registry: Optional[RuleRegistry] = None,
+                  schemas: Optional[Any] = None,
+                  cache: Optional[Any] = None) -> bool:
     """
     Валидирует JSON файл и выводит отчет.
     
     Args:
         file_path: Путь к JSON файлу
         verbose: Подробный вывод
+        registry: Набор правил (по умолчанию DEFAULT_REGISTRY)
+        schemas: SchemaStore — дополнительно валидировать компоненты по схемам
+        cache: ValidationCache — не перевалидировать неизменённый контракт
         
     Returns:
         bool: True если валидация прошла без ошибок
@@ -407,7 +509,7 @@ def validate_file(file_path: str, verbose: bool = False) -> bool:
         print(f"❌ Error reading file: {e}")
         return False
     
-    result = validate_sdui_contract(content)
+    result = validate_sdui_contract(content, registry=registry, schemas=schemas, cache=cache)
     report = format_validation_report(result, verbose=verbose)
     print(report)
     
@@ -0,0 +1,74 @@
+"""Регрессии ValidationCache: ключ в порядке документа, prune, алиасы и TTL"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sdui_tools import ValidationCache, validate_sdui_contract  # noqa: E402
+from sdui_tools import cache as cache_module  # noqa: E402
+
+CONTRACT_XY = '{"computed":{},"x":{"t":"${computed.nope}"},"y":{"t":"${computed.nope}"}}'
+CONTRACT_YX = '{"computed":{},"y":{"t":"${computed.nope}"},"x":{"t":"${computed.nope}"}}'
+
+
+def issues(result):
+    return [(i.code, i.location) for i in result.issues]
+
+
+def test_key_order_is_part_of_cache_key(tmp_path):
+    cache = ValidationCache(str(tmp_path))
+    validate_sdui_contract(CONTRACT_XY, cache=cache)
+    result = validate_sdui_contract(CONTRACT_YX, cache=cache)
+
+    assert not result.cached
+    assert issues(result) == issues(validate_sdui_contract(CONTRACT_YX))
+    assert issues(result) == [("REF-002", "/y/t")]
+
+
+def test_prune_counts_results_only_and_drops_orphan_aliases(tmp_path):
+    cache = ValidationCache(str(tmp_path), max_entries=1)
+    validate_sdui_contract(CONTRACT_XY, cache=cache)
+    validate_sdui_contract(CONTRACT_YX, cache=cache)
+    os.utime(next(tmp_path.glob("r-*")), (0, 0))  # один из результатов — самый старый
+
+    cache.prune()
+
+    results = sorted(p.name for p in tmp_path.glob("r-*"))
+    aliases = [p.read_text() for p in tmp_path.glob("a-*")]
+    assert len(results) == 1
+    assert len(aliases) == 1
+    assert f"r-{aliases[0]}.json" == results[0]
+
+
+def test_memory_hit_respects_ttl(tmp_path, monkeypatch):
+    cache = ValidationCache(str(tmp_path), ttl=10)
+    validate_sdui_contract(CONTRACT_XY, cache=cache)
+    assert validate_sdui_contract(CONTRACT_XY, cache=cache).cached
+
+    now = time.time()
+    monkeypatch.setattr(cache_module.time, "time", lambda: now + 60)
+    result = validate_sdui_contract(CONTRACT_XY, cache=cache)
+
+    assert not result.cached
+    assert cache.evicted == 1  # файл тоже просрочен
+
+
+def test_text_lookup_without_parse(tmp_path):
+    cache = ValidationCache(str(tmp_path))
+    key, result, data = cache.lookup(CONTRACT_XY, parse=False)
+    assert result is None and data is None
+    cache.store(key, validate_sdui_contract(CONTRACT_XY))
+
+    _, result, _ = cache.lookup(CONTRACT_XY, parse=False)
+    assert result.cached
+    assert issues(result) == [("REF-002", "/x/t")]
+
+
+def test_ruleset_version_includes_logic_modules(tmp_path, monkeypatch):
+    cache = ValidationCache(str(tmp_path))
+    version = cache.ruleset_version()
+
+    monkeypatch.setattr(cache_module, "_logic_digest", "changed")
+    assert ValidationCache(str(tmp_path)).ruleset_version() != version
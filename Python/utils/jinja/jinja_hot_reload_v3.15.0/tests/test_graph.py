@@ -0,0 +1,54 @@
+"""Граф computed: владельцы выражений из индекса, переиспользование в watch mode"""
+
+import copy
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sdui_tools import IncrementalValidator, validate_sdui_contract  # noqa: E402
+
+CONTRACT = {
+    "layout": {"type": "StackView", "$children": [
+        {"type": "LabelView", "text": "${computed.title}"},
+        {"type": "LabelView", "text": "static"},
+    ]},
+    "computed": {
+        "title": {"type": "if", "if": "${computed.flag > 0}", "then": "${data.title}"},
+        "flag": {"type": "if", "if": "${computed.title}"},
+        "dead": {"type": "switch", "value": "${data.x}"},
+    },
+}
+
+
+def graph_of(result):
+    graph = result.computed_graph
+    return graph.edges, graph.data_refs, graph.cycles, graph.depth, graph.unused, graph.unreachable
+
+
+def test_graph_uses_owner_of_each_expression():
+    graph = validate_sdui_contract(copy.deepcopy(CONTRACT)).computed_graph
+
+    assert graph.edges == {"title": ["flag"], "flag": ["title"], "dead": []}
+    assert graph.data_refs["title"] == ["data.title"]
+    assert graph.cycles == [["title", "flag"]]
+    assert graph.roots == {"title"}
+    assert graph.unused == ["dead"]
+
+
+def test_incremental_reuses_graph_until_its_inputs_change():
+    validator = IncrementalValidator()
+    validator.validate(copy.deepcopy(CONTRACT))
+
+    edited = copy.deepcopy(CONTRACT)
+    edited["layout"]["$children"][1]["text"] = "edited"
+    result = validator.validate(edited)
+    assert not validator.last_stats.graph_rebuilt
+    assert graph_of(result) == graph_of(validate_sdui_contract(copy.deepcopy(edited)))
+
+    edited = copy.deepcopy(edited)
+    edited["layout"]["$children"][1]["text"] = "${computed.dead}"
+    result = validator.validate(edited)
+    assert validator.last_stats.graph_rebuilt
+    assert graph_of(result) == graph_of(validate_sdui_contract(copy.deepcopy(edited)))
+    assert result.computed_graph.unused == []
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+SDUI Batch Validator CLI
+========================
+Parallel validation of [FULL_*] SDUI contracts for CI.
+
+- Accepts directories (recursive [FULL_*].json), glob patterns and files
+- Validates across a process pool, prints results as they finish
+- Writes JSON Lines, JUnit XML and SARIF reports
+- Per-file timing column, slow contracts are highlighted
+
+Usage:
+    python validate_batch.py _JSON/
+    python validate_batch.py "_JSON/**/[[]FULL_*.json" --workers 8
+    python validate_batch.py _JSON/ --jsonl out.jsonl --junit junit.xml --sarif out.sarif
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Add parent directory to path for package import
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sdui_tools import VERSION
+from sdui_tools.config import DEFAULT_SCHEMA_ROOT, VALIDATION_CACHE_DIR
+from sdui_tools.batch import (
+    discover_contracts,
+    validate_many,
+    report_to_json_line,
+    write_junit,
+    write_sarif,
+)
+
+
+def format_line(report, done: int, total: int, slow_ms: float, base_dir: str) -> str:
+    """Строка прогресса: [n/total] статус время файл"""
+    elapsed_ms = report.elapsed * 1000
+    if report.error is not None:
+        status = "💥"
+    elif report.errors:
+        status = "❌"
+    elif report.warnings:
+        status = "⚠️ "
+    else:
+        status = "✅"
+
+    slow = " 🐢" if elapsed_ms >= slow_ms else ""
+    width = len(str(total))
+    name = os.path.relpath(report.path, base_dir)
+    counts = ""
+    if report.error is not None:
+        counts = f"  {report.error}"
+    elif report.issues:
+        counts = f"  ({len(report.errors)} errors, {len(report.warnings)} warnings)"
+
+    return f"[{done:>{width}}/{total}] {status} {elapsed_ms:>9.1f} ms{slow}  {name}{counts}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="SDUI Batch Contract Validator",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s _JSON/
+  %(prog)s _JSON/WEB _JSON/IOS --workers 4
+  %(prog)s "_JSON/**/*.json" --sarif results.sarif
+  %(prog)s _JSON/ --jsonl results.jsonl --junit junit.xml --slow-ms 200
+
+Exit codes:
+  0 - All contracts passed (warnings allowed)
+  1 - Validation errors found
+  2 - No contracts found or read errors
+        """
+    )
+
+    parser.add_argument(
+        "targets",
+        nargs="+",
+        help="Directories, glob patterns or contract files",
+    )
+    parser.add_argument(
+        "--workers", "-j",
+        type=int,
+        default=None,
+        help="Process pool size (default: CPU count, 1 = no pool)",
+    )
+    parser.add_argument(
+        "--jsonl",
+        metavar="PATH",
+        help="Write JSON Lines report (one line per file, streamed)",
+    )
+    parser.add_argument(
+        "--junit",
+        metavar="PATH",
+        help="Write JUnit XML report",
+    )
+    parser.add_argument(
+        "--sarif",
+        metavar="PATH",
+        help="Write SARIF 2.1.0 report",
+    )
+    parser.add_argument(
+        "--slow-ms",
+        type=float,
+        default=500.0,
+        help="Highlight contracts validated slower than this (default: 500)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Show N slowest contracts in summary (default: 5)",
+    )
+    parser.add_argument(
+        "--quiet", "-q",
+        action="store_true",
+        help="Print only failed and slow contracts",
+    )
+    parser.add_argument(
+        "--schemas",
+        nargs="?",
+        const=DEFAULT_SCHEMA_ROOT,
+        default=None,
+        metavar="SDUI_DIR",
+        help=f"Also validate components against JSON Schemas (default: {DEFAULT_SCHEMA_ROOT})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-validate (skip the shared validation result cache)",
+    )
+    parser.add_argument(
+        "--disable",
+        action="append",
+        default=[],
+        metavar="CODE",
+        help="Disable a rule (COMP, REF, CHILD) or an issue code (COMP-002). Repeatable",
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {VERSION}",
+    )
+
+    args = parser.parse_args()
+
+    files = discover_contracts(args.targets)
+    if not files:
+        print(f"❌ No contracts found: {' '.join(args.targets)}")
+        sys.exit(2)
+
+    base_dir = os.path.commonpath([os.path.dirname(f) for f in files])
+    workers = args.workers or os.cpu_count() or 1
+
+    print(f"🔍 Validating {len(files)} contracts ({workers} workers)")
+    print(f"📁 {base_dir}")
+    print("-" * 60)
+
+    jsonl = open(args.jsonl, "w", encoding="utf-8") if args.jsonl else None
+    reports = []
+    started = time.perf_counter()
+
+    try:
+        for report in validate_many(files, workers=workers, disabled=args.disable,
+                                    schema_root=args.schemas,
+                                    cache_dir=None if args.no_cache else VALIDATION_CACHE_DIR):
+            reports.append(report)
+            if jsonl:
+                jsonl.write(report_to_json_line(report) + "\n")
+                jsonl.flush()
+
+            slow = report.elapsed * 1000 >= args.slow_ms
+            if not args.quiet or not report.is_valid or slow:
+                print(format_line(report, len(reports), len(files), args.slow_ms, base_dir), flush=True)
+    except KeyboardInterrupt:
+        print("\n⛔ Interrupted")
+    finally:
+        if jsonl:
+            jsonl.close()
+
+    wall = time.perf_counter() - started
+
+    # Отчёты — в стабильном порядке, независимо от порядка завершения
+    reports.sort(key=lambda r: r.path)
+    if args.junit:
+        write_junit(reports, args.junit, base_dir)
+    if args.sarif:
+        write_sarif(reports, args.sarif, base_dir)
+
+    failed = [r for r in reports if r.error is None and r.errors]
+    broken = [r for r in reports if r.error is not None]
+    total_errors = sum(len(r.errors) for r in reports)
+    total_warnings = sum(len(r.warnings) for r in reports)
+    cpu_time = sum(r.elapsed for r in reports)
+
+    print("-" * 60)
+    if args.top > 0:
+        slowest = sorted(reports, key=lambda r: r.elapsed, reverse=True)[:args.top]
+        print(f"🐢 Slowest {len(slowest)}:")
+        for report in slowest:
+            print(f"   {report.elapsed * 1000:>9.1f} ms  {os.path.relpath(report.path, base_dir)}")
+        print("-" * 60)
+
+    print(f"📊 Files: {len(reports)}/{len(files)}  "
+          f"❌ Failed: {len(failed)}  💥 Read errors: {len(broken)}")
+    print(f"   Errors: {total_errors}  Warnings: {total_warnings}")
+    print(f"⏱️  Wall: {wall:.2f}s  CPU: {cpu_time:.2f}s  "
+          f"({len(reports) / wall if wall else 0:.1f} files/s)")
+
+    for path, label in ((args.jsonl, "JSONL"), (args.junit, "JUnit"), (args.sarif, "SARIF")):
+        if path:
+            print(f"📝 {label}: {path}")
+
+    if broken or len(reports) < len(files):
+        sys.exit(2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
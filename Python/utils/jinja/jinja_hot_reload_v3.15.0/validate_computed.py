@@ -13,6 +13,8 @@ Usage:
     python validate_computed.py contract.json
     python validate_computed.py contract.json --verbose
     python validate_computed.py contract.json -v
+    python validate_computed.py contract.json --disable COMP-002
+    python validate_computed.py contract.json --schemas ~/Documents/front-middle-schema/SDUI
 """
 
 import sys
@@ -22,7 +24,10 @@ import argparse
 # Add parent directory to path for package import
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from sdui_tools import VERSION
+from sdui_tools import VERSION, DEFAULT_REGISTRY
+from sdui_tools.config import DEFAULT_SCHEMA_ROOT
+from sdui_tools.schemas import SchemaStore
+from sdui_tools.cache import ValidationCache
 from sdui_tools.validators import validate_file
 
 
@@ -35,6 +40,9 @@ Examples:
   %(prog)s contract.json
   %(prog)s contract.json --verbose
   %(prog)s [FULL_PC]_main_screen.json -v
+  %(prog)s contract.json --disable COMP-002 --disable CHILD
+  %(prog)s contract.json --schemas --schema-workers 4
+  %(prog)s contract.json --no-cache
 
 Exit codes:
   0 - Validation passed (no errors, warnings allowed)
@@ -53,6 +61,32 @@ Exit codes:
         action="store_true",
         help="Show detailed validation info (all computed keys)",
     )
+    parser.add_argument(
+        "--disable",
+        action="append",
+        default=[],
+        metavar="CODE",
+        help="Disable a rule (COMP, REF, CHILD) or an issue code (COMP-002). Repeatable",
+    )
+    parser.add_argument(
+        "--schemas",
+        nargs="?",
+        const=DEFAULT_SCHEMA_ROOT,
+        default=None,
+        metavar="SDUI_DIR",
+        help=f"Validate components against front-middle-schema/SDUI (default: {DEFAULT_SCHEMA_ROOT})",
+    )
+    parser.add_argument(
+        "--schema-workers",
+        type=int,
+        default=1,
+        help="Process pool size for schema validation (default: 1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-validate (skip the shared validation result cache)",
+    )
     parser.add_argument(
         "--version",
         action="version",
@@ -70,7 +104,20 @@ Exit codes:
     print(f"🔍 Validating: {os.path.basename(file_path)}")
     print("-" * 60)
 
-    success = validate_file(file_path, verbose=args.verbose)
+    registry = DEFAULT_REGISTRY.copy()
+    for code in args.disable:
+        registry.disable(code)
+
+    schemas = None
+    if args.schemas:
+        schemas = SchemaStore(args.schemas, workers=args.schema_workers)
+        if not schemas.components:
+            print(f"⚠️  No component schemas found in: {schemas.schema_root}")
+
+    cache = None if args.no_cache else ValidationCache()
+
+    success = validate_file(file_path, verbose=args.verbose, registry=registry,
+                            schemas=schemas, cache=cache)
     
     sys.exit(0 if success else 1)
 
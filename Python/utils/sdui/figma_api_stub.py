@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Figma API Stand-in (local)
+========================================================================
+Local HTTP server with the subset of the Figma REST API the SDUI exporter
+uses, so fetching, caching and retries can be exercised and benchmarked
+offline, without api.figma.com and a real token.
+
+Endpoints:
+- GET /v1/files/{key}/nodes?ids=a,b  - node documents (batched ids)
+- GET /v1/files/{key}?depth=1        - file metadata (version, lastModified)
+- GET /v1/images/{key}?ids=a,b       - render URLs, served by /_render/...
+- GET /_fixtures                     - loaded file keys / node ids
+- GET /_stats                        - request counters
+
+Fixtures (--fixtures, files or directories, recursive):
+- Raw Figma node JSON ({file_key}_{node_id}.json, as in the old cache)
+- Exporter cache entries ({file_key}_{node_id}.json.gz)
+- SDUI exports (SDUI-export/*.json) - rebuilt into Figma-like node trees,
+  served as file key LOCAL, node ids 1-1, 1-2, ... (sorted by file name)
+
+Fault injection:
+- --latency / --jitter    - delay per API request (ms)
+- --rate-429 P            - random 429 with probability P
+- --rate-limit RPS        - token bucket: 429 above RPS requests per second
+- --retry-after S         - Retry-After header value for injected 429s
+
+Usage:
+  python3 figma_api_stub.py --fixtures ../../SDUI-export
+  python3 figma_api_stub.py --fixtures ~/.sdui_export_cache --latency 300 --jitter 200
+  python3 figma_api_stub.py --fixtures ../../SDUI-export --rate-429 0.2 --retry-after 1
+
+  FIGMA_API_URL=http://127.0.0.1:8765 python3 sdui_export_v7.9.1.py 1-1 1-2 1-3 \\
+      --file-key LOCAL -t local -o /tmp/screens
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# === CONFIGURATION & CONSTANTS ===
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+SDUI_FILE_KEY = "LOCAL"
+FILE_VERSION = "1"
+LAST_MODIFIED = "2025-01-01T00:00:00Z"
+
+FIXTURE_NAME_RE = re.compile(r"^([a-zA-Z0-9]+)_(\d+[-:]\d+)\.json(\.gz)?$")
+
+# SDUI spacing tokens → px (approximate, only for rebuilt trees)
+SPACING_PX = {
+    "zero": 0, "xxxs": 2, "xxs": 4, "xs": 6, "s": 8, "xss": 10, "m": 12,
+    "l": 16, "xl": 20, "xxl": 24, "xxxl": 40, "xxxxl": 48, "xxxxxl": 64,
+}
+
+# Types the exporter maps by layer name
+NAMED_TYPES = {"ButtonView", "IconView", "ImageView", "TagView", "RectangleView"}
+
+# 1x1 transparent PNG for /_render
+PIXEL_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+# === SDUI → FIGMA NODE TREE ===
+
+
+class NodeBuilder:
+    """Rebuilds a Figma-like node tree from an SDUI export"""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.counter = 0
+
+    def next_id(self) -> str:
+        self.counter += 1
+        return f"{self.prefix}:{self.counter}"
+
+    def text(self, value: str, name: str = "text") -> Dict:
+        return {
+            "id": self.next_id(),
+            "name": name,
+            "type": "TEXT",
+            "characters": value,
+            "style": {"fontSize": 16, "fontWeight": 400},
+            "fills": [{"type": "SOLID", "color": {"r": 0.0, "g": 0.0, "b": 0.0, "a": 1}}],
+        }
+
+    def build(self, element: Dict, name: Optional[str] = None) -> Dict:
+        kind = element.get("type", "")
+        content = element.get("content") or {}
+
+        if kind == "LabelView":
+            text = content.get("text") or {}
+            value = text.get("value") if isinstance(text, dict) else str(text)
+            return self.text(value or "Text", element.get("dataTestId") or "label")
+
+        node: Dict[str, Any] = {"id": self.next_id(), "type": "FRAME"}
+        if kind in NAMED_TYPES:
+            node["type"] = "INSTANCE"
+            node["name"] = kind
+            title = content.get("title") or content.get("text")
+            if isinstance(title, dict):
+                title = title.get("value")
+            node["children"] = [self.text(title)] if isinstance(title, str) else []
+            return node
+
+        node["name"] = name or (kind if kind and kind != "StackView" else "Frame")
+        if kind == "StackView":
+            node["layoutMode"] = "HORIZONTAL" if content.get("axis") == "horizontal" else "VERTICAL"
+            node["itemSpacing"] = SPACING_PX.get(content.get("spacing"), 0)
+        paddings = element.get("paddings") or {}
+        for side in ("top", "bottom", "left", "right"):
+            if side in paddings:
+                node[f"padding{side.title()}"] = SPACING_PX.get(paddings[side], 0)
+        background = (element.get("appearance") or {}).get("backgroundColor")
+        if background:
+            node["fills"] = [{"type": "SOLID", "color": {"r": 1, "g": 1, "b": 1, "a": 1}}]
+        node["children"] = [self.build(child) for child in self.child_elements(content)]
+        return node
+
+    @staticmethod
+    def child_elements(content: Dict) -> List[Dict]:
+        children = content.get("children")
+        if isinstance(children, list):
+            return [c for c in children if isinstance(c, dict) and "type" in c]
+        # Wrappers keep their single child in content.content / content.child
+        for key in ("content", "child"):
+            value = content.get(key)
+            if isinstance(value, dict) and "type" in value:
+                return [value]
+        return []
+
+
+# === FIXTURES ===
+
+
+class Fixtures:
+    """(file_key, node_id) → node document"""
+
+    def __init__(self):
+        self.nodes: Dict[Tuple[str, str], Dict] = {}
+        self.names: Dict[str, str] = {}
+
+    def load(self, paths: List[Path]) -> "Fixtures":
+        files: List[Path] = []
+        for path in paths:
+            if path.is_dir():
+                files.extend(p for p in path.rglob("*") if p.name.endswith((".json", ".json.gz")))
+            elif path.exists():
+                files.append(path)
+            else:
+                print(f"⚠️  Fixture not found: {path}", file=sys.stderr)
+
+        sdui_index = 0
+        for path in sorted(files):
+            try:
+                if path.name.endswith(".gz"):
+                    with gzip.open(path, "rt", encoding="utf-8") as f:
+                        data = json.load(f)
+                else:
+                    with open(path, encoding="utf-8") as f:
+                        data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipped {path.name}: {e}", file=sys.stderr)
+                continue
+            if not isinstance(data, dict):
+                continue
+
+            match = FIXTURE_NAME_RE.match(path.name)
+            if match and "document" in data and "node_id" in data:
+                # Exporter cache entry
+                self.add(match.group(1), match.group(2), data["document"])
+            elif match and "id" in data and str(data.get("type", "")).isupper():
+                # Raw Figma node (old cache format)
+                self.add(match.group(1), match.group(2), data)
+            elif "type" in data:
+                # SDUI export: rebuild a node tree
+                sdui_index += 1
+                node_id = f"1-{sdui_index}"
+                root = NodeBuilder(node_id.replace("-", ":")).build(data, path.stem)
+                root["id"] = node_id.replace("-", ":")
+                self.add(SDUI_FILE_KEY, node_id, root)
+        return self
+
+    def add(self, file_key: str, node_id: str, document: Dict) -> None:
+        node_id = node_id.replace(":", "-")
+        self.nodes[(file_key, node_id)] = document
+        self.names.setdefault(file_key, f"{file_key} (local fixtures)")
+
+    def listing(self) -> Dict[str, List[Dict]]:
+        result: Dict[str, List[Dict]] = {}
+        for (file_key, node_id), document in sorted(self.nodes.items()):
+            result.setdefault(file_key, []).append({
+                "node_id": node_id,
+                "name": document.get("name", ""),
+                "url": f"https://www.figma.com/design/{file_key}/local?node-id={node_id}",
+            })
+        return result
+
+
+# === FAULT INJECTION ===
+
+
+class Faults:
+    """Latency and 429 injection shared by all handler threads"""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, rate_429: float,
+                 rate_limit: float, retry_after: int, seed: Optional[int]):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_429 = rate_429
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = rate_limit
+        self.refilled = time.monotonic()
+
+    def delay(self) -> None:
+        with self.lock:
+            wait = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttled(self) -> bool:
+        with self.lock:
+            if self.rate_429 and self.random.random() < self.rate_429:
+                return True
+            if self.rate_limit:
+                now = time.monotonic()
+                self.tokens = min(self.rate_limit, self.tokens + (now - self.refilled) * self.rate_limit)
+                self.refilled = now
+                if self.tokens < 1:
+                    return True
+                self.tokens -= 1
+        return False
+
+
+# === HTTP SERVER ===
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as api.figma.com
+    server: "StandInServer"
+
+    def log_message(self, fmt: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def send_json(self, status: int, data: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p]
+        if parts[:1] == ["_fixtures"]:
+            return self.send_json(200, self.server.fixtures.listing())
+        if parts[:1] == ["_stats"]:
+            return self.send_json(200, self.server.snapshot())
+        if parts[:1] == ["_render"]:
+            self.server.count("render")
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(PIXEL_PNG)))
+            self.end_headers()
+            self.wfile.write(PIXEL_PNG)
+            return
+
+        if parts[:1] != ["v1"]:
+            return self.send_json(404, {"status": 404, "err": "Not found"})
+        if not self.headers.get("X-Figma-Token"):
+            self.server.count("403")
+            return self.send_json(403, {"status": 403, "err": "Invalid token"})
+
+        self.server.count("api")
+        self.server.faults.delay()
+        if self.server.faults.throttled():
+            self.server.count("429")
+            return self.send_json(
+                429,
+                {"status": 429, "err": "Rate limit exceeded"},
+                {"Retry-After": str(self.server.faults.retry_after)},
+            )
+
+        ids = [i for i in ",".join(query.get("ids", [])).split(",") if i]
+        if len(parts) == 4 and parts[1] == "files" and parts[3] == "nodes":
+            self.server.count("nodes")
+            return self.send_json(200, self.nodes(parts[2], ids))
+        if len(parts) == 3 and parts[1] == "files":
+            self.server.count("meta")
+            return self.send_json(200, self.meta(parts[2]))
+        if len(parts) == 3 and parts[1] == "images":
+            self.server.count("images")
+            fmt = query.get("format", ["png"])[0]
+            images = {
+                i: f"{self.server.base_url}/_render/{parts[2]}/{i.replace(':', '-')}.{fmt}"
+                if (parts[2], i.replace(":", "-")) in self.server.fixtures.nodes else None
+                for i in ids
+            }
+            return self.send_json(200, {"err": None, "images": images})
+        return self.send_json(404, {"status": 404, "err": "Not found"})
+
+    def meta(self, file_key: str) -> Dict:
+        return {
+            "name": self.server.fixtures.names.get(file_key, file_key),
+            "lastModified": LAST_MODIFIED,
+            "version": self.server.version,
+            "document": {"id": "0:0", "name": "Document", "type": "DOCUMENT", "children": []},
+        }
+
+    def nodes(self, file_key: str, ids: List[str]) -> Dict:
+        nodes = {}
+        for node_id in ids:
+            document = self.server.fixtures.nodes.get((file_key, node_id.replace(":", "-")))
+            nodes[node_id] = (
+                {"document": document, "components": {}, "styles": {}} if document else None
+            )
+        data = self.meta(file_key)
+        del data["document"]
+        data["nodes"] = nodes
+        return data
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], fixtures: Fixtures, faults: Faults,
+                 version: str = FILE_VERSION, verbose: bool = False):
+        super().__init__(address, StandInHandler)
+        self.fixtures = fixtures
+        self.faults = faults
+        self.version = version
+        self.verbose = verbose
+        self.stats: Counter = Counter()
+        self.stats_lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        """Handler threads share the counters: += on a Counter is not atomic"""
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.stats_lock:
+            return dict(self.stats)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def run():
+    parser = argparse.ArgumentParser(
+        description="Local Figma API stand-in for offline runs of the SDUI exporter",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python3 figma_api_stub.py --fixtures ../../SDUI-export
+  python3 figma_api_stub.py --fixtures ~/.sdui_export_cache --latency 300 --jitter 200
+  python3 figma_api_stub.py --fixtures ../../SDUI-export --rate-limit 5 --retry-after 1
+
+  FIGMA_API_URL=http://127.0.0.1:8765 python3 sdui_export_v7.9.1.py 1-1 1-2 \\
+      --file-key LOCAL -t local -o /tmp/screens
+""",
+    )
+    parser.add_argument(
+        "--fixtures",
+        "-f",
+        type=Path,
+        nargs="+",
+        default=[Path(__file__).resolve().parents[2] / "SDUI-export"],
+        help="Fixture files / directories (default: Python/SDUI-export)",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", "-p", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0, help="Delay per API request, ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Extra random delay, up to ms")
+    parser.add_argument("--rate-429", type=float, default=0, help="Probability of a random 429")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Requests per second before 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After for injected 429s, s")
+    parser.add_argument("--file-version", default=FILE_VERSION, help="Reported file version")
+    parser.add_argument("--seed", type=int, help="Seed for jitter and random 429s")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    fixtures = Fixtures().load(args.fixtures)
+    if not fixtures.nodes:
+        print("❌ No fixtures loaded", file=sys.stderr)
+        sys.exit(1)
+
+    faults = Faults(args.latency, args.jitter, args.rate_429, args.rate_limit,
+                    args.retry_after, args.seed)
+    server = StandInServer((args.host, args.port), fixtures, faults,
+                           args.file_version, args.verbose)
+
+    print(f"🛰️  Figma API stand-in: {server.base_url}", file=sys.stderr)
+    for file_key, items in fixtures.listing().items():
+        print(f"📁 {file_key}: {len(items)} node(s)", file=sys.stderr)
+        for item in items[:10]:
+            print(f"   {item['node_id']:<10} {item['name']}", file=sys.stderr)
+        if len(items) > 10:
+            print(f"   ... and {len(items) - 10} more", file=sys.stderr)
+    print(f"   export FIGMA_API_URL={server.base_url}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        summary = ", ".join(f"{k}={v}" for k, v in sorted(server.snapshot().items()))
+        print(f"\n📊 Requests: {summary or 'none'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    run()
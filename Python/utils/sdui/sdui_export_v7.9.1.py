@@ -4,6 +4,18 @@ SDUI Export Tool v7.9.1 (Text Color Fix Edition)
 ========================================================================
 Standard: Alpha Mobile SDUI Workflow
 
+Batch export:
+- [FEAT] Many URLs / node ids per run, one /nodes?ids=a,b,c request per file
+- [FEAT] Different files fetched in parallel (--workers) with a shared 429 cool-down
+- [FEAT] Cache: gzip entries checked against the file version, LRU size cap,
+  `cache stats` / `cache prune`
+- [PERF] FigmaClient: one pooled keep-alive Session for nodes, metadata and
+  images; 429 / 5xx / network errors share one backoff + Retry-After policy,
+  network errors capped at MAX_NETWORK_RETRY_TIME; a non-default API URL
+  fails fast when unreachable
+- [FEAT] --images png|jpg|svg|pdf renders exported nodes next to the JSON
+- [FEAT] --api-url / FIGMA_API_URL: run against the local figma_api_stub.py
+
 Changes from v7.9:
 - [FIX] Text color detection - uses luminance-based logic instead of opacity
 - [FIX] Proper textColorPrimary/Secondary/Tertiary based on text opacity
@@ -19,23 +31,31 @@ Changes from v7.8:
 
 Usage:
   python3 sdui_export.py <url> --token <token>
+  python3 sdui_export.py <url1> <url2> 123-456 -o ./screens/
+  python3 sdui_export.py cache stats
   python3 sdui_export.py <url> --schema-path /path/to/front-middle-schema/SDUI
   python3 sdui_export.py <url> --infer-wrappers --mode layout
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import re
 import argparse
 import sys
 import os
 import time
+import gzip
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple, Callable
 
 # === CONFIGURATION & CONSTANTS ===
 CACHE_DIR = Path.home() / ".sdui_export_cache"
+CACHE_MAX_BYTES = 200 * 1024 * 1024
 DEFAULT_EXPORT_DIR = Path.home() / "Scripts/Python/SDUI-export"
 DEFAULT_SCHEMA_PATH = Path.home() / "Documents/front-middle-schema/SDUI"
 
@@ -44,6 +64,23 @@ INITIAL_DELAY = 2.0
 BACKOFF_FACTOR = 2.0
 MAX_DELAY = 120.0
 MAX_RETRY_AFTER = 180.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REQUEST_TIMEOUT = (10, 120)  # connect, read (seconds)
+MAX_WORKERS = 4
+MAX_IDS_PER_REQUEST = 50
+
+MAX_NETWORK_RETRY_TIME = 60.0  # connection / timeout retries of one call, waits included (seconds)
+
+# Override for a local stand-in (utils/sdui/figma_api_stub.py)
+DEFAULT_FIGMA_API_URL = "https://api.figma.com"
+FIGMA_API_URL = os.getenv("FIGMA_API_URL", DEFAULT_FIGMA_API_URL).rstrip("/")
+
+FIGMA_URL_RE = re.compile(r"figma\.com/design/([a-zA-Z0-9]+).+node-id=([\d:-]+)")
+NODE_ID_RE = re.compile(r"\d+[:-]\d+")
+
+# 429 cool-down shared by concurrent fetch workers (time.monotonic deadline)
+_RATE_LIMIT_UNTIL = 0.0
+_RATE_LIMIT_LOCK = threading.Lock()
 
 INFER_WRAPPERS = False
 EXPORT_MODE = "full"
@@ -988,62 +1025,434 @@ def transform_node(node: Dict) -> Optional[Dict]:
     return None
 
 
-def retry_with_backoff(func: Callable) -> Optional[Any]:
+def wait_for_rate_limit() -> None:
+    """Block while another worker holds a 429 cool-down"""
+    while True:
+        with _RATE_LIMIT_LOCK:
+            remaining = _RATE_LIMIT_UNTIL - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(remaining)
+
+
+def retry_after_seconds(response: requests.Response) -> float:
+    """Retry-After as seconds (delta or HTTP date), capped at MAX_RETRY_AFTER"""
+    value = response.headers.get("Retry-After", "").strip()
+    if not value:
+        return 0.0
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return 0.0
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def retry_with_backoff(func: Callable, fail_fast_connect: bool = False) -> Optional[Any]:
+    """
+    Single retry policy for every Figma call:
+    429 / 5xx / connection errors → wait max(backoff, Retry-After) and retry,
+    other HTTP errors → fail at once.
+
+    Connection / timeout retries stop once the call would exceed
+    MAX_NETWORK_RETRY_TIME; there is no wait after the last attempt.
+    fail_fast_connect: a refused / unresolvable host is not retried
+    (a mistyped --api-url / FIGMA_API_URL should not hang for minutes).
+    """
+    global _RATE_LIMIT_UNTIL
+    started = time.monotonic()
     delay = INITIAL_DELAY
     for attempt in range(MAX_RETRIES):
+        wait_for_rate_limit()
         try:
             return func()
         except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:
-                retry = min(
-                    int(e.response.headers.get("Retry-After", 0)), MAX_RETRY_AFTER
-                )
-                wait = max(delay, retry) if retry else delay
-                print(
-                    f"⏳ 429 Rate Limit. Waiting {int(wait)}s... ({attempt+1}/{MAX_RETRIES})",
-                    file=sys.stderr,
-                )
-                time.sleep(wait)
-                delay = min(delay * BACKOFF_FACTOR, MAX_DELAY)
-            else:
-                print(f"❌ HTTP Error {e.response.status_code}", file=sys.stderr)
+            status = e.response.status_code
+            if status not in RETRY_STATUSES:
+                print(f"❌ HTTP Error {status}", file=sys.stderr)
+                return None
+            retry = retry_after_seconds(e.response)
+            wait = max(delay, retry) if retry else delay
+            label = "429 Rate Limit." if status == 429 else f"HTTP {status}."
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if fail_fast_connect and isinstance(e, requests.exceptions.ConnectionError):
+                print(f"❌ Cannot connect: {e}", file=sys.stderr)
                 return None
+            status = None
+            wait = delay
+            label = f"Network Error: {e}."
         except Exception as e:
             print(f"❌ Network Error: {e}", file=sys.stderr)
             return None
+
+        if attempt + 1 == MAX_RETRIES:
+            break
+        if status is None and time.monotonic() - started + wait > MAX_NETWORK_RETRY_TIME:
+            print(f"❌ Giving up after {int(time.monotonic() - started)}s of network errors", file=sys.stderr)
+            return None
+        print(
+            f"⏳ {label} Waiting {int(wait)}s... ({attempt+1}/{MAX_RETRIES})",
+            file=sys.stderr,
+        )
+        if status == 429:
+            # Shared cool-down: concurrent workers pause too instead of
+            # hammering the limit with their own requests
+            with _RATE_LIMIT_LOCK:
+                _RATE_LIMIT_UNTIL = max(_RATE_LIMIT_UNTIL, time.monotonic() + wait)
+        else:
+            time.sleep(wait)
+        delay = min(delay * BACKOFF_FACTOR, MAX_DELAY)
     print(f"❌ Max retries ({MAX_RETRIES}) exceeded", file=sys.stderr)
     return None
 
 
-def fetch_figma_node(
-    file_key: str, node_id: str, token: str, use_cache: bool
-) -> Optional[Dict]:
-    CACHE_DIR.mkdir(exist_ok=True)
-    cache = CACHE_DIR / f"{file_key}_{node_id}.json"
-    if use_cache and cache.exists():
-        print(f"📦 Loaded from cache: {cache.name}", file=sys.stderr)
-        with open(cache) as f:
-            return json.load(f)
-
-    def req():
-        url = f"https://api.figma.com/v1/files/{file_key}/nodes?ids={node_id.replace('-', '%3A')}"
-        r = requests.get(url, headers={"X-Figma-Token": token})
-        r.raise_for_status()
-        return r.json()
-
-    data = retry_with_backoff(req)
-    if data:
+# === FIGMA CLIENT ===
+# Kept identical in sdui_export.py and utils/sdui/sdui_export_v7.9.1.py:
+# from wait_for_rate_limit() to the end of FigmaClient.
+
+
+class FigmaClient:
+    """
+    Figma REST API over one keep-alive requests.Session.
+
+    Node, metadata and image calls share the connection pool, so a batch
+    export pays the TCP + TLS handshake once per pooled connection instead
+    of once per request and retry. pool_size should cover the worker count.
+    A non-default base_url (local stub) fails fast on connection errors.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        pool_size: int = MAX_WORKERS,
+        base_url: Optional[str] = None,
+    ):
+        self.token = token
+        self.base_url = (base_url or FIGMA_API_URL).rstrip("/")
+        self.fail_fast_connect = self.base_url != DEFAULT_FIGMA_API_URL
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=2, pool_maxsize=max(1, pool_size), max_retries=0
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {"X-Figma-Token": token, "Accept-Encoding": "gzip, deflate"}
+        )
+
+    def get_json(self, path: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        def req():
+            r = self.session.get(
+                f"{self.base_url}{path}", params=params, timeout=REQUEST_TIMEOUT
+            )
+            r.raise_for_status()
+            return r.json()
+
+        return retry_with_backoff(req, fail_fast_connect=self.fail_fast_connect)
+
+    def nodes(self, file_key: str, node_ids: List[str]) -> Optional[Dict]:
+        ids = ",".join(n.replace("-", ":") for n in node_ids)
+        return self.get_json(f"/v1/files/{file_key}/nodes", {"ids": ids})
+
+    def file_meta(self, file_key: str) -> Optional[Dict]:
+        """depth=1: name, version, lastModified without the node tree"""
+        return self.get_json(f"/v1/files/{file_key}", {"depth": 1})
+
+    def images(
+        self, file_key: str, node_ids: List[str], fmt: str = "png", scale: float = 2
+    ) -> Dict[str, str]:
+        """node_id → rendered image URL (one request for all ids)"""
+        ids = ",".join(n.replace("-", ":") for n in node_ids)
+        data = self.get_json(
+            f"/v1/images/{file_key}", {"ids": ids, "format": fmt, "scale": scale}
+        )
+        if not data or data.get("err"):
+            if data:
+                print(f"❌ Render error: {data['err']}", file=sys.stderr)
+            return {}
+        return {
+            key.replace(":", "-"): url
+            for key, url in (data.get("images") or {}).items()
+            if url
+        }
+
+    def download(self, url: str, path: Path) -> bool:
+        def req():
+            # Rendered images live outside the API host: no token there
+            r = self.session.get(
+                url, headers={"X-Figma-Token": None}, timeout=REQUEST_TIMEOUT
+            )
+            r.raise_for_status()
+            return r.content
+
+        content = retry_with_backoff(req)
+        if content is None:
+            return False
+        path.write_bytes(content)
+        return True
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "FigmaClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# === RESPONSE CACHE ===
+
+
+class ResponseCache:
+    """
+    Compressed per-node cache of Figma responses with LRU eviction.
+
+    Entry = {file_key}_{node_id}.json.gz holding the node document plus the
+    file version it was fetched at. Reads touch the mtime, so the mtime
+    order is the LRU order; evict() (once per fetched batch) drops the
+    least recently used entries above max_bytes. Plain *.json files in the
+    same directory belong to sdui_export.py (v6.3) and are never touched.
+    """
+
+    SUFFIX = ".json.gz"
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path(self, file_key: str, node_id: str) -> Path:
+        return self.directory / f"{file_key}_{node_id}{self.SUFFIX}"
+
+    def get(self, file_key: str, node_id: str) -> Optional[Dict]:
+        path = self.path(file_key, node_id)
         try:
-            key = list(data["nodes"].keys())[0]
-            node_data = data["nodes"][key]["document"]
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, file_key: str, node_id: str, document: Dict, meta: Dict) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "file_key": file_key,
+            "node_id": node_id,
+            "version": meta.get("version"),
+            "lastModified": meta.get("lastModified"),
+            "document": document,
+        }
+        data = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        path = self.path(file_key, node_id)
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(gzip.compress(data, compresslevel=6))
+        os.replace(tmp, path)
+        return path
+
+    def entries(self) -> List[Tuple[Path, os.stat_result]]:
+        """(path, stat), least recently used first"""
+        if not self.directory.exists():
+            return []
+        items = []
+        for path in self.directory.iterdir():
+            if path.name.endswith(self.SUFFIX):
+                try:
+                    items.append((path, path.stat()))
+                except FileNotFoundError:
+                    pass
+        return sorted(items, key=lambda item: item[1].st_mtime)
+
+    def plain_entries(self) -> List[Path]:
+        """Uncompressed *.json entries of sdui_export.py (v6.3), shared directory"""
+        if not self.directory.exists():
+            return []
+        return [p for p in self.directory.glob("*.json") if p.is_file()]
+
+    def evict(self, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        """Drop LRU entries until the total fits; returns (removed, bytes freed)"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        removed = freed = 0
+        with self._lock:
+            items = self.entries()
+            total = sum(st.st_size for _, st in items)
+            for path, st in items:
+                if total <= limit:
+                    break
+                path.unlink(missing_ok=True)
+                total -= st.st_size
+                removed += 1
+                freed += st.st_size
+        return removed, freed
+
+    def stats(self) -> Dict[str, Any]:
+        items = self.entries()
+        by_file: Dict[str, List[int]] = {}
+        for path, st in items:
+            file_key = path.name[: -len(self.SUFFIX)].split("_", 1)[0]
+            counts = by_file.setdefault(file_key, [0, 0])
+            counts[0] += 1
+            counts[1] += st.st_size
+        plain = self.plain_entries()
+        return {
+            "directory": str(self.directory),
+            "entries": len(items),
+            "bytes": sum(st.st_size for _, st in items),
+            "max_bytes": self.max_bytes,
+            "oldest": items[0][1].st_mtime if items else None,
+            "newest": items[-1][1].st_mtime if items else None,
+            "files": by_file,
+            "plain_entries": len(plain),
+            "plain_bytes": sum(p.stat().st_size for p in plain),
+        }
+
+
+CACHE = ResponseCache()
+
+
+def fetch_file_version(client: FigmaClient, file_key: str) -> Optional[str]:
+    """Cheap metadata call → current file version"""
+    data = client.file_meta(file_key)
+    return data.get("version") if data else None
+
+
+def fetch_figma_nodes(
+    client: FigmaClient,
+    file_key: str,
+    node_ids: List[str],
+    use_cache: bool,
+    validate: bool = True,
+) -> Dict[str, Dict]:
+    """Fetch several nodes of one file: valid cache hits first, the rest via batched ids="""
+    result: Dict[str, Dict] = {}
+    node_ids = list(dict.fromkeys(node_ids))
+    cached = {}
+    if use_cache:
+        cached = {n: e for n in node_ids if (e := CACHE.get(file_key, n))}
+
+    if cached and validate:
+        # One metadata request per file decides for all of its cached nodes
+        version = fetch_file_version(client, file_key)
+        if version is None:
+            print(f"⚠️  Could not check version of {file_key}, using cache", file=sys.stderr)
+        else:
+            for node_id in [n for n, e in cached.items() if e.get("version") != version]:
+                print(f"♻️  Stale cache: {file_key}_{node_id}", file=sys.stderr)
+                del cached[node_id]
+
+    for node_id, entry in cached.items():
+        print(f"📦 Loaded from cache: {file_key}_{node_id}", file=sys.stderr)
+        result[node_id] = entry["document"]
+    missing = [n for n in node_ids if n not in result]
+    written = 0
+
+    for i in range(0, len(missing), MAX_IDS_PER_REQUEST):
+        data = client.nodes(file_key, missing[i : i + MAX_IDS_PER_REQUEST])
+        if not data:
+            continue
+        for key, entry in (data.get("nodes") or {}).items():
+            node_id = key.replace(":", "-")
+            if entry is None:
+                print(f"❌ Node {node_id} not found", file=sys.stderr)
+                continue
+            try:
+                node_data = entry["document"]
+            except (KeyError, TypeError) as e:
+                print(f"❌ Parse error for {node_id}: {e}", file=sys.stderr)
+                continue
+            result[node_id] = node_data
             if use_cache:
-                with open(cache, "w") as f:
-                    json.dump(node_data, f, indent=2)
+                cache = CACHE.put(file_key, node_id, node_data, data)
+                written += 1
                 print(f"💾 Cached to: {cache.name}", file=sys.stderr)
-            return node_data
-        except (KeyError, IndexError) as e:
-            print(f"❌ Parse error: {e}", file=sys.stderr)
-    return None
+    if written:
+        # One directory scan per batch, not per written node
+        CACHE.evict()
+    return result
+
+
+def fetch_figma_node(
+    client: FigmaClient,
+    file_key: str,
+    node_id: str,
+    use_cache: bool,
+    validate: bool = True,
+) -> Optional[Dict]:
+    return fetch_figma_nodes(client, file_key, [node_id], use_cache, validate).get(node_id)
+
+
+def fetch_many(
+    client: FigmaClient,
+    targets: List[Tuple[str, str]],
+    use_cache: bool,
+    workers: int,
+    validate: bool = True,
+) -> Dict[Tuple[str, str], Dict]:
+    """One request per file key (ids=a,b,c), different files in parallel"""
+    by_file: Dict[str, List[str]] = {}
+    for file_key, node_id in targets:
+        by_file.setdefault(file_key, []).append(node_id)
+
+    result: Dict[Tuple[str, str], Dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(by_file)))) as pool:
+        futures = {
+            pool.submit(fetch_figma_nodes, client, key, ids, use_cache, validate): key
+            for key, ids in by_file.items()
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            for node_id, node in future.result().items():
+                result[(key, node_id)] = node
+    return result
+
+
+def export_images(
+    client: FigmaClient, saved: List[Tuple[str, str, Path]], fmt: str, scale: float
+) -> int:
+    """Render exported nodes next to their JSON (one /images request per file)"""
+    by_file: Dict[str, List[Tuple[str, Path]]] = {}
+    for file_key, node_id, json_path in saved:
+        by_file.setdefault(file_key, []).append((node_id, json_path))
+
+    written = 0
+    for file_key, items in by_file.items():
+        urls = client.images(file_key, [n for n, _ in items], fmt, scale)
+        for node_id, json_path in items:
+            url = urls.get(node_id)
+            target = json_path.with_suffix(f".{fmt}")
+            if url and client.download(url, target):
+                print(f"🖼️  Image: {make_clickable_path(target)}", file=sys.stderr)
+                written += 1
+            else:
+                print(f"❌ No image for {node_id}", file=sys.stderr)
+    return written
+
+
+def parse_targets(
+    values: List[str], default_file_key: Optional[str]
+) -> List[Tuple[str, str]]:
+    """URLs and bare node ids → (file_key, node_id); bare ids use the last seen file key"""
+    targets = []
+    file_key = default_file_key
+    for value in values:
+        match = FIGMA_URL_RE.search(value)
+        if match:
+            file_key, node_id = match.groups()
+        elif NODE_ID_RE.fullmatch(value):
+            node_id = value
+            if not file_key:
+                raise ValueError(f"No file key for node id {value} (use a URL or --file-key)")
+        else:
+            raise ValueError(f"Invalid URL or node id: {value}")
+        targets.append((file_key, node_id.replace(":", "-")))
+    return targets
 
 
 def generate_output_filename(name: str, infer: bool, mode: str) -> str:
@@ -1058,13 +1467,15 @@ def generate_output_filename(name: str, infer: bool, mode: str) -> str:
     return f"{base}_{'_'.join(suffixes)}.json"
 
 
-def save_output(data: Dict, output_arg: Optional[str], figma_name: str) -> None:
+def save_output(data: Dict, output_arg: Optional[str], figma_name: str, batch: bool = False) -> Path:
     json_out = json.dumps(data, indent=2, ensure_ascii=False)
+    generated = True
 
     if output_arg:
         p = Path(output_arg)
         if p.suffix.lower() == ".json":
             target_dir, filename = p.parent, p.name
+            generated = False
         else:
             target_dir = p
             filename = generate_output_filename(figma_name, INFER_WRAPPERS, EXPORT_MODE)
@@ -1079,20 +1490,103 @@ def save_output(data: Dict, output_arg: Optional[str], figma_name: str) -> None:
         sys.exit(1)
 
     final = target_dir / filename
+    if generated:
+        # Batch export: same-named frames within one second must not overwrite
+        n = 2
+        while final.exists():
+            final = target_dir / f"{Path(filename).stem}_{n}.json"
+            n += 1
 
     try:
         with open(final, "w") as f:
             f.write(json_out)
         print(f"✅ Saved to: {make_clickable_path(final)}", file=sys.stderr)
         if not sys.stdout.isatty():
-            print(json_out)
+            # Batch export: one compact document per line (JSON Lines) so a
+            # pipe stays parseable instead of getting concatenated documents
+            if batch:
+                print(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+            else:
+                print(json_out)
     except Exception as e:
         print(f"❌ Write failed: {e}", file=sys.stderr)
         sys.exit(1)
+    return final
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def run_cache(argv: List[str]) -> None:
+    """sdui_export.py cache stats|prune"""
+    parser = argparse.ArgumentParser(
+        prog="sdui_export.py cache",
+        description="Inspect or shrink the Figma response cache",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python3 sdui_export.py cache stats
+  python3 sdui_export.py cache prune                 # enforce the size cap
+  python3 sdui_export.py cache prune --max-mb 50
+  python3 sdui_export.py cache prune --all
+""",
+    )
+    parser.add_argument("action", choices=["stats", "prune"])
+    parser.add_argument(
+        "--max-mb",
+        type=float,
+        default=CACHE_MAX_BYTES / 1024 / 1024,
+        help=f"Size cap in MB (default: {CACHE_MAX_BYTES // 1024 // 1024})",
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="prune: remove every gzip entry"
+    )
+    args = parser.parse_args(argv)
+
+    cache = ResponseCache(CACHE_DIR, int(args.max_mb * 1024 * 1024))
+
+    if args.action == "prune":
+        for path in cache.directory.glob(".*.tmp") if cache.directory.exists() else []:
+            path.unlink(missing_ok=True)
+        removed, freed = cache.evict(0 if args.all else None)
+        print(
+            f"🧹 Removed {removed} entries ({format_size(freed)})",
+            file=sys.stderr,
+        )
+
+    stats = cache.stats()
+    print(f"📦 Cache: {stats['directory']}", file=sys.stderr)
+    print(
+        f"   {stats['entries']} entries, {format_size(stats['bytes'])}"
+        f" / {format_size(stats['max_bytes'])}",
+        file=sys.stderr,
+    )
+    if stats["entries"]:
+        oldest = datetime.fromtimestamp(stats["oldest"], MSK).strftime("%Y-%m-%d %H:%M")
+        newest = datetime.fromtimestamp(stats["newest"], MSK).strftime("%Y-%m-%d %H:%M")
+        print(f"   Last used: {oldest} … {newest} (MSK)", file=sys.stderr)
+        by_size = sorted(stats["files"].items(), key=lambda item: -item[1][1])
+        for file_key, (count, size) in by_size[:10]:
+            print(f"   • {file_key}: {count} nodes, {format_size(size)}", file=sys.stderr)
+    if stats["plain_entries"]:
+        print(
+            f"   ℹ️  {stats['plain_entries']} *.json entries"
+            f" ({format_size(stats['plain_bytes'])}) of sdui_export.py v6.3, not managed here",
+            file=sys.stderr,
+        )
 
 
 def run():
-    global INFER_WRAPPERS, EXPORT_MODE, SCHEMA
+    global INFER_WRAPPERS, EXPORT_MODE, SCHEMA, CACHE
+
+    if len(sys.argv) > 1 and sys.argv[1] == "cache":
+        run_cache(sys.argv[2:])
+        return
 
     parser = argparse.ArgumentParser(
         description="SDUI Export Tool v7.9.1 - Text Color Fix Edition",
@@ -1104,12 +1598,57 @@ Examples:
   python3 sdui_export.py <url> --token <token>
   python3 sdui_export.py <url> --schema-path ~/Documents/front-middle-schema/SDUI
   python3 sdui_export.py <url> --infer-wrappers --mode layout
+  python3 sdui_export.py <url1> <url2> <url3> -o ./screens/
+  python3 sdui_export.py <url> 123-456 123-789 -o ./screens/   # more nodes, same file
+  python3 sdui_export.py 123-456 123-789 --file-key <key>
+  python3 sdui_export.py <url1> <url2> -o ./screens/ --images png
+  python3 sdui_export.py cache stats | prune          # response cache
+  python3 sdui_export.py 1-1 1-2 --file-key LOCAL -t local --api-url http://127.0.0.1:8765
 """,
     )
-    parser.add_argument("url", help="Figma URL with node-id")
+    parser.add_argument(
+        "targets",
+        nargs="+",
+        metavar="url",
+        help="Figma URLs with node-id and/or node ids (1-2 or 1:2)",
+    )
+    parser.add_argument(
+        "--file-key", help="File key for bare node ids before the first URL"
+    )
+    parser.add_argument(
+        "--images",
+        choices=["png", "jpg", "svg", "pdf"],
+        help="Also render each exported node next to its JSON",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=2, help="Image scale for --images (default: 2)"
+    )
+    parser.add_argument(
+        "--api-url",
+        default=FIGMA_API_URL,
+        help="Figma API base URL, e.g. a local figma_api_stub.py (env: FIGMA_API_URL)",
+    )
+    parser.add_argument(
+        "--workers",
+        "-j",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"Files fetched in parallel (default: {MAX_WORKERS})",
+    )
     parser.add_argument("--token", "-t", help="Figma API Token")
     parser.add_argument("--output", "-o", help="Output file/directory")
     parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Serve cached nodes without the file version check (offline)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=CACHE_MAX_BYTES / 1024 / 1024,
+        help=f"Cache size cap, LRU eviction (default: {CACHE_MAX_BYTES // 1024 // 1024} MB)",
+    )
     parser.add_argument("--infer-wrappers", action="store_true")
     parser.add_argument(
         "--mode", choices=["full", "layout", "skeleton", "names"], default="full"
@@ -1126,6 +1665,7 @@ Examples:
     EXPORT_MODE = args.mode
     SCHEMA = SchemaLoader(args.schema_path)
     SCHEMA.load()
+    CACHE = ResponseCache(CACHE_DIR, int(args.cache_max_mb * 1024 * 1024))
 
     if INFER_WRAPPERS:
         print("🔧 Wrapper inference enabled", file=sys.stderr)
@@ -1137,31 +1677,58 @@ Examples:
         print("❌ Figma Token not found.", file=sys.stderr)
         sys.exit(1)
 
-    match = re.search(r"figma\.com/design/([a-zA-Z0-9]+).+node-id=([\d-]+)", args.url)
-    if not match:
-        print("❌ Invalid URL.", file=sys.stderr)
+    try:
+        targets = list(dict.fromkeys(parse_targets(args.targets, args.file_key)))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if len(targets) > 1 and args.output and Path(args.output).suffix.lower() == ".json":
+        print("❌ --output must be a directory when exporting several nodes", file=sys.stderr)
+        sys.exit(1)
+
+    files = len({key for key, _ in targets})
+    print(f"🔍 Fetching {len(targets)} node(s) from {files} file(s)...", file=sys.stderr)
+
+    if args.api_url.rstrip("/") != "https://api.figma.com":
+        print(f"🛰️  API: {args.api_url}", file=sys.stderr)
+    with FigmaClient(token, pool_size=args.workers, base_url=args.api_url) as client:
+        failed = export_targets(client, targets, args)
+    if failed:
+        print(f"❌ {failed}/{len(targets)} node(s) failed", file=sys.stderr)
         sys.exit(1)
 
-    file_key, node_id = match.groups()
-    node_id = node_id.replace(":", "-")
-    print(f"🔍 Fetching node {node_id}...", file=sys.stderr)
 
-    root = fetch_figma_node(file_key, node_id, token, not args.no_cache)
-    if root:
-        print("🔄 Transforming...", file=sys.stderr)
+def export_targets(client: FigmaClient, targets: List[Tuple[str, str]], args) -> int:
+    """Fetch, transform and save every target; returns the number of failures"""
+    nodes = fetch_many(
+        client, targets, not args.no_cache, args.workers, not args.no_validate
+    )
+    failed = 0
+    saved: List[Tuple[str, str, Path]] = []
+    for file_key, node_id in targets:
+        root = nodes.get((file_key, node_id))
+        if not root:
+            print(f"❌ Failed to fetch {node_id}", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"🔄 Transforming {node_id}...", file=sys.stderr)
         result = transform_node(root)
         if result:
-            save_output(
+            path = save_output(
                 filter_for_mode(result, EXPORT_MODE),
                 args.output,
                 root.get("name", "export"),
+                batch=len(targets) > 1,
             )
+            saved.append((file_key, node_id, path))
         else:
-            print("❌ Empty output", file=sys.stderr)
-            sys.exit(1)
-    else:
-        print("❌ Failed to fetch", file=sys.stderr)
-        sys.exit(1)
+            print(f"❌ Empty output for {node_id}", file=sys.stderr)
+            failed += 1
+
+    if args.images and saved:
+        failed += len(saved) - export_images(client, saved, args.images, args.scale)
+    return failed
 
 
 if __name__ == "__main__":
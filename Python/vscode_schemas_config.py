@@ -0,0 +1 @@
+refs/vscode_schemas_config_v1.0.0.py
\ No newline at end of file